@@ -0,0 +1,25 @@
+import numpy as np
+
+from embedding_cache import normalize_rows
+
+class AgendaSimilarity:
+    # Cosine similarity of texts against a fixed set of agenda topics. The topic
+    # matrix is embedded and normalized once; scoring any number of texts is one
+    # embed call and one matmul. `embed` takes a list of texts, returns a matrix.
+    def __init__(self, embed, topic_texts, topic_names=None):
+        self.embed = embed
+        self.topic_texts = list(topic_texts)
+        self.topic_names = list(topic_names) if topic_names is not None else self.topic_texts
+        self._topic_matrix = None
+
+    @property
+    def topic_matrix(self):
+        if self._topic_matrix is None:
+            self._topic_matrix = normalize_rows(self.embed(self.topic_texts))
+        return self._topic_matrix
+
+    def score_matrix(self, texts):
+        # Returns a len(texts) x len(topics) matrix of cosine similarities
+        if not texts:
+            return np.zeros((0, len(self.topic_texts)), dtype=np.float32)
+        return normalize_rows(self.embed(list(texts))) @ self.topic_matrix.T
@@ -0,0 +1,191 @@
+import logging
+import os
+import sqlite3
+import threading
+
+from memo_cache import normalize_text
+from roster import ParticipantState
+
+DEFAULT_PATH = "analytics.db"
+BLOCKER = "blocker"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY,
+    meeting TEXT NOT NULL,
+    team TEXT NOT NULL,
+    date TEXT NOT NULL,
+    UNIQUE (team, meeting)
+);
+CREATE TABLE IF NOT EXISTS turns (
+    meeting_id INTEGER NOT NULL REFERENCES meetings(id),
+    team TEXT NOT NULL,
+    date TEXT NOT NULL,
+    participant TEXT NOT NULL,
+    t_used REAL NOT NULL,
+    t_alloc REAL NOT NULL,
+    exceeded INTEGER NOT NULL,
+    statements INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS statements (
+    meeting_id INTEGER NOT NULL REFERENCES meetings(id),
+    team TEXT NOT NULL,
+    date TEXT NOT NULL,
+    participant TEXT NOT NULL,
+    category TEXT NOT NULL,
+    text TEXT NOT NULL,
+    normalized TEXT NOT NULL
+);
+-- Running totals per person, updated with every meeting
+CREATE TABLE IF NOT EXISTS participant_stats (
+    team TEXT NOT NULL,
+    participant TEXT NOT NULL,
+    meetings INTEGER NOT NULL,
+    total_used REAL NOT NULL,
+    total_alloc REAL NOT NULL,
+    total_overrun REAL NOT NULL,
+    exceeded INTEGER NOT NULL,
+    blockers INTEGER NOT NULL,
+    PRIMARY KEY (team, participant)
+);
+-- Statement counts per team, day and category
+CREATE TABLE IF NOT EXISTS daily_categories (
+    team TEXT NOT NULL,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (team, date, category)
+);
+CREATE INDEX IF NOT EXISTS meetings_team_date ON meetings (team, date);
+CREATE INDEX IF NOT EXISTS turns_participant_date ON turns (participant, date);
+CREATE INDEX IF NOT EXISTS turns_team_date ON turns (team, date);
+CREATE INDEX IF NOT EXISTS statements_category_team_date ON statements (category, team, date);
+CREATE INDEX IF NOT EXISTS statements_participant_date ON statements (participant, date);
+"""
+
+# Before schema version 1 meeting ids were unique across all teams
+MIGRATE_MEETINGS = """
+CREATE TABLE meetings_v1 (
+    id INTEGER PRIMARY KEY,
+    meeting TEXT NOT NULL,
+    team TEXT NOT NULL,
+    date TEXT NOT NULL,
+    UNIQUE (team, meeting)
+);
+INSERT INTO meetings_v1 SELECT id, meeting, team, date FROM meetings;
+DROP TABLE meetings;
+ALTER TABLE meetings_v1 RENAME TO meetings;
+CREATE INDEX IF NOT EXISTS meetings_team_date ON meetings (team, date);
+"""
+SCHEMA_VERSION = 1
+
+def analytics_path_from_env():
+    return os.environ.get("SCRUM_ANALYTICS_DB", DEFAULT_PATH)
+
+def team_from_env():
+    return os.environ.get("SCRUM_TEAM", "default")
+
+def meeting_summary(participants, results):
+    # Roster + {name: [(line, category, score), ...]} -> rows for record_meeting
+    return [{
+        "name": name,
+        "T_used": participant.T_used,
+        "T_alloc": participant.T_alloc,
+        "exceeded": participant.state == ParticipantState.EXCEEDED,
+        "statements": [(line, category) for line, category, _ in results.get(name, [])],
+    } for name, participant in participants.items()]
+
+class AnalyticsStore:
+    # SQLite store of meeting summaries for questions across many standups.
+    # Raw turns and statements are indexed by participant, date and category;
+    # participant_stats and daily_categories are kept up to date on insert so the
+    # common questions never scan the raw tables.
+    def __init__(self, path=None):
+        self.path = path or analytics_path_from_env()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1 and self._conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meetings'").fetchone():
+                self._conn.executescript(MIGRATE_MEETINGS)
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def record_meeting(self, meeting, team, date, participants):
+        # One transaction per meeting. `date` is YYYY-MM-DD; `participants` is the
+        # output of meeting_summary(). Recording the same (team, meeting) twice is
+        # a no-op that is logged and returns False.
+        with self._lock, self._conn:
+            cursor = self._conn.execute("INSERT OR IGNORE INTO meetings (meeting, team, date) VALUES (?, ?, ?)",
+                                        (meeting, team, date))
+            if cursor.rowcount == 0:
+                logging.warning(f"Meeting {meeting} of team {team} is already recorded, not recording it again")
+                return False
+            meeting_id = cursor.lastrowid
+            turns, statements, stats, categories = [], [], [], {}
+            for p in participants:
+                turns.append((meeting_id, team, date, p["name"], p["T_used"], p["T_alloc"],
+                               int(p["exceeded"]), len(p["statements"])))
+                blockers = 0
+                for text, category in p["statements"]:
+                    statements.append((meeting_id, team, date, p["name"], category, text, normalize_text(text)))
+                    categories[category] = categories.get(category, 0) + 1
+                    blockers += category == BLOCKER
+                stats.append((team, p["name"], p["T_used"], p["T_alloc"], max(p["T_used"] - p["T_alloc"], 0.0),
+                              int(p["exceeded"]), blockers))
+            self._conn.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?)", turns)
+            self._conn.executemany("INSERT INTO statements VALUES (?, ?, ?, ?, ?, ?, ?)", statements)
+            self._conn.executemany("""
+                INSERT INTO participant_stats VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (team, participant) DO UPDATE SET
+                    meetings = meetings + 1,
+                    total_used = total_used + excluded.total_used,
+                    total_alloc = total_alloc + excluded.total_alloc,
+                    total_overrun = total_overrun + excluded.total_overrun,
+                    exceeded = exceeded + excluded.exceeded,
+                    blockers = blockers + excluded.blockers""", stats)
+            self._conn.executemany("""
+                INSERT INTO daily_categories VALUES (?, ?, ?, ?)
+                ON CONFLICT (team, date, category) DO UPDATE SET count = count + excluded.count""",
+                [(team, date, category, count) for category, count in categories.items()])
+        return True
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def participant_stats(self, team=None):
+        # Precomputed per-person totals, with average used time and overrun per meeting
+        where, params = ("WHERE team = ?", (team,)) if team else ("", ())
+        return self.query(f"""
+            SELECT team, participant, meetings, total_used, total_alloc, exceeded, blockers,
+                   total_used / meetings AS avg_used, total_overrun / meetings AS avg_overrun
+            FROM participant_stats {where} ORDER BY avg_overrun DESC""", params)
+
+    def recurring_blockers(self, team, since=None, until=None, limit=10):
+        # Blocker statements that came up most often, grouped by normalized text
+        return self.query("""
+            SELECT normalized, MIN(text) AS text, COUNT(*) AS mentions,
+                   COUNT(DISTINCT participant) AS participants, MIN(date) AS first_seen, MAX(date) AS last_seen
+            FROM statements
+            WHERE category = ? AND team = ? AND date >= ? AND date < ?
+            GROUP BY normalized ORDER BY mentions DESC LIMIT ?""",
+            (BLOCKER, team, since or "", until or "9999", limit))
+
+    def category_trend(self, team, since=None, until=None):
+        return self.query("""
+            SELECT date, category, count FROM daily_categories
+            WHERE team = ? AND date >= ? AND date < ? ORDER BY date, category""",
+            (team, since or "", until or "9999"))
+
+    def participant_history(self, participant, since=None, until=None):
+        return self.query("""
+            SELECT date, team, t_used, t_alloc, exceeded, statements FROM turns
+            WHERE participant = ? AND date >= ? AND date < ? ORDER BY date""",
+            (participant, since or "", until or "9999"))
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,62 @@
+import csv
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from analytics_store import AnalyticsStore
+from replay import split_speaker
+
+TEAMS = 50
+TEAM_SIZE = 8
+WORKDAYS = 260
+
+def labeled_statements(path="category_labeled.csv"):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(split_speaker(row["text"])[1], row["label"]) for row in csv.DictReader(f)]
+
+def workdays(count, start=datetime.date(2025, 1, 1)):
+    day = start
+    while count:
+        if day.weekday() < 5:
+            yield day.isoformat()
+            count -= 1
+        day += datetime.timedelta(days=1)
+
+def timed(label, fn, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = fn()
+    print(f"{label}: {1000 * (time.perf_counter() - start) / repeat:.2f} ms, {len(rows)} rows")
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    statements = labeled_statements()
+    path = os.path.join(tempfile.mkdtemp(), "analytics.db")
+    store = AnalyticsStore(path)
+
+    start = time.perf_counter()
+    meetings = 0
+    for date in workdays(WORKDAYS):
+        for team in range(TEAMS):
+            participants = [{
+                "name": f"team{team}-p{i}",
+                "T_alloc": 120.0,
+                "T_used": rng.uniform(60, 180),
+                "exceeded": rng.random() < 0.2,
+                "statements": rng.sample(statements, 3),
+            } for i in range(TEAM_SIZE)]
+            store.record_meeting(f"team{team}-{date}", f"team{team}", date, participants)
+            meetings += 1
+    elapsed = time.perf_counter() - start
+    print(f"recorded {meetings} meetings in {elapsed:.1f}s ({meetings / elapsed:.0f}/s), "
+          f"database {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    timed("average overrun per person, all teams", lambda: store.participant_stats())
+    timed("average overrun per person, one team", lambda: store.participant_stats("team7"))
+    timed("recurring blockers, one team, last quarter",
+          lambda: store.recurring_blockers("team7", "2025-10-01", "2026-01-01"))
+    timed("category trend, one team, last quarter", lambda: store.category_trend("team7", "2025-10-01", "2026-01-01"))
+    timed("one person's history, full year", lambda: store.participant_history("team7-p3"))
+    store.close()
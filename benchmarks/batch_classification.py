@@ -0,0 +1,42 @@
+import csv
+import itertools
+import time
+
+from classification import categorize_batch, categorize_lines, predict_category
+
+SIZES = [10, 1000, 100000]
+PARTICIPANTS = 8
+
+def load_lines(path="category_labeled.csv"):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["text"] for row in csv.DictReader(f)]
+
+def make_meeting(lines, n):
+    # Spread n lines round-robin over PARTICIPANTS speakers
+    meeting = {f"participant{i}": [] for i in range(PARTICIPANTS)}
+    names = itertools.cycle(meeting)
+    for line in itertools.islice(itertools.cycle(lines), n):
+        meeting[next(names)].append(line)
+    return meeting
+
+def per_line(meeting):
+    return {name: [(line, predict_category(line)) for line in spoken_lines]
+            for name, spoken_lines in meeting.items()}
+
+def timed(fn, arg):
+    start = time.perf_counter()
+    result = fn(arg)
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    lines = load_lines()
+    # Load the models up front so the first size does not include load time
+    categorize_lines(lines[:1])
+    print(f"{'lines':>8} {'per-line (s)':>14} {'batched (s)':>12} {'speedup':>8}")
+    for n in SIZES:
+        meeting = make_meeting(lines, n)
+        t_single, single = timed(per_line, meeting)
+        t_batch, batch = timed(categorize_batch, meeting)
+        for name in meeting:
+            assert [cat for _, cat in single[name]] == [cat for _, cat, _ in batch[name]]
+        print(f"{n:>8} {t_single:>14.4f} {t_batch:>12.4f} {t_single / t_batch:>7.1f}x")
@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+AGENDA = [
+    "What did you do yesterday?",
+    "What will you do today?",
+    "Are there any blockers or impediments?",
+]
+SINGLE_LINES = 50
+
+# One fresh interpreter per backend and thread count, so import cost and RSS are
+# measured on their own. Vectors for every labeled line are saved for comparison.
+PROBE = """
+import csv, json, resource, statistics, sys, time
+start = time.perf_counter()
+from embedding_backend import embedding_backend_from_env
+model = embedding_backend_from_env()
+ready = time.perf_counter() - start
+with open("category_labeled.csv", newline="", encoding="utf-8") as f:
+    lines = [row["text"] for row in csv.DictReader(f)]
+model.embed_text(lines[:1])
+single = []
+for line in lines[:%d]:
+    start = time.perf_counter()
+    model.embed_text([line])
+    single.append(time.perf_counter() - start)
+start = time.perf_counter()
+vectors = model.embed_text(lines)
+batched = time.perf_counter() - start
+import numpy as np
+np.save(sys.argv[1], vectors)
+np.save(sys.argv[2], model.embed_text(%r))
+print(json.dumps({"ready": ready, "single": statistics.median(single), "batched": len(lines) / batched,
+                  "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}))
+""" % (SINGLE_LINES, AGENDA)
+
+def probe(backend, threads, directory):
+    env = {**os.environ, "SCRUM_EMBEDDING_BACKEND": backend, "SCRUM_EMBEDDING_THREADS": str(threads)}
+    lines_path = os.path.join(directory, f"{backend}-{threads}-lines.npy")
+    agenda_path = os.path.join(directory, f"{backend}-{threads}-agenda.npy")
+    out = subprocess.run([sys.executable, "-c", PROBE, lines_path, agenda_path], env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        # Usually a backend that is not installed or not exported yet
+        return None, out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"
+    return {**json.loads(out.stdout), "lines": np.load(lines_path), "agenda": np.load(agenda_path)}, None
+
+if __name__ == "__main__":
+    # The onnx backend needs `python embedding_backend.py export` first
+    directory = tempfile.mkdtemp(prefix="embedding-")
+    results = {}
+    try:
+        for backend in ("torch", "onnx"):
+            for threads in sorted({1, os.cpu_count()}):
+                result, error = probe(backend, threads, directory)
+                if result is None:
+                    print(f"{backend:>6} {threads} threads: skipped ({error})")
+                    continue
+                results[backend] = result
+                print(f"{backend:>6} {threads} threads: import + load {result['ready']:.2f}s, "
+                      f"peak RSS {result['rss'] / 2**20:.0f} MiB, one line {1000 * result['single']:.1f} ms, "
+                      f"batched {result['batched']:.0f} lines/s")
+    finally:
+        shutil.rmtree(directory)
+
+    if len(results) == 2:
+        torch_result, onnx_result = results["torch"], results["onnx"]
+        cosines = np.sum(torch_result["lines"] * onnx_result["lines"], axis=1)
+        # Does the quantized model send each line to the same agenda question?
+        same_topic = np.mean((torch_result["lines"] @ torch_result["agenda"].T).argmax(axis=1)
+                             == (onnx_result["lines"] @ onnx_result["agenda"].T).argmax(axis=1))
+        print(f"onnx vs torch on {len(cosines)} lines: cosine mean {cosines.mean():.4f}, "
+              f"min {cosines.min():.4f}, same best agenda item {same_topic:.1%}")
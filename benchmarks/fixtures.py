@@ -0,0 +1,40 @@
+import csv
+import functools
+import itertools
+import random
+
+from prepare_labeled_data import START_PHRASES, STOP_PHRASES
+
+LABELED_CSV = "category_labeled.csv"
+
+@functools.lru_cache(maxsize=None)
+def labeled_rows(path=LABELED_CSV):
+    with open(path, newline="", encoding="utf-8") as f:
+        return tuple((row["text"], row["label"]) for row in csv.DictReader(f))
+
+def labeled_lines(n=None, path=LABELED_CSV):
+    # The labeled statements, repeated as needed to reach n
+    lines = [text for text, _ in labeled_rows(path)]
+    if n is None:
+        return lines
+    return list(itertools.islice(itertools.cycle(lines), n))
+
+def participant_names(n):
+    return [f"participant{i}" for i in range(n)]
+
+def standup(participants, lines_per_participant=3, seed=0):
+    # {name: [statement, ...]} drawn from the labeled lines
+    rng = random.Random(seed)
+    lines = labeled_lines()
+    return {name: rng.sample(lines, lines_per_participant) for name in participant_names(participants)}
+
+def utterance_stream(participants, lines_per_participant=3, seed=0):
+    # What the recognizer hands process_recognition for a whole standup: a start
+    # command naming each speaker, their statements, then a stop phrase
+    rng = random.Random(seed)
+    utterances = []
+    for name, lines in standup(participants, lines_per_participant, seed).items():
+        utterances.append(f"{rng.choice(START_PHRASES)} {name}")
+        utterances.extend(lines)
+        utterances.append(rng.choice(STOP_PHRASES))
+    return utterances
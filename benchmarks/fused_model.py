@@ -0,0 +1,46 @@
+import csv
+import os
+import pickle
+import sys
+import time
+
+from classification import predict_category, predict_fused_lines, predict_start_stop
+from fused_model import agreement
+from model_registry import ARTIFACT_PATHS, registry
+
+def load_lines(path="category_labeled.csv"):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["text"] for row in csv.DictReader(f)]
+
+def timed_per_line(fn, lines):
+    start = time.perf_counter()
+    for line in lines:
+        fn(line)
+    return (time.perf_counter() - start) / len(lines)
+
+def pickled_size(obj):
+    return len(pickle.dumps(obj))
+
+if __name__ == "__main__":
+    # Needs a published fused model: python train.py fused
+    if not os.path.exists(ARTIFACT_PATHS["fused"]):
+        sys.exit(f"{ARTIFACT_PATHS['fused']} not found, run `python train.py fused` first")
+    lines = load_lines()
+    fused = registry.get("fused")
+    pair = lambda line: (predict_start_stop(line), predict_category(line))
+    fused_one = lambda line: predict_fused_lines([line])[0]
+    pair(lines[0]), fused_one(lines[0])
+
+    t_pair = timed_per_line(pair, lines)
+    t_fused = timed_per_line(fused_one, lines)
+    print(f"both labels per utterance: pair {1e6 * t_pair:.0f} us, fused {1e6 * t_fused:.0f} us "
+          f"({t_pair / t_fused:.1f}x)")
+
+    vocabularies = [registry.get(name).vocabulary_ for name in ("ss_vectorizer", "cat_vectorizer")]
+    print(f"vocabulary dicts held by the pair: {sum(len(v) for v in vocabularies)} terms, "
+          f"{sum(pickled_size(v) for v in vocabularies) / 1024:.0f} KiB pickled; "
+          f"fused vectorizer {pickled_size(fused.vectorizer) / 1024:.0f} KiB pickled")
+    agreed = agreement(fused, lines, (registry.get("ss_vectorizer"), registry.get("ss_clf")),
+                       (registry.get("cat_vectorizer"), registry.get("cat_clf")))
+    print(f"agreement with the pair on {agreed['lines']} lines: start/stop {agreed['start_stop']:.3f}, "
+          f"category {agreed['category']:.3f}")
@@ -0,0 +1,53 @@
+import csv
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from prepare_labeled_data import START_PHRASES, STOP_PHRASES, iter_local_transcripts, labeled_rows, write_rows
+
+MEETINGS = 2000
+LINES_PER_MEETING = 40
+
+def write_corpus(path, meetings, rng):
+    # Same shape as the hub rows: a Python dict literal per meeting
+    with open("category_labeled.csv", newline="", encoding="utf-8") as f:
+        lines = [row["text"] for row in csv.DictReader(f)]
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(meetings):
+            transcript = rng.sample(lines, LINES_PER_MEETING - 2)
+            transcript = [rng.choice(START_PHRASES).capitalize()] + transcript + [rng.choice(STOP_PHRASES).capitalize()]
+            f.write(json.dumps({"Meeting Transcript": repr({"transcript": transcript})}) + "\n")
+
+def run(corpus, output, workers):
+    start = time.perf_counter()
+    counts = write_rows(labeled_rows(iter_local_transcripts(corpus), workers), output)
+    return time.perf_counter() - start, sum(counts.values())
+
+def traced_peak(corpus, output):
+    # Single process so every allocation of the pipeline is visible to tracemalloc
+    tracemalloc.start()
+    write_rows(labeled_rows(iter_local_transcripts(corpus), 1), output)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    directory = tempfile.mkdtemp(prefix="labeling-")
+    try:
+        for scale in (1, 10):
+            corpus = os.path.join(directory, f"corpus-{scale}.jsonl")
+            write_corpus(corpus, scale * MEETINGS, rng)
+            output = os.path.join(directory, "labeled.csv")
+            line = f"{scale * MEETINGS} meetings ({os.path.getsize(corpus) / 2**20:.0f} MiB):"
+            for workers in sorted({1, os.cpu_count()}):
+                elapsed, rows = run(corpus, output, workers)
+                line += f" {workers} workers {rows / elapsed:.0f} lines/s;"
+            print(line)
+            print(f"    peak traced memory: {traced_peak(corpus, output) / 2**20:.1f} MiB")
+    finally:
+        shutil.rmtree(directory)
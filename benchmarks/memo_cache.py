@@ -0,0 +1,34 @@
+import logging
+import os
+import time
+
+from classification import predict_start_stop, start_stop_cache
+from model_registry import ARTIFACT_PATHS, CLASSIFIER_MODELS, registry
+from replay import load_csv_meetings, run
+
+REPEAT = 5
+
+def touch(path):
+    # Bumps the mtime as a retrain would, without changing the file; returns the old times
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    return stat.st_atime_ns, stat.st_mtime_ns
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    registry.warm(CLASSIFIER_MODELS).join()
+    meetings = load_csv_meetings()
+
+    uncached = run(meetings, REPEAT, predict_start_stop)
+    cached = run(meetings, REPEAT, start_stop_cache)
+    print(f"replay with predict_start_stop: {uncached['utterances_per_second']:.0f} utterances/s")
+    print(f"replay with the memo cache:     {cached['utterances_per_second']:.0f} utterances/s "
+          f"({cached['utterances_per_second'] / uncached['utterances_per_second']:.1f}x)")
+    print(f"cache stats: {start_stop_cache.stats()}")
+
+    times = touch(ARTIFACT_PATHS["ss_clf"])
+    time.sleep(start_stop_cache.check_interval)
+    start_stop_cache("that's all")
+    os.utime(ARTIFACT_PATHS["ss_clf"], ns=times)
+    print(f"after touching {ARTIFACT_PATHS['ss_clf']}: {start_stop_cache.stats()}, "
+          f"ss_clf reloaded: {registry.is_loaded('ss_clf')}")
@@ -0,0 +1,37 @@
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from classification import predict_start_stop, predict_start_stop_lines
+from inference_dispatcher import MicroBatcher
+from model_registry import CLASSIFIER_MODELS, registry
+
+CALLERS = 64
+REQUESTS = 20000
+
+def load_lines(path="category_labeled.csv"):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["text"] for row in csv.DictReader(f)]
+
+def throughput(call, lines, callers=CALLERS):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(callers) as pool:
+        results = list(pool.map(call, lines))
+    return len(lines) / (time.perf_counter() - start), results
+
+if __name__ == "__main__":
+    registry.warm(CLASSIFIER_MODELS).join()
+    lines = load_lines()
+    lines = (lines * (REQUESTS // len(lines) + 1))[:REQUESTS]
+
+    base, expected = throughput(predict_start_stop, lines)
+    print(f"unbatched predict_start_stop, {CALLERS} callers: {base:.0f} req/s")
+    for max_batch in (1, 4, 16, 64, 256):
+        batcher = MicroBatcher(predict_start_stop_lines, max_batch=max_batch)
+        rate, results = throughput(batcher, lines)
+        stats = batcher.stats()
+        mismatched = sum(a != b for a, b in zip(expected, results))
+        print(f"max_batch {max_batch:>3}: {rate:.0f} req/s ({rate / base:.1f}x), "
+              f"mean batch {stats['mean_batch_size']:.1f}, {mismatched} mismatches")
+        print(f"    batch sizes {stats['batch_size_histogram']}")
+        print(f"    latency ms  {stats['latency_ms_histogram']}")
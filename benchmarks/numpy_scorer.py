@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+
+LINES = 2000
+
+# Run in a fresh interpreter per backend so import time and RSS are not shared
+PROBE = """
+import csv, json, resource, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+from classification import predict_category, predict_start_stop
+from model_registry import CLASSIFIER_MODELS, registry
+for name in CLASSIFIER_MODELS:
+    registry.get(name)
+ready = time.perf_counter() - start
+with open("category_labeled.csv", newline="", encoding="utf-8") as f:
+    lines = [row["text"] for row in csv.DictReader(f)][:%d]
+start = time.perf_counter()
+for line in lines:
+    predict_start_stop(line)
+    predict_category(line)
+per_line = (time.perf_counter() - start) / len(lines)
+print(json.dumps({"ready": ready, "per_line": per_line,
+                  "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}))
+""" % LINES
+
+def probe(backend):
+    env = {**os.environ, "SCRUM_CLASSIFIER": backend}
+    out = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+if __name__ == "__main__":
+    # Needs the .npz exports: python numpy_scorer.py
+    for backend in ("pair", "numpy"):
+        result = probe(backend)
+        print(f"{backend:>6}: import + load {1000 * result['ready']:.0f} ms, "
+              f"peak RSS {result['rss'] / 2**20:.0f} MiB, "
+              f"start/stop + category {1e6 * result['per_line']:.0f} us per line")
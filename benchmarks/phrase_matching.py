@@ -0,0 +1,60 @@
+import ast
+import time
+
+from datasets import load_dataset
+
+from phrase_matcher import START_KEYWORDS, STOP_KEYWORDS, command_matcher
+from prepare_labeled_data import START_PHRASES, STOP_PHRASES, label_start_stop
+
+PARTICIPANTS = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi"]
+
+def load_transcript_lines():
+    mom_meetings = load_dataset("sasvata/MOM-Summary-Dataset")['train']
+    lines = []
+    for row in mom_meetings:
+        try:
+            lines.extend(ast.literal_eval(row['Meeting Transcript']).get('transcript', []))
+        except Exception:
+            continue
+    return lines
+
+# The loops the matcher replaced, kept here as the baseline
+def loop_label(text):
+    text_l = text.lower().strip()
+    for phrase in START_PHRASES:
+        if phrase in text_l:
+            return "start"
+    for phrase in STOP_PHRASES:
+        if phrase in text_l:
+            return "stop"
+    return "other"
+
+def loop_command(text):
+    is_start = any(phrase in text for phrase in START_KEYWORDS)
+    is_stop = any(phrase in text for phrase in STOP_KEYWORDS)
+    name = next((name for name in PARTICIPANTS if name in text), None)
+    return is_start, is_stop, name
+
+def matcher_command(text, matcher=command_matcher(PARTICIPANTS)):
+    found = matcher.find(text)
+    name = found["participant"][0] if "participant" in found else None
+    return "start" in found, "stop" in found, name
+
+def timed(fn, lines):
+    start = time.perf_counter()
+    results = [fn(line) for line in lines]
+    return time.perf_counter() - start, results
+
+def report(title, baseline, candidate, lines):
+    t_base, base = timed(baseline, lines)
+    t_new, new = timed(candidate, lines)
+    disagree = sum(a != b for a, b in zip(base, new))
+    print(f"{title}: loops {t_base:.3f}s, matcher {t_new:.3f}s "
+          f"({t_base / t_new:.1f}x), {disagree} of {len(lines)} lines differ")
+
+if __name__ == "__main__":
+    lines = load_transcript_lines()
+    report("label_start_stop", loop_label, label_start_stop, lines)
+    lowered = [line.strip().lower() for line in lines]
+    # Differences here come from word-boundary matching ("started" no longer matches "start")
+    report("process_recognition keywords", loop_command, matcher_command, lowered)
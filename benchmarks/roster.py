@@ -0,0 +1,79 @@
+import time
+import tracemalloc
+
+from meeting_server import RoomManager
+from roster import ParticipantState, Roster
+
+ROSTER_SIZES = [10, 1000, 20000]
+SERVER_ROOMS = 200
+SERVER_ROSTER = 50
+
+# The dict-of-dicts records and the list-building scan the roster replaced
+def dict_roster(n):
+    return {f"p{i}": {"T_alloc": 60, "T_used": 0, "state": ParticipantState.WAITING,
+                      "start_time": None, "spoken_lines": [], "classified": []} for i in range(n)}
+
+def dict_next_waiting(participants):
+    waiting = [p for p, d in participants.items() if d["state"] == ParticipantState.WAITING]
+    return waiting[0] if waiting else None
+
+def slotted_roster(n):
+    roster = Roster()
+    for i in range(n):
+        roster.add(f"p{i}", 60)
+    return roster
+
+def traced(build, n):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(n)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, result
+
+def run_through_dicts(participants):
+    # Every participant speaks once, in the order get_next_waiting hands them out
+    start = time.perf_counter()
+    while (name := dict_next_waiting(participants)) is not None:
+        participants[name]["state"] = ParticipantState.SPEAKING
+        participants[name]["state"] = ParticipantState.DONE
+    return time.perf_counter() - start
+
+def run_through_roster(roster):
+    start = time.perf_counter()
+    while (name := roster.next_waiting()) is not None:
+        roster.start(name, 0.0)
+        roster.finish(name, 1.0)
+    return time.perf_counter() - start
+
+def server_rooms(n):
+    manager = RoomManager(dispatcher=None, classify_batch=None)
+    for i in range(n):
+        manager.create_room(f"room-{i}", {f"p{j}": 60 for j in range(SERVER_ROSTER)})
+    return manager
+
+if __name__ == "__main__":
+    for n in ROSTER_SIZES:
+        dict_bytes, participants = traced(dict_roster, n)
+        roster_bytes, roster = traced(slotted_roster, n)
+        # The dict scan is quadratic over a full meeting, so it is skipped for the largest roster
+        dict_time = f"{1000 * run_through_dicts(participants):.2f} ms" if n <= 1000 else "skipped"
+        t_roster = run_through_roster(roster)
+        print(f"{n:>6} participants: dicts {dict_bytes / n:.0f} B each, slotted {roster_bytes / n:.0f} B each; "
+              f"full meeting get_next_waiting dicts {dict_time}, roster {1000 * t_roster:.2f} ms")
+
+    lookups = 200000
+    participants, roster = dict_roster(1000), slotted_roster(1000)
+    start = time.perf_counter()
+    for i in range(lookups):
+        participants["p500"]["T_used"] + participants["p500"]["T_alloc"]
+    t_dict = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(lookups):
+        roster["p500"].T_used + roster["p500"].T_alloc
+    t_roster = time.perf_counter() - start
+    print(f"field reads: dicts {1e9 * t_dict / lookups:.0f} ns, slotted {1e9 * t_roster / lookups:.0f} ns per pair")
+
+    server_bytes, _ = traced(server_rooms, SERVER_ROOMS)
+    print(f"server mode: {SERVER_ROOMS} rooms x {SERVER_ROSTER} participants, "
+          f"{server_bytes / SERVER_ROOMS / 1024:.1f} KiB per room")
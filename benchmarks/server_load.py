@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+import tracemalloc
+
+from meeting_server import RoomManager
+from model_registry import CLASSIFIER_MODELS, registry
+from replay import load_csv_meetings, split_speaker
+
+ROOMS = 200
+# Seconds between utterances in a room; the rooms overlap so the loop sees real concurrency
+PACE = 0.02
+
+async def run_room(manager, room_id, lines, latencies):
+    utterances = [split_speaker(line) for line in lines]
+    speakers = {speaker: 60 for speaker, _ in utterances if speaker}
+    room = manager.create_room(room_id, speakers)
+    room.command("start_meeting")
+
+    async def say(text):
+        start = time.perf_counter()
+        await room.utterance(text)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(PACE)
+    for speaker, text in utterances:
+        if speaker and speaker != room.engine.current_speaker:
+            if room.engine.current_speaker is not None:
+                await say("that's all")
+            await say(f"{speaker}, your turn")
+        await say(text)
+    room.command("end_meeting")
+
+async def loop_lag(samples, stop, interval=0.01):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+async def main(rooms, use_models):
+    meetings = load_csv_meetings()
+    if use_models:
+        registry.warm(CLASSIFIER_MODELS).join()
+        manager = RoomManager()
+    else:
+        manager = RoomManager(dispatcher=None, classify_batch=None)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(rooms):
+        meeting = meetings[i % len(meetings)]
+        manager.create_room(f"probe-{i}", {speaker: 60 for speaker, _ in map(split_speaker, meeting) if speaker})
+    per_room = (tracemalloc.get_traced_memory()[0] - before) / rooms
+    tracemalloc.stop()
+    for room_id in list(manager.rooms):
+        manager.close_room(room_id)
+
+    latencies, lag = [], []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(loop_lag(lag, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(run_room(manager, f"room-{i}", meetings[i % len(meetings)], latencies)
+                           for i in range(rooms)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await lag_task
+    if manager.classifier is not None:
+        await asyncio.get_running_loop().run_in_executor(None, manager.classifier.wait)
+
+    latencies.sort()
+    print(f"{rooms} rooms, {len(latencies)} utterances in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s), "
+          f"models {'shared' if use_models else 'off'}")
+    print(f"utterance latency: median {1000 * statistics.median(latencies):.2f} ms, "
+          f"p99 {1000 * latencies[int(0.99 * (len(latencies) - 1))]:.2f} ms")
+    print(f"event loop lag: mean {1000 * statistics.mean(lag):.2f} ms, max {1000 * max(lag):.2f} ms")
+    print(f"memory per room: {per_room / 1024:.1f} KiB, process max RSS: "
+          f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    print(manager.stats())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=ROOMS)
+    parser.add_argument("--no-models", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.rooms, not args.no_models))
@@ -0,0 +1,378 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import labeled_lines, participant_names, standup, utterance_stream
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+# A case is flagged when its best time per unit moves by more than this fraction
+THRESHOLD = 0.25
+# Each timed sample repeats run() until it takes at least this long, so short
+# cases are not dominated by timer resolution and scheduling noise
+MIN_SAMPLE_SECONDS = 0.2
+# Results are only compared against a baseline measured with the same backends
+COMPARABLE_META = ("classifier_backend", "embedding_backend")
+
+BENCHMARKS = {}
+
+def benchmark(name, repeat=7):
+    # Registers a case. The decorated function does the setup and returns
+    # (run, units): run() does the measured work once, over `units` items.
+    def register(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+    return register
+
+class Skip(Exception):
+    # Raised by a setup when what it measures is not available here
+    pass
+
+# --- model load --------------------------------------------------------------
+
+def cold_start(code):
+    # A fresh interpreter, so imports and artifact loads are paid in full
+    def run():
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True)
+    return run, 1
+
+@benchmark("model_load.classifiers", repeat=3)
+def model_load_classifiers():
+    warm_classifiers()
+    return cold_start("from model_registry import CLASSIFIER_MODELS, registry\n"
+                      "for name in CLASSIFIER_MODELS: registry.get(name)")
+
+@benchmark("model_load.embedding", repeat=3)
+def model_load_embedding():
+    from model_registry import registry
+    try:
+        registry.get("sim_model")
+    except (ImportError, OSError) as e:
+        raise Skip(f"embedding backend unavailable: {e}")
+    return cold_start("from model_registry import registry; registry.get('sim_model')")
+
+# --- classification ----------------------------------------------------------
+
+def warm_classifiers():
+    # Loads the classifiers up front; raises Skip when they cannot be loaded here
+    # (e.g. the pair backend without scikit-learn installed)
+    from model_registry import CLASSIFIER_MODELS, registry
+    try:
+        for name in CLASSIFIER_MODELS:
+            registry.get(name)
+    except (ImportError, OSError) as e:
+        raise Skip(f"classifiers unavailable: {e}")
+
+def classifier_cases(name, single, batched, cached, cache):
+    @benchmark(f"{name}.single")
+    def per_line():
+        warm_classifiers()
+        lines = labeled_lines(200)
+        return lambda: [single(line) for line in lines], len(lines)
+
+    @benchmark(f"{name}.batched")
+    def batch():
+        warm_classifiers()
+        lines = labeled_lines(2000)
+        return lambda: batched(lines), len(lines)
+
+    @benchmark(f"{name}.cached")
+    def memoized():
+        # The per-utterance entry point once the phrases have been seen before
+        warm_classifiers()
+        lines = labeled_lines(2000)
+        cache.clear()
+        for line in lines:
+            cached(line)
+        return lambda: [cached(line) for line in lines], len(lines)
+
+def register_classifier_cases():
+    import classification
+    from model_registry import CLASSIFIER_BACKEND
+    if CLASSIFIER_BACKEND == "fused":
+        single_ss = single_cat = lambda line: classification.predict_fused_lines([line])[0]
+        batch_ss = batch_cat = classification.predict_fused_lines
+        ss_cache = cat_cache = classification.fused_cache
+    else:
+        single_ss, batch_ss, ss_cache = (classification.predict_start_stop, classification.predict_start_stop_lines,
+                                         classification.start_stop_cache)
+        single_cat, batch_cat, cat_cache = (classification.predict_category, classification.predict_categories,
+                                            classification.category_cache)
+    classifier_cases("detect_start_stop", single_ss, batch_ss, classification.detect_start_stop, ss_cache)
+    classifier_cases("categorize_statement", single_cat, batch_cat, classification.categorize_statement, cat_cache)
+
+register_classifier_cases()
+
+# --- process_recognition -----------------------------------------------------
+
+def recognition_case(name, with_classifier):
+    @benchmark(name)
+    def setup():
+        # The headless half of process_recognition: interpret the utterance, then
+        # record the statement or apply the command, for a 20 person standup
+        import classification
+        from classification import detect_start_stop
+        from meeting_engine import ManualClock, MeetingEngine
+        if with_classifier:
+            warm_classifiers()
+        utterances = utterance_stream(20)
+        # detect_start_stop is memoized; every run starts cold like a new process,
+        # otherwise the warm-up run leaves only cache hits to time
+        cache = classification.fused_cache if classification.USE_FUSED else classification.start_stop_cache
+
+        def run():
+            cache.clear()
+            clock = ManualClock()
+            engine = MeetingEngine(clock=clock, detect_start_stop=detect_start_stop if with_classifier else None)
+            for name in participant_names(20):
+                engine.add_participant(name, 60)
+            engine.start()
+            for text in utterances:
+                clock.advance(2.0)
+                engine.feed(text)
+            engine.end()
+        return run, len(utterances)
+
+recognition_case("process_recognition.keywords", with_classifier=False)
+recognition_case("process_recognition.classifier", with_classifier=True)
+
+# --- meeting summary ---------------------------------------------------------
+
+def summary_case(participants):
+    @benchmark(f"summary.{participants}_participants")
+    def setup():
+        # Categorize every statement in one batch and build the rows the summary
+        # dialog and the analytics store are made from
+        from analytics_store import meeting_summary
+        from classification import categorize_batch
+        from roster import Roster
+        warm_classifiers()
+        meeting = standup(participants)
+        roster = Roster()
+        for name in meeting:
+            roster.add(name, 60).T_used = 45.0
+
+        def run():
+            results = categorize_batch(meeting)
+            rows = meeting_summary(roster, results)
+            by_category = {}
+            for name, statements in results.items():
+                for line, category, _ in statements:
+                    by_category.setdefault(category, []).append((name, line))
+            return rows, by_category
+        return run, participants
+
+for _participants in (10, 100, 1000):
+    summary_case(_participants)
+
+# --- embedding similarity ----------------------------------------------------
+
+@benchmark("embedding.agenda_similarity")
+def agenda_similarity():
+    from agenda_similarity import AgendaSimilarity
+    from model_registry import registry
+    try:
+        model = registry.get("sim_model")
+    except (ImportError, OSError) as e:
+        raise Skip(f"embedding backend unavailable: {e}")
+    similarity = AgendaSimilarity(model.embed_text, ["What did you do yesterday?", "What will you do today?",
+                                                     "Are there any blockers or impediments?"])
+    lines = labeled_lines(64)
+    similarity.topic_matrix
+    return lambda: similarity.score_matrix(lines), len(lines)
+
+@benchmark("embedding.blocker_search")
+def blocker_search():
+    # Search over 20k past blockers, with unit vectors standing in for embeddings
+    from vector_index import FlatIndex
+    rng = np.random.default_rng(0)
+    index = FlatIndex(384)
+    index.add(rng.standard_normal((20000, 384), dtype=np.float32))
+    queries = rng.standard_normal((32, 384), dtype=np.float32)
+    return lambda: index.search(queries, k=3), len(queries)
+
+# --- timer and command storm -------------------------------------------------
+
+@benchmark("storm.commands")
+def command_storm():
+    # 8 threads posting start/stop commands for 50 participants; the engine
+    # applies them as the Tk thread would
+    from command_bus import CommandBus
+    from meeting_engine import ManualClock, MeetingEngine
+    names = participant_names(50)
+    posts = 2000
+
+    def run():
+        engine = MeetingEngine(clock=ManualClock())
+        for name in names:
+            engine.add_participant(name, 60)
+        engine.start()
+        lock = threading.Lock()
+
+        def schedule(drain):
+            with lock:
+                drain()
+        bus = CommandBus(engine.handle_command, schedule)
+
+        def poster(offset):
+            for i in range(posts // 8):
+                name = names[(offset + i) % len(names)]
+                bus.post("start", name)
+                bus.post("stop", name)
+        threads = [threading.Thread(target=poster, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        bus.drain()
+    return run, 2 * posts
+
+@benchmark("storm.timers")
+def timer_storm():
+    # Every speaker change reschedules the warning and exceeded timers
+    from timer_scheduler import TimerScheduler
+    timer = TimerScheduler()
+    changes = 5000
+
+    def run():
+        for i in range(changes):
+            timer.schedule("warning", 30 + i % 7, lambda: None)
+            timer.schedule("exceeded", 60 + i % 7, lambda: None)
+            if i % 3 == 0:
+                timer.cancel("warning")
+        timer.clear()
+    return run, changes
+
+# --- runner ------------------------------------------------------------------
+
+def loops_per_sample(run):
+    # Like timeit's autorange: doubles the loop count until one sample takes
+    # MIN_SAMPLE_SECONDS. The first call is also the untimed warm-up.
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS:
+            return loops
+        loops *= 2
+
+def measure(name):
+    setup, repeat = BENCHMARKS[name]
+    try:
+        run, units = setup()
+    except Skip as e:
+        return {"skipped": str(e)}
+    loops = loops_per_sample(run)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        times.append((time.perf_counter() - start) / (loops * units))
+    return {"median": statistics.median(times), "min": min(times), "repeat": repeat, "loops": loops, "units": units}
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "classifier_backend": os.environ.get("SCRUM_CLASSIFIER", "pair"),
+        "embedding_backend": os.environ.get("SCRUM_EMBEDDING_BACKEND", "torch"),
+    }
+
+def incomparable(meta, baseline_meta):
+    # The COMPARABLE_META settings that differ from the baseline's, as "key: before -> now"
+    return [f"{key}: {baseline_meta.get(key)} -> {meta.get(key)}"
+            for key in COMPARABLE_META if meta.get(key) != baseline_meta.get(key)]
+
+def compare(results, baseline, threshold=THRESHOLD):
+    # {name: (ratio, verdict)} for cases measured in both runs; ratio > 1 is slower.
+    # Compares the best sample of each run, which is far less noisy than the median.
+    verdicts = {}
+    for name, result in results.items():
+        before = baseline.get(name, {})
+        if "min" not in result or "min" not in before:
+            continue
+        ratio = result["min"] / before["min"]
+        verdict = "REGRESSION" if ratio > 1 + threshold else "faster" if ratio < 1 / (1 + threshold) else "same"
+        verdicts[name] = (ratio, verdict)
+    return verdicts
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return f"{seconds * scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("-k", "--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--output", help=f"results JSON (default: {RESULTS_DIR}/<commit>-<time>.json)")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, metavar="BASELINE",
+                        help=f"compare against a results file (default {BASELINE}); exits 1 on regressions")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {BASELINE}")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        differences = incomparable(metadata(), baseline.get("meta", {}))
+        if differences:
+            print(f"not comparable with {args.compare}, it was measured with other backends: "
+                  f"{'; '.join(differences)}")
+            return 2
+        baseline = baseline["results"]
+    results = {}
+    for name in names:
+        results[name] = result = measure(name)
+        if "skipped" in result:
+            print(f"{name:<40} skipped: {result['skipped']}")
+        else:
+            print(f"{name:<40} {format_time(result['median']):>10} per unit (min {format_time(result['min'])})")
+
+    run = {"meta": metadata(), "threshold": args.threshold, "results": results}
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"{run['meta']['commit'] or 'run'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    paths = [output] + ([BASELINE] if args.save_baseline else [])
+    for path in paths:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+    print(f"results written to {', '.join(paths)}")
+
+    if not args.compare:
+        return 0
+    verdicts = compare(results, baseline, args.threshold)
+    regressions = [name for name, (_, verdict) in verdicts.items() if verdict == "REGRESSION"]
+    print(f"\ncompared with {args.compare}:")
+    for name, (ratio, verdict) in verdicts.items():
+        print(f"{name:<40} {ratio:>6.2f}x  {verdict}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
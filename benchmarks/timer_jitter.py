@@ -0,0 +1,46 @@
+import threading
+import time
+
+from timer_scheduler import TimerScheduler
+
+SPEAKER_CHANGES = 500
+DEADLINES = 200
+
+def polling_threads(changes):
+    # The old monitor_speaker_time: one sleeping thread per set_speaker call,
+    # each exiting only on its next one-second wakeup
+    current = {"speaker": None}
+
+    def monitor(participant):
+        while current["speaker"] == participant:
+            time.sleep(1)
+    before = threading.active_count()
+    for i in range(changes):
+        current["speaker"] = i
+        threading.Thread(target=monitor, args=(i,), daemon=True).start()
+    peak = threading.active_count() - before
+    current["speaker"] = None
+    return peak
+
+def scheduler_threads(changes):
+    timer = TimerScheduler()
+    before = threading.active_count()
+    for i in range(changes):
+        timer.schedule("exceeded", 60, lambda: None)
+    return threading.active_count() - before
+
+def scheduler_jitter(count):
+    timer = TimerScheduler()
+    done = threading.Event()
+    for i in range(count):
+        timer.schedule(i, 0.001 * i, done.set if i == count - 1 else (lambda: None))
+    done.wait(5)
+    return timer.stats()
+
+if __name__ == "__main__":
+    print(f"{SPEAKER_CHANGES} rapid speaker changes:")
+    print(f"  polling monitor threads alive: {polling_threads(SPEAKER_CHANGES)}")
+    print(f"  scheduler threads alive:       {scheduler_threads(SPEAKER_CHANGES)}")
+    stats = scheduler_jitter(DEADLINES)
+    print(f"{DEADLINES} deadlines: mean jitter {stats['mean_jitter_ms']:.3f} ms, "
+          f"max jitter {stats['max_jitter_ms']:.3f} ms (polling loop: up to 1000 ms)")
@@ -0,0 +1,49 @@
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from replay import load_csv_meetings, split_speaker
+from transcript_store import TranscriptStore
+
+RECORDS = 500000
+# tracemalloc slows allocation down a lot, so memory is measured on a separate run
+TRACED_RECORDS = 100000
+
+def utterances():
+    lines = [split_speaker(line) for meeting in load_csv_meetings() for line in meeting]
+    while True:
+        yield from lines
+
+def write(store, count):
+    source = utterances()
+    for i in range(count):
+        speaker, text = next(source)
+        store.record(f"meeting-{i // 500}", float(i), speaker, text, category="yesterday")
+    store.close()
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp(prefix="transcripts-")
+    try:
+        store = TranscriptStore(directory)
+        start = time.perf_counter()
+        write(store, RECORDS)
+        elapsed = time.perf_counter() - start
+        print(f"{RECORDS} records in {elapsed:.2f}s ({RECORDS / elapsed:.0f}/s)")
+        print(store.stats())
+
+        start = time.perf_counter()
+        rows = list(store.scan(meeting="meeting-700"))
+        print(f"scan one meeting: {len(rows)} records in {1000 * (time.perf_counter() - start):.0f} ms")
+    finally:
+        shutil.rmtree(directory)
+
+    directory = tempfile.mkdtemp(prefix="transcripts-")
+    try:
+        tracemalloc.start()
+        write(TranscriptStore(directory), TRACED_RECORDS)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"peak traced memory while writing {TRACED_RECORDS} records: {peak / 1024:.0f} KiB")
+    finally:
+        shutil.rmtree(directory)
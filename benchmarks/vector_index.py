@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from vector_index import BlockerIndex, FlatIndex, HNSWIndex
+
+DIM = 384
+SIZES = [10000, 100000]
+QUERIES = 200
+K = 10
+MEETING_BLOCKERS = 16
+
+def clustered_vectors(n, rng, clusters=500):
+    # Sentence embeddings are far from uniform; clusters with noise are a closer stand-in
+    centers = rng.standard_normal((clusters, DIM)).astype(np.float32)
+    return centers[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, DIM)).astype(np.float32)
+
+def per_query_ms(index, queries):
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query[None, :], K)
+    return 1000 * (time.perf_counter() - start) / len(queries)
+
+def recall(exact_ids, approx_ids):
+    return np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(exact_ids.tolist(), approx_ids.tolist())])
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    for n in SIZES:
+        data = clustered_vectors(n, rng)
+        queries = clustered_vectors(QUERIES, rng)
+        flat = FlatIndex(DIM)
+        flat.add(data)
+        exact_ids, _ = flat.search(queries, K)
+        start = time.perf_counter()
+        flat.search(queries, K)
+        batched = 1000 * (time.perf_counter() - start) / QUERIES
+        print(f"{n} vectors, flat: {per_query_ms(flat, queries):.2f} ms/query, {batched:.3f} ms/query batched")
+        try:
+            hnsw = HNSWIndex(DIM)
+        except ImportError:
+            print("    hnsw: hnswlib not installed, skipped")
+            continue
+        start = time.perf_counter()
+        hnsw.add(data)
+        build = time.perf_counter() - start
+        approx_ids, _ = hnsw.search(queries, K)
+        print(f"    hnsw: {per_query_ms(hnsw, queries):.2f} ms/query, recall@{K} {recall(exact_ids, approx_ids):.3f}, "
+              f"built in {build:.1f}s")
+
+    # Incremental inserts as meetings end, and the reload on the next start
+    directory = tempfile.mkdtemp(prefix="blocker-index-")
+    try:
+        index = BlockerIndex(directory, backend="flat", dim=DIM)
+        meetings = 2000
+        start = time.perf_counter()
+        for m in range(meetings):
+            vectors = clustered_vectors(MEETING_BLOCKERS, rng)
+            index.add(vectors, [{"meeting": f"m{m}", "participant": f"p{i}", "text": ""} for i in range(MEETING_BLOCKERS)])
+        insert = 1000 * (time.perf_counter() - start) / meetings
+        start = time.perf_counter()
+        reloaded = BlockerIndex(directory, backend="flat", dim=DIM)
+        print(f"{meetings} meetings x {MEETING_BLOCKERS} blockers: {insert:.2f} ms per meeting insert, "
+              f"reload of {len(reloaded)} vectors {time.perf_counter() - start:.2f}s, "
+              f"search {per_query_ms(reloaded.index, clustered_vectors(QUERIES, rng)):.2f} ms/query")
+    finally:
+        shutil.rmtree(directory)
@@ -1,17 +1,5 @@
-import joblib
-
-cat_vectorizer = joblib.load("category_vectorizer.joblib")
-cat_clf = joblib.load("category_classifier.joblib")
-ss_vectorizer = joblib.load("startstop_vectorizer.joblib")
-ss_clf = joblib.load("startstop_classifier.joblib")
-
-def categorize_statement(statement):
-    X = cat_vectorizer.transform([statement])
-    return cat_clf.predict(X)[0]
-
-def detect_start_stop(statement):
-    X = ss_vectorizer.transform([statement])
-    return ss_clf.predict(X)[0]
+from classification import categorize_statement, detect_start_stop
+from model_registry import registry
 
 # Example usage:
 print(categorize_statement("Yesterday I fixed a bug in the deployment script."))
@@ -21,3 +9,6 @@ print(categorize_statement("I'm blocked by a missing permission."))
 print(detect_start_stop("I'm done"))
 print(detect_start_stop("Let me begin"))
 print(detect_start_stop("That's all"))
+
+for name, seconds in registry.load_times.items():
+    print(f"Loaded {name} in {seconds:.3f}s")
@@ -0,0 +1,94 @@
+import logging
+
+from memo_cache import MemoCache
+from model_registry import CLASSIFIER_BACKEND, registry
+
+def predict_category(statement):
+    X = registry.get("cat_vectorizer").transform([statement])
+    cat = registry.get("cat_clf").predict(X)[0]
+    logging.debug(f"Categorized '{statement}' as {cat}")
+    return cat
+
+def predict_start_stop(statement):
+    X = registry.get("ss_vectorizer").transform([statement])
+    val = registry.get("ss_clf").predict(X)[0]
+    logging.debug(f"Start/stop classifier: '{statement}' -> {val}")
+    return val
+
+def predict_start_stop_lines(lines):
+    # Batched predict_start_stop: one transform and one predict for all lines
+    if not lines:
+        return []
+    X = registry.get("ss_vectorizer").transform(lines)
+    return [str(val) for val in registry.get("ss_clf").predict(X)]
+
+def predict_categories(lines):
+    # Batched predict_category: labels only, in input order
+    if not lines:
+        return []
+    X = registry.get("cat_vectorizer").transform(lines)
+    return [str(cat) for cat in registry.get("cat_clf").predict(X)]
+
+def predict_fused_lines(lines):
+    # Both labels from the fused model in one pass: [(action, category, probability), ...]
+    if not lines:
+        return []
+    return [(str(action), str(cat), float(score))
+            for action, cat, score in registry.get("fused").predict_with_scores(lines)]
+
+# The same short phrases ("that's all", "your turn") recur in every standup, so
+# the per-utterance calls go through a cache keyed by normalized text. Both are
+# cleared and their models reloaded when the joblib files change on disk.
+start_stop_cache = MemoCache(predict_start_stop, predict_start_stop_lines, models=("ss_vectorizer", "ss_clf"))
+category_cache = MemoCache(predict_category, predict_categories, models=("cat_vectorizer", "cat_clf"))
+# With the fused model one entry holds both labels, so an utterance classified as
+# it is heard is not tokenized again when it is categorized for the summary
+fused_cache = MemoCache(lambda text: predict_fused_lines([text])[0], predict_fused_lines, models=("fused",))
+USE_FUSED = CLASSIFIER_BACKEND == "fused"
+
+def detect_start_stop(statement):
+    if USE_FUSED:
+        return fused_cache(statement)[0]
+    return start_stop_cache(statement)
+
+def categorize_statement(statement):
+    if USE_FUSED:
+        return fused_cache(statement)[1]
+    return category_cache(statement)
+
+def detect_start_stop_lines(lines):
+    if USE_FUSED:
+        return [action for action, _, _ in fused_cache.many(lines)]
+    return start_stop_cache.many(lines)
+
+def categorize_statements(lines):
+    if USE_FUSED:
+        return [cat for _, cat, _ in fused_cache.many(lines)]
+    return category_cache.many(lines)
+
+def categorize_lines(lines):
+    # One sparse transform and one predict_proba for the whole batch.
+    # Returns (category, probability) per line, in input order.
+    if not lines:
+        return []
+    if USE_FUSED:
+        return [(cat, score) for _, cat, score in fused_cache.many(lines)]
+    cat_clf = registry.get("cat_clf")
+    X = registry.get("cat_vectorizer").transform(lines)
+    proba = cat_clf.predict_proba(X)
+    best = proba.argmax(axis=1)
+    cats = cat_clf.classes_[best]
+    scores = proba[range(len(lines)), best]
+    return [(str(cat), float(score)) for cat, score in zip(cats, scores)]
+
+def categorize_batch(lines_by_participant):
+    # {name: [line, ...]} -> {name: [(line, category, probability), ...]}
+    names, lines = [], []
+    for name, spoken_lines in lines_by_participant.items():
+        names.extend([name] * len(spoken_lines))
+        lines.extend(spoken_lines)
+    results = {name: [] for name in lines_by_participant}
+    for name, line, (cat, score) in zip(names, lines, categorize_lines(lines)):
+        results[name].append((line, cat, score))
+    logging.debug(f"Categorized {len(lines)} statements for {len(results)} participants in one batch")
+    return results
@@ -0,0 +1,71 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+class ClassificationWorker:
+    # Classifies utterances on a background thread while the meeting runs.
+    # `classify_batch` takes a list of texts and returns one result per text;
+    # each wakeup drains everything queued so bursts are classified together.
+    def __init__(self, classify_batch, max_batch=64, latency_samples=1000):
+        self.classify_batch = classify_batch
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.latencies = deque(maxlen=latency_samples)
+
+    def submit(self, text, store):
+        # store(result) is called from the worker thread once the text is classified
+        self._queue.put((text, store, time.perf_counter()))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def then(self, fn):
+        # fn() is called from the worker thread once everything submitted before it is stored
+        self.submit(None, lambda _: fn())
+
+    def _run(self):
+        while True:
+            # A then() marker ends the batch, so it runs after the lines queued before it
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch and batch[-1][0] is not None:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [item for item in batch if item[0] is not None]
+            try:
+                if lines:
+                    results = self.classify_batch([text for text, _, _ in lines])
+                    done = time.perf_counter()
+                    for (text, store, queued_at), result in zip(lines, results):
+                        store(result)
+                        self.latencies.append(done - queued_at)
+                    self.processed += len(lines)
+            except Exception as e:
+                logging.error(f"Background classification failed for {len(lines)} lines: {e}")
+            try:
+                if batch[-1][0] is None:
+                    batch[-1][1](None)
+            except Exception as e:
+                logging.error(f"Classification worker callback failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def wait(self):
+        self._queue.join()
+
+    def stats(self):
+        latencies = list(self.latencies)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "processed": self.processed,
+            "mean_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_latency_ms": 1000 * max(latencies) if latencies else 0.0,
+        }
@@ -0,0 +1,58 @@
+import logging
+import threading
+import time
+from collections import deque
+
+# Identical commands posted within this many seconds of each other are handled once
+COALESCE_WINDOW = 1.0
+
+class CommandBus:
+    # Delivers commands posted from any thread to a handler on the consumer
+    # thread. `schedule` runs a callable on that thread (for Tk, root.after), and
+    # a burst of posts only schedules one drain, so nothing polls while idle.
+    def __init__(self, handler, schedule, clock=time.monotonic, latency_samples=1000):
+        self.handler = handler
+        self.schedule = schedule
+        self.clock = clock
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._drain_scheduled = False
+        self._last = None
+        self.handled = 0
+        self.coalesced = 0
+        self.latencies = deque(maxlen=latency_samples)
+
+    def post(self, command, participant):
+        with self._lock:
+            self._pending.append((command, participant, self.clock()))
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self.schedule(self.drain)
+
+    def drain(self):
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+            self._drain_scheduled = False
+        for command, participant, posted_at in batch:
+            waited = self.clock() - posted_at
+            self.latencies.append(waited)
+            if self._last and self._last[:2] == (command, participant) and posted_at - self._last[2] < COALESCE_WINDOW:
+                self.coalesced += 1
+                logging.debug(f"Coalesced duplicate command: {command} for {participant}")
+                continue
+            self._last = (command, participant, posted_at)
+            self.handled += 1
+            logging.debug(f"Handling command: {command} for {participant} after {waited * 1000:.1f} ms in queue")
+            self.handler(command, participant)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "handled": self.handled,
+            "coalesced": self.coalesced,
+            "pending": len(self._pending),
+            "median_wait_ms": 1000 * latencies[len(latencies) // 2] if latencies else 0.0,
+            "max_wait_ms": 1000 * latencies[-1] if latencies else 0.0,
+        }
@@ -0,0 +1,151 @@
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from embedding_cache import normalize_rows
+
+SIM_MODEL_NAME = "all-MiniLM-L6-v2"
+ONNX_DIRECTORY = "minilm_onnx"
+ONNX_MODEL = "model.int8.onnx"
+ONNX_FLOAT_MODEL = "model.onnx"
+BATCH_SIZE = 32
+
+def torch_model_id(model_name):
+    return f"torch-{model_name}"
+
+def onnx_model_id(directory, model_file=ONNX_MODEL):
+    return f"onnx-{os.path.basename(os.path.normpath(directory))}-{model_file}"
+
+def embedding_threads_from_env():
+    # SCRUM_EMBEDDING_THREADS caps the threads either backend uses (default: library default)
+    threads = os.environ.get("SCRUM_EMBEDDING_THREADS")
+    return int(threads) if threads else None
+
+class TorchEmbedder:
+    # sentence-transformers on PyTorch. Importing torch is paid on construction.
+    def __init__(self, model_name=SIM_MODEL_NAME, threads=None):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.model_id = torch_model_id(model_name)
+
+    def embed_text(self, texts):
+        # One normalized float32 row per text
+        return np.asarray(self.model.encode(list(texts), batch_size=BATCH_SIZE, convert_to_numpy=True,
+                                            normalize_embeddings=True), dtype=np.float32)
+
+class OnnxEmbedder:
+    # The same MiniLM exported to ONNX with int8 weights (see export_onnx), run by
+    # ONNX Runtime with the Rust tokenizer. Neither needs torch. Mean pooling and
+    # normalization follow the sentence-transformers model.
+    def __init__(self, directory=ONNX_DIRECTORY, threads=None, model_file=ONNX_MODEL):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        with open(os.path.join(directory, "embedding.json"), encoding="utf-8") as f:
+            self.config = json.load(f)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(os.path.join(directory, model_file), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_id"], pad_token=self.config["pad_token"])
+        self.model_id = onnx_model_id(directory, model_file)
+
+    def _embed_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: value for name, value in inputs.items() if name in self.input_names})[0]
+        mask = inputs["attention_mask"][:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return normalize_rows(pooled)
+
+    def embed_text(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.config["dim"]), dtype=np.float32)
+        # Sorted by length so each batch pads to roughly the same size
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = np.empty((len(texts), self.config["dim"]), dtype=np.float32)
+        for start in range(0, len(order), BATCH_SIZE):
+            batch = order[start:start + BATCH_SIZE]
+            out[batch] = self._embed_batch([texts[i] for i in batch])
+        return out
+
+def embedding_backend_from_env(threads=None):
+    # SCRUM_EMBEDDING_BACKEND selects torch (default) or onnx, which loads the
+    # int8 model from SCRUM_ONNX_MODEL_DIR (default minilm_onnx; create it with
+    # `python embedding_backend.py export`). SCRUM_ONNX_MODEL_FILE=model.onnx
+    # picks the float32 export instead.
+    name = os.environ.get("SCRUM_EMBEDDING_BACKEND", "torch")
+    threads = threads or embedding_threads_from_env()
+    if name == "onnx":
+        return OnnxEmbedder(os.environ.get("SCRUM_ONNX_MODEL_DIR", ONNX_DIRECTORY), threads,
+                            os.environ.get("SCRUM_ONNX_MODEL_FILE", ONNX_MODEL))
+    return TorchEmbedder(os.environ.get("SCRUM_EMBEDDING_MODEL", SIM_MODEL_NAME), threads)
+
+def embedding_model_id_from_env():
+    # The model_id embedding_backend_from_env() would produce, without loading it.
+    # Persisted embeddings are keyed by it: vectors of different models don't mix.
+    if os.environ.get("SCRUM_EMBEDDING_BACKEND", "torch") == "onnx":
+        return onnx_model_id(os.environ.get("SCRUM_ONNX_MODEL_DIR", ONNX_DIRECTORY),
+                             os.environ.get("SCRUM_ONNX_MODEL_FILE", ONNX_MODEL))
+    return torch_model_id(os.environ.get("SCRUM_EMBEDDING_MODEL", SIM_MODEL_NAME))
+
+def export_onnx(model_name=SIM_MODEL_NAME, directory=ONNX_DIRECTORY, quantize=True, opset=14):
+    # Exports the transformer of a sentence-transformers model to ONNX, then
+    # quantizes its weights to int8 (dynamic quantization, activations stay float).
+    # Needs torch, sentence-transformers and onnxruntime, but only here.
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    os.makedirs(directory, exist_ok=True)
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    sample = model.tokenizer(["Yesterday I finished the login page."], return_tensors="pt")
+    fp32_path = os.path.join(directory, ONNX_FLOAT_MODEL)
+    with torch.no_grad():
+        torch.onnx.export(transformer, tuple(sample[name] for name in names), fp32_path,
+                          input_names=names, output_names=["last_hidden_state"],
+                          dynamic_axes={name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]},
+                          opset_version=opset)
+    if quantize:
+        quantize_dynamic(fp32_path, os.path.join(directory, ONNX_MODEL), weight_type=QuantType.QInt8)
+    model.tokenizer.save_pretrained(directory)
+    config = {
+        "model_name": model_name,
+        "dim": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        "pad_id": model.tokenizer.pad_token_id,
+        "pad_token": model.tokenizer.pad_token,
+    }
+    with open(os.path.join(directory, "embedding.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    logging.info(f"Exported {model_name} to {directory}")
+    return directory
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the sentence embedding model for the onnx backend")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--model", default=SIM_MODEL_NAME)
+    parser.add_argument("--output", default=ONNX_DIRECTORY)
+    parser.add_argument("--no-quantize", action="store_true",
+                        help=f"only write the float32 {ONNX_FLOAT_MODEL}; load it with SCRUM_ONNX_MODEL_FILE={ONNX_FLOAT_MODEL}")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    export_onnx(args.model, args.output, quantize=not args.no_quantize)
@@ -0,0 +1,82 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+def text_key(text, model_id=""):
+    # The model id is part of the key, so vectors of another model are never served
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha1(f"{model_id}\0{normalized}".encode("utf-8")).hexdigest()
+
+def normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+class EmbeddingCache:
+    # LRU cache of sentence embeddings keyed by a hash of the model id and the
+    # normalized text. `encode` takes a list of texts and returns one row per
+    # text; everything missing from the cache is encoded in a single call.
+    def __init__(self, encode, maxsize=4096, path=None, model_id=""):
+        self.encode = encode
+        self.model_id = model_id
+        self.maxsize = maxsize
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def embed(self, texts):
+        keys = [text_key(text, self.model_id) for text in texts]
+        found, missing = {}, {}
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                    self.hits += 1
+                elif key not in missing:
+                    missing[key] = text
+                    self.misses += 1
+        if missing:
+            vectors = np.asarray(self.encode(list(missing.values())), dtype=np.float32)
+            found.update(zip(missing, vectors))
+            with self._lock:
+                for key in missing:
+                    self._entries[key] = found[key]
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            logging.debug(f"Embedded {len(missing)} new texts, {len(texts) - len(missing)} from cache")
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def save(self, path=None):
+        path = path or self.path
+        with self._lock:
+            if not self._entries:
+                return
+            keys = np.array(list(self._entries))
+            vectors = np.stack(list(self._entries.values()))
+        # Through a file object, since np.savez would append ".npz" to a bare path
+        # and the cache would not be found again under the configured name
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, keys=keys, vectors=vectors)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path=None):
+        with np.load(path or self.path) as data:
+            entries = zip(data["keys"].tolist(), data["vectors"])
+            with self._lock:
+                self._entries.update(entries)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,58 @@
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import Pipeline
+
+HASH_FEATURES = 2 ** 16
+
+def make_shared_vectorizer(hashing=True, ngram_range=(1, 1), n_features=HASH_FEATURES):
+    # With hashing, tokens map straight to columns and only the idf array is fitted,
+    # so no vocabulary dict is kept in memory or in the artifact
+    if hashing:
+        return Pipeline([
+            ("hashing", HashingVectorizer(ngram_range=tuple(ngram_range), n_features=n_features,
+                                          alternate_sign=False, norm=None)),
+            ("tfidf", TfidfTransformer()),
+        ])
+    return TfidfVectorizer(ngram_range=tuple(ngram_range))
+
+class FusedClassifier:
+    # Start/stop and category heads over one shared vectorizer. Each utterance is
+    # tokenized once and both linear heads read the same sparse row.
+    def __init__(self, vectorizer, start_stop, category):
+        self.vectorizer = vectorizer
+        self.start_stop = start_stop
+        self.category = category
+
+    def transform(self, lines):
+        return self.vectorizer.transform(lines)
+
+    def predict(self, lines):
+        # [(action, category), ...] in input order
+        X = self.transform(lines)
+        return list(zip(self.start_stop.predict(X).tolist(), self.category.predict(X).tolist()))
+
+    def predict_with_scores(self, lines):
+        # [(action, category, category probability), ...] in input order
+        if not len(lines):
+            return []
+        X = self.transform(lines)
+        actions = self.start_stop.predict(X).tolist()
+        proba = self.category.predict_proba(X)
+        best = proba.argmax(axis=1)
+        categories = self.category.classes_[best].tolist()
+        scores = proba[np.arange(len(best)), best].tolist()
+        return list(zip(actions, categories, scores))
+
+def agreement(fused, lines, ss_pair, cat_pair):
+    # Share of lines on which the fused heads give the same labels as the separate
+    # (vectorizer, classifier) pairs currently in use
+    if not len(lines):
+        return {"lines": 0}
+    fused_actions, fused_categories = zip(*fused.predict(lines))
+    actions = ss_pair[1].predict(ss_pair[0].transform(lines))
+    categories = cat_pair[1].predict(cat_pair[0].transform(lines))
+    return {
+        "lines": len(lines),
+        "start_stop": float(np.mean(np.asarray(fused_actions) == actions)),
+        "category": float(np.mean(np.asarray(fused_categories) == categories)),
+    }
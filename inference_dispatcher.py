@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+from classification import categorize_statements, detect_start_stop_lines
+
+MAX_BATCH = 64
+# How long the first request of a batch waits for others to join it
+MAX_WAIT = 0.003
+
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+def batch_bucket(size):
+    # Power-of-two buckets: 1, 2, 4, 8, ...
+    return 1 << (size.bit_length() - 1)
+
+def latency_bucket(ms):
+    for bound in LATENCY_BUCKETS_MS:
+        if ms <= bound:
+            return bound
+    return float("inf")
+
+class MicroBatcher:
+    # Collects single-item requests from any thread into micro-batches. A batch
+    # runs once it has max_batch items or its oldest item has waited max_wait
+    # seconds; `batch_fn` takes a list of items and returns one result per item,
+    # and each caller gets a concurrent.futures.Future for its own result.
+    def __init__(self, batch_fn, max_batch=MAX_BATCH, max_wait=MAX_WAIT, name="batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.name = name
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = Counter()
+        self.latencies = Counter()
+
+    def submit(self, item):
+        future = Future()
+        with self._cond:
+            self._pending.append((item, future, time.perf_counter()))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name=self.name)
+                self._thread.start()
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def __call__(self, item):
+        # Blocking single call, for code that expects the unbatched function
+        return self.submit(item).result()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+            except Exception as e:
+                logging.error(f"{self.name}: batch of {len(batch)} failed: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            for (_, future, queued_at), result in zip(batch, results):
+                future.set_result(result)
+                self.latencies[latency_bucket(1000 * (done - queued_at))] += 1
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[batch_bucket(len(batch))] += 1
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "queue_depth": len(self._pending),
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "latency_ms_histogram": dict(sorted(self.latencies.items())),
+        }
+
+class InferenceDispatcher:
+    # Shared front for the classifier calls of every meeting in the process.
+    # detect_start_stop and categorize_statement requests are micro-batched
+    # separately since they use different models.
+    def __init__(self, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.start_stop = MicroBatcher(detect_start_stop_lines, max_batch, max_wait, name="detect_start_stop")
+        self.category = MicroBatcher(categorize_statements, max_batch, max_wait, name="categorize_statement")
+
+    def detect_start_stop(self, text):
+        return self.start_stop.submit(text)
+
+    def categorize_statement(self, text):
+        return self.category.submit(text)
+
+    def stats(self):
+        return {"detect_start_stop": self.start_stop.stats(), "categorize_statement": self.category.stats()}
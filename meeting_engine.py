@@ -0,0 +1,233 @@
+import logging
+import time
+from collections import namedtuple
+
+from phrase_matcher import command_matcher
+from roster import ParticipantState, Roster
+
+# Fraction of the allocated time at which the speaker gets a warning
+WARNING_FRACTION = 0.8
+
+MeetingEvent = namedtuple("MeetingEvent", ["kind", "time", "participant", "text"])
+
+class ManualClock:
+    # Injectable clock for replays and tests: time only moves when told to
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+class MeetingEngine:
+    # The moderator's meeting state machine with no Tk, audio or threads. Callers
+    # feed it utterances and commands; every change is emitted as a MeetingEvent
+    # to the subscribed listeners. Time only comes from `clock`, and timers are
+    # checked by calling check_time().
+    def __init__(self, clock=time.time, detect_start_stop=None, warning_fraction=WARNING_FRACTION):
+        self.clock = clock
+        self.detect_start_stop = detect_start_stop
+        self.warning_fraction = warning_fraction
+        self.participants = Roster()
+        self.current_speaker = None
+        self.active = False
+        self.listeners = []
+        self.matcher = command_matcher([])
+        self._warned = False
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def emit(self, kind, participant=None, text=None):
+        event = MeetingEvent(kind, self.clock(), participant, text)
+        for listener in self.listeners:
+            listener(event)
+        return event
+
+    def add_participant(self, name, allocated_time_seconds):
+        name = name.lower()
+        if name in self.participants:
+            raise ValueError(f"Participant {name} already exists")
+        self.participants.add(name, allocated_time_seconds)
+        self.matcher = command_matcher(self.participants)
+        self.emit("participant_added", name)
+        return name
+
+    def remove_participant(self, name):
+        # Removing the current speaker ends their turn with them, so nothing is
+        # left pointing at a participant who is gone
+        self.participants.remove(name)
+        if self.current_speaker == name:
+            self.current_speaker = None
+        self.matcher = command_matcher(self.participants)
+        self.emit("participant_removed", name)
+
+    def start(self):
+        self.active = True
+        self.current_speaker = None
+        self.emit("meeting_started")
+
+    def end(self):
+        # A running turn is counted before the meeting closes, so the summary has
+        # the speaker's full time, and EXCEEDED if they ran over
+        name = self.current_speaker
+        if name is not None:
+            if self.time_left(name) <= 0:
+                self.exceed(name)
+            else:
+                self.stop_speaker(name)
+        self.active = False
+        self.emit("meeting_ended")
+
+    def get_next_waiting(self):
+        name = self.participants.next_waiting()
+        logging.debug(f"Next waiting participant: {name}")
+        return name
+
+    def interpret(self, text, partial=False, action=None):
+        # Returns ("start" | "stop", participant) for a command, ("statement", speaker)
+        # for content from the current speaker, or None. Partial hypotheses only
+        # trigger on explicit keywords and are never statements. `action` is a
+        # start/stop label the caller already computed, used instead of detect_start_stop.
+        if action is None and not partial and self.detect_start_stop is not None:
+            try:
+                action = self.detect_start_stop(text)
+            except Exception:
+                action = None
+
+        # Fallback keywords and participant names, found in a single scan
+        found = self.matcher.find(text)
+
+        is_start = (action == "start") or "start" in found
+        is_stop = (action == "stop") or "stop" in found
+
+        # Only treat as start if either classifier OR keyword matches AND current_speaker is None
+        if is_start and self.current_speaker is None:
+            if "participant" in found:
+                name = found["participant"][0]
+                logging.debug(f"Start command detected for {name}")
+                return ("start", name)
+            if partial:
+                # The name may still be coming in the rest of the utterance
+                return None
+            logging.debug("Start command detected for next waiting participant")
+            return ("start", self.get_next_waiting())
+
+        # Only treat as stop if either classifier OR keyword matches AND current_speaker is not None
+        if is_stop and self.current_speaker is not None:
+            logging.debug(f"Stop command detected for {self.current_speaker}")
+            return ("stop", self.current_speaker)
+
+        if partial:
+            return None
+
+        # Only add as a content line if NOT classified as start/stop by either method
+        if self.current_speaker and not is_start and not is_stop:
+            return ("statement", self.current_speaker)
+        logging.debug(f"No current speaker or action was start/stop. Ignored statement: {text}")
+        return None
+
+    def handle_command(self, command, participant):
+        if command == "stop" and participant == self.current_speaker:
+            # Do NOT start the next speaker here, wait for an explicit start phrase
+            return self.stop_speaker(participant)
+        if command == "start" and participant in self.participants:
+            self.set_speaker(participant)
+            return True
+        return False
+
+    def set_speaker(self, name):
+        logging.debug(f"set_speaker called for {name}")
+        now = self.clock()
+        if self.current_speaker:
+            self.participants.pause(self.current_speaker, now)
+            logging.debug(f"Previous speaker was {self.current_speaker}, set to WAITING")
+        self.current_speaker = name
+        participant = self.participants.start(name, now)
+        self._warned = participant.T_used >= self.warning_fraction * participant.T_alloc
+        self.emit("speaker_started", name)
+        logging.debug(f"{name} state set to SPEAKING")
+
+    def stop_speaker(self, name):
+        logging.debug(f"stop_speaker called for {name}")
+        participant = self.participants.get(name)
+        if not participant or participant.state != ParticipantState.SPEAKING:
+            return False
+        self.participants.finish(name, self.clock())
+        if self.current_speaker == name:
+            self.current_speaker = None
+        self.emit("speaker_stopped", name)
+        logging.debug(f"{name} state set to DONE")
+        return True
+
+    def record_statement(self, text):
+        # Returns (speaker, participant, index of the new line) from a single read
+        # of current_speaker, or None if nobody is speaking
+        name = self.current_speaker
+        participant = self.participants.get(name)
+        if not participant or participant.state != ParticipantState.SPEAKING:
+            logging.debug(f"Did NOT add statement: {text} (state is {participant.state if participant else None})")
+            return None
+        participant.spoken_lines.append(text)
+        participant.classified.append(None)
+        self.emit("statement", name, text)
+        logging.debug(f"Added statement for {name}: {text}")
+        return name, participant, len(participant.spoken_lines) - 1
+
+    def feed(self, text, partial=False, action=None):
+        # Interprets and applies one utterance. Returns the decision from interpret().
+        text = text.strip().lower()
+        self.check_time()
+        decision = self.interpret(text, partial, action)
+        if decision is None:
+            return None
+        command, participant = decision
+        if command == "statement":
+            self.record_statement(text)
+        else:
+            self.handle_command(command, participant)
+        return decision
+
+    def used_time(self, name):
+        return self.participants[name].used_time(self.clock())
+
+    def time_left(self, name):
+        return self.participants[name].T_alloc - self.used_time(name)
+
+    def time_until_warning(self, name):
+        return self.warning_fraction * self.participants[name].T_alloc - self.used_time(name)
+
+    def warn(self, name):
+        if self._warned or not self.active or name != self.current_speaker:
+            return False
+        self._warned = True
+        self.emit("time_warning", name)
+        logging.debug(f"{name} reached {self.warning_fraction:.0%} of allocated time")
+        return True
+
+    def exceed(self, name):
+        # The speaker is marked EXCEEDED and released so a new speaker can be started
+        participant = self.participants.get(name)
+        if (not self.active or participant is None or self.current_speaker != name
+                or participant.state != ParticipantState.SPEAKING):
+            return False
+        self.participants.exceed(name, self.clock())
+        self.current_speaker = None
+        self.emit("time_exceeded", name)
+        logging.debug(f"{name} exceeded time and was stopped.")
+        return True
+
+    def check_time(self):
+        # Fires any warning/exceeded event that is due for the current speaker
+        name = self.current_speaker
+        if not self.active or name is None:
+            return
+        if self.time_until_warning(name) <= 0:
+            self.warn(name)
+        if self.time_left(name) <= 0:
+            self.exceed(name)
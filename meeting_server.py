@@ -0,0 +1,296 @@
+import argparse
+import asyncio
+import logging
+from collections import deque
+
+from classification import categorize_lines
+from classification_worker import ClassificationWorker
+from inference_dispatcher import InferenceDispatcher
+from meeting_engine import MeetingEngine
+from meeting_view import row_values
+from model_registry import CLASSIFIER_MODELS, registry
+from transcript_store import TranscriptStore, meeting_id
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+EVENT_HISTORY = 200
+
+def event_message(room_id, event):
+    return {"room": room_id, "kind": event.kind, "time": event.time,
+            "participant": event.participant, "text": event.text}
+
+class Room:
+    # One meeting hosted by the server. Everything here runs on the event loop;
+    # the models are shared through the manager's detect/classifier, and the
+    # speaker timers are loop callbacks rather than threads.
+    def __init__(self, room_id, manager):
+        self.room_id = room_id
+        self.manager = manager
+        self.engine = MeetingEngine()
+        self.engine.subscribe(self.on_event)
+        self.meeting_id = meeting_id(room_id)
+        if manager.transcript is not None:
+            self.engine.subscribe(manager.transcript.event_listener(self.meeting_id))
+        self.history = deque(maxlen=EVENT_HISTORY)
+        self.subscribers = set()
+        self._timers = {}
+        self._lock = asyncio.Lock()
+
+    def on_event(self, event):
+        message = event_message(self.room_id, event)
+        self.history.append(message)
+        for queue in self.subscribers:
+            queue.put_nowait(message)
+        if event.kind == "speaker_started":
+            self.monitor_speaker_time(event.participant)
+        elif event.kind in ("speaker_stopped", "time_exceeded", "meeting_ended"):
+            self.cancel_timers()
+        elif event.kind == "participant_removed" and self.engine.current_speaker is None:
+            # The removed participant may have been speaking
+            self.cancel_timers()
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def monitor_speaker_time(self, participant):
+        self.cancel_timers()
+        loop = asyncio.get_running_loop()
+        warn_in = self.engine.time_until_warning(participant)
+        if warn_in > 0:
+            self._timers["warning"] = loop.call_later(warn_in, self.engine.warn, participant)
+        self._timers["exceeded"] = loop.call_later(self.engine.time_left(participant), self.engine.exceed, participant)
+
+    def cancel_timers(self):
+        for handle in self._timers.values():
+            handle.cancel()
+        self._timers.clear()
+
+    async def utterance(self, text, partial=False):
+        # The classifier call is awaited outside the engine; the lock keeps one
+        # room's utterances applied in arrival order
+        text = text.strip().lower()
+        async with self._lock:
+            action = None if partial else await self.manager.detect(text)
+            decision = self.engine.interpret(text, partial, action)
+            if decision is None:
+                return None
+            command, participant = decision
+            if command == "statement":
+                self.record_statement(text)
+            else:
+                self.log(participant, text, decision=command)
+                self.engine.handle_command(command, participant)
+            return decision
+
+    def log(self, speaker, text, decision=None, category=None, timestamp=None):
+        transcript = self.manager.transcript
+        if transcript is not None:
+            timestamp = self.engine.clock() if timestamp is None else timestamp
+            transcript.record(self.meeting_id, timestamp, speaker, text, decision, category)
+
+    def record_statement(self, text):
+        now = self.engine.clock()
+        recorded = self.engine.record_statement(text)
+        if recorded is None:
+            return
+        speaker, pdata, index = recorded
+        if self.manager.classifier is None:
+            self.log(speaker, text, timestamp=now)
+            return
+
+        def store(result):
+            pdata.classified[index] = result
+            self.log(speaker, text, category=result[0], timestamp=now)
+        self.manager.classifier.submit(text, store)
+
+    def command(self, command, participant=None):
+        # "start_meeting"/"end_meeting" drive the meeting itself; "start"/"stop"
+        # with a participant go to the engine like a recognized command would
+        if command == "start_meeting":
+            self.engine.start()
+        elif command == "end_meeting":
+            self.engine.end()
+        else:
+            participant = participant.lower() if participant else participant
+            return self.engine.handle_command(command, participant)
+        return True
+
+    def snapshot(self):
+        now = self.engine.clock()
+        return {
+            "room": self.room_id,
+            "active": self.engine.active,
+            "current_speaker": self.engine.current_speaker,
+            "participants": [dict(zip(("name", "state", "used_min", "allocated_min"), row_values(name, pdata, now)))
+                             for name, pdata in self.engine.participants.items()],
+        }
+
+    def close(self):
+        self.cancel_timers()
+        for queue in self.subscribers:
+            queue.put_nowait(None)
+        self.subscribers.clear()
+
+class RoomManager:
+    # All rooms in the process share one set of models: detect_start_stop calls
+    # from every room are micro-batched by one dispatcher, and statements go to
+    # one classification worker. Pass dispatcher=None to run without models.
+    def __init__(self, dispatcher=True, classify_batch=categorize_lines, transcript=None):
+        self.rooms = {}
+        self.transcript = transcript
+        self.dispatcher = InferenceDispatcher() if dispatcher is True else dispatcher
+        self.classifier = ClassificationWorker(classify_batch) if classify_batch else None
+        self.utterances = 0
+
+    async def detect(self, text):
+        self.utterances += 1
+        if self.dispatcher is None:
+            return None
+        try:
+            return await asyncio.wrap_future(self.dispatcher.detect_start_stop(text))
+        except Exception as e:
+            logging.debug(f"detect_start_stop failed: {e}")
+            return None
+
+    def create_room(self, room_id, participants=None):
+        if room_id in self.rooms:
+            raise ValueError(f"Room {room_id} already exists")
+        room = Room(room_id, self)
+        for name, seconds in (participants or {}).items():
+            room.engine.add_participant(name, seconds)
+        self.rooms[room_id] = room
+        logging.debug(f"Created room {room_id} with {len(room.engine.participants)} participants")
+        return room
+
+    def get(self, room_id):
+        room = self.rooms.get(room_id)
+        if room is None:
+            raise KeyError(room_id)
+        return room
+
+    def close_room(self, room_id):
+        self.rooms.pop(room_id).close()
+        if self.transcript is not None:
+            self.transcript.flush()
+
+    def stats(self):
+        stats = {
+            "rooms": len(self.rooms),
+            "active_rooms": sum(room.engine.active for room in self.rooms.values()),
+            "subscribers": sum(len(room.subscribers) for room in self.rooms.values()),
+            "utterances": self.utterances,
+        }
+        if self.classifier is not None:
+            stats["classifier"] = self.classifier.stats()
+        if self.dispatcher is not None:
+            stats["dispatcher"] = self.dispatcher.stats()
+        if self.transcript is not None:
+            stats["transcript"] = self.transcript.stats()
+        return stats
+
+def make_app(manager):
+    # HTTP + WebSocket API; aiohttp is only needed when the server is exposed
+    from aiohttp import WSMsgType, web
+
+    def room_or_404(request):
+        try:
+            return manager.get(request.match_info["room"])
+        except KeyError:
+            raise web.HTTPNotFound(text=f"No room {request.match_info['room']}")
+
+    async def create_room(request):
+        body = await request.json()
+        try:
+            room = manager.create_room(body["room"], body.get("participants"))
+        except ValueError as e:
+            raise web.HTTPConflict(text=str(e))
+        return web.json_response(room.snapshot(), status=201)
+
+    async def get_room(request):
+        return web.json_response(room_or_404(request).snapshot())
+
+    async def delete_room(request):
+        room_or_404(request)
+        manager.close_room(request.match_info["room"])
+        return web.json_response({"closed": request.match_info["room"]})
+
+    async def add_participant(request):
+        room = room_or_404(request)
+        body = await request.json()
+        try:
+            room.engine.add_participant(body["name"], body["seconds"])
+        except ValueError as e:
+            raise web.HTTPConflict(text=str(e))
+        return web.json_response(room.snapshot())
+
+    async def post_utterance(request):
+        room = room_or_404(request)
+        body = await request.json()
+        decision = await room.utterance(body["text"], body.get("partial", False))
+        return web.json_response({"decision": decision, "current_speaker": room.engine.current_speaker})
+
+    async def post_command(request):
+        room = room_or_404(request)
+        body = await request.json()
+        applied = room.command(body["command"], body.get("participant"))
+        return web.json_response({"applied": applied, **room.snapshot()})
+
+    async def room_socket(request):
+        # Pushes every room event; incoming {"text": ..., "partial": ...} messages are utterances
+        # and {"command": ..., "participant": ...} messages go through Room.command
+        room = room_or_404(request)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        queue = room.subscribe()
+
+        async def push():
+            for message in list(room.history):
+                await ws.send_json(message)
+            while (message := await queue.get()) is not None:
+                await ws.send_json(message)
+            await ws.close()
+        pusher = asyncio.create_task(push())
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                data = msg.json()
+                if "command" in data:
+                    room.command(data["command"], data.get("participant"))
+                else:
+                    await room.utterance(data["text"], data.get("partial", False))
+        finally:
+            room.unsubscribe(queue)
+            pusher.cancel()
+        return ws
+
+    async def get_stats(request):
+        return web.json_response(manager.stats())
+
+    app = web.Application()
+    app.add_routes([
+        web.post("/rooms", create_room),
+        web.get("/rooms/{room}", get_room),
+        web.delete("/rooms/{room}", delete_room),
+        web.post("/rooms/{room}/participants", add_participant),
+        web.post("/rooms/{room}/utterances", post_utterance),
+        web.post("/rooms/{room}/commands", post_command),
+        web.get("/rooms/{room}/ws", room_socket),
+        web.get("/stats", get_stats),
+    ])
+    return app
+
+if __name__ == "__main__":
+    from aiohttp import web
+    parser = argparse.ArgumentParser(description="Host many standups in one process")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    registry.warm(CLASSIFIER_MODELS)
+    web.run_app(make_app(RoomManager(transcript=TranscriptStore())), host=args.host, port=args.port)
@@ -0,0 +1,54 @@
+import time
+
+COLUMNS = ('Name', 'State', 'Used', 'Allocated')
+# About 4 Hz for the current speaker's "Used Time" cell
+LIVE_REFRESH_MS = 250
+
+def row_values(name, participant, now):
+    used = participant.used_time(now)
+    return (name, participant.state.name, f"{used / 60:.1f}", f"{participant.T_alloc / 60:.1f}")
+
+class MeetingTreeView:
+    # Keeps meeting_tree in step with the participants dict by diffing against
+    # the values last shown, so an event only touches the cells that changed.
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}
+        self.cell_updates = 0
+        self._after_id = None
+
+    def sync(self, participants):
+        now = time.time()
+        for name in [name for name in self.rows if name not in participants]:
+            self.tree.delete(name)
+            del self.rows[name]
+        for name, participant in participants.items():
+            self.update_row(name, participant, now)
+
+    def update_row(self, name, participant, now):
+        values = row_values(name, participant, now)
+        shown = self.rows.get(name)
+        if shown is None:
+            self.tree.insert('', 'end', iid=name, values=values)
+            self.cell_updates += len(values)
+        else:
+            for column, old, new in zip(COLUMNS, shown, values):
+                if old != new:
+                    self.tree.set(name, column, new)
+                    self.cell_updates += 1
+        self.rows[name] = values
+
+    def start_live_refresh(self, root, get_speaker, participants, interval_ms=LIVE_REFRESH_MS):
+        self.stop_live_refresh(root)
+
+        def tick():
+            name = get_speaker()
+            if name in participants and name in self.rows:
+                self.update_row(name, participants[name], time.time())
+            self._after_id = root.after(interval_ms, tick)
+        tick()
+
+    def stop_live_refresh(self, root):
+        if self._after_id is not None:
+            root.after_cancel(self._after_id)
+            self._after_id = None
@@ -0,0 +1,130 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from model_registry import registry
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+def normalize_text(text):
+    # Lowercase, punctuation stripped, whitespace collapsed
+    return " ".join(_PUNCTUATION.sub("", text.lower()).split())
+
+def token_text(text):
+    # Lowercase, punctuation replaced by spaces, whitespace collapsed. The word
+    # token pattern of the vectorizers splits at punctuation anyway, so the model
+    # sees the same tokens as for the original text.
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+class MemoCache:
+    # Bounded LRU cache with an optional TTL in front of a per-text model call.
+    # Entries are keyed by token_text and the model is called with that same
+    # text, so "That's all." and "that's all" share one entry and the cached
+    # value never depends on which variant came first. Every check_interval
+    # seconds the registry is asked whether the files of `models` changed on
+    # disk; if so the cache is cleared and the models reload.
+    # `batch_fn`, if given, classifies a list of texts and is used by many().
+    def __init__(self, fn, batch_fn=None, models=(), maxsize=4096, ttl=None,
+                 check_interval=2.0, clock=time.monotonic, registry=registry):
+        self.fn = fn
+        self.batch_fn = batch_fn
+        self.models = list(models)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.clock = clock
+        self.registry = registry
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    def _check_models(self, now):
+        if not self.models or now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        if self.registry.check_for_updates(self.models):
+            self.clear()
+            self.invalidations += 1
+
+    def _lookup(self, key, now):
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        value, expires = entry
+        if expires is not None and now >= expires:
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def _store(self, key, value, now):
+        # Caller holds the lock
+        self._entries[key] = (value, now + self.ttl if self.ttl is not None else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __call__(self, text):
+        now = self.clock()
+        self._check_models(now)
+        key = token_text(text)
+        with self._lock:
+            found, value = self._lookup(key, now)
+        if found:
+            return value
+        value = self.fn(key)
+        with self._lock:
+            self._store(key, value, now)
+        return value
+
+    def many(self, texts):
+        # Cached results for a list of texts; all misses go to batch_fn in one call
+        now = self.clock()
+        self._check_models(now)
+        keys = [token_text(text) for text in texts]
+        results = [None] * len(texts)
+        missing = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in missing:
+                    missing[key].append(i)
+                    continue
+                found, value = self._lookup(key, now)
+                if found:
+                    results[i] = value
+                else:
+                    missing[key] = [i]
+        if missing:
+            batch = list(missing)
+            values = self.batch_fn(batch) if self.batch_fn else [self.fn(text) for text in batch]
+            with self._lock:
+                for (key, indexes), value in zip(missing.items(), values):
+                    self._store(key, value, now)
+                    for i in indexes:
+                        results[i] = value
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
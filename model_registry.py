@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+import time
+
+def load_artifact(path):
+    import joblib
+    # mmap_mode only applies to the numpy arrays stored inside the pickle
+    return joblib.load(path, mmap_mode="r")
+
+def load_embedding_model():
+    # Imported here so torch or onnxruntime is only paid for when the model is
+    # first needed; SCRUM_EMBEDDING_BACKEND picks which one
+    from embedding_backend import embedding_backend_from_env
+    return embedding_backend_from_env()
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._paths = {}
+        self._mtimes = {}
+        self.load_times = {}
+
+    def register(self, name, loader, path=None):
+        # `path` is the file the model is loaded from, watched by check_for_updates()
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+            self._models.pop(name, None)
+            if path is not None:
+                self._paths[name] = path
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name not in self._models:
+                self._mtimes[name] = self._mtime(name)
+                start = time.perf_counter()
+                self._models[name] = self._loaders[name]()
+                self.load_times[name] = time.perf_counter() - start
+                logging.debug(f"Loaded model {name} in {self.load_times[name]:.3f}s")
+            return self._models[name]
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def _mtime(self, name):
+        path = self._paths.get(name)
+        try:
+            return os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            return None
+
+    def check_for_updates(self, names=None):
+        # Drops loaded models whose file changed on disk since they were loaded, so
+        # the next get() reloads them. Returns the names that were dropped.
+        names = list(self._paths) if names is None else names
+        changed = []
+        for name in names:
+            if name not in self._models or name not in self._paths:
+                continue
+            with self._locks[name]:
+                if name in self._models and self._mtime(name) != self._mtimes.get(name):
+                    del self._models[name]
+                    changed.append(name)
+        if changed:
+            logging.info(f"Model files changed on disk, reloading: {', '.join(changed)}")
+        return changed
+
+    def warm(self, names=None):
+        names = list(self._loaders) if names is None else list(names)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    logging.error(f"Failed to warm model {name}: {e}")
+        thread = threading.Thread(target=load_all, daemon=True)
+        thread.start()
+        return thread
+
+registry = ModelRegistry()
+ARTIFACT_PATHS = {
+    "cat_vectorizer": "category_vectorizer.joblib",
+    "cat_clf": "category_classifier.joblib",
+    "ss_vectorizer": "startstop_vectorizer.joblib",
+    "ss_clf": "startstop_classifier.joblib",
+    "fused": "fused_model.joblib",
+}
+# The same pairs exported by numpy_scorer.py, scored without scikit-learn
+NUMPY_PATHS = {
+    "cat": "category_model.npz",
+    "ss": "startstop_model.npz",
+}
+
+def load_numpy_vectorizer(path):
+    from numpy_scorer import load_vectorizer
+    return load_vectorizer(path)
+
+def load_numpy_classifier(path):
+    from numpy_scorer import load_classifier
+    return load_classifier(path)
+
+def classifier_backend_from_env():
+    # SCRUM_CLASSIFIER selects pair (default: separate start/stop and category
+    # models), numpy (the same pairs from their .npz exports, no scikit-learn at
+    # runtime) or fused (one shared vectorizer with both heads, see train.py fused)
+    return os.environ.get("SCRUM_CLASSIFIER", "pair")
+
+CLASSIFIER_BACKEND = classifier_backend_from_env()
+for _name, _path in ARTIFACT_PATHS.items():
+    registry.register(_name, lambda path=_path: load_artifact(path), path=_path)
+if CLASSIFIER_BACKEND == "numpy":
+    # Same registry names, so classification.py does not need to know
+    for _prefix, _path in NUMPY_PATHS.items():
+        registry.register(f"{_prefix}_vectorizer", lambda path=_path: load_numpy_vectorizer(path), path=_path)
+        registry.register(f"{_prefix}_clf", lambda path=_path: load_numpy_classifier(path), path=_path)
+registry.register("sim_model", load_embedding_model)
+
+if CLASSIFIER_BACKEND == "fused":
+    CLASSIFIER_MODELS = ["fused"]
+else:
+    CLASSIFIER_MODELS = ["ss_vectorizer", "ss_clf", "cat_vectorizer", "cat_clf"]
@@ -1,58 +1,60 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import time
-from enum import Enum
 import threading
+import time
 import speech_recognition as sr
 import logging
-import pyttsx3
-import queue
-import joblib
 import os
 
+from analytics_store import AnalyticsStore, meeting_summary, team_from_env
+from classification import categorize_batch, categorize_lines, detect_start_stop
+from classification_worker import ClassificationWorker
+from command_bus import CommandBus
+from meeting_engine import MeetingEngine
+from meeting_view import MeetingTreeView
+from model_registry import CLASSIFIER_MODELS, registry
+from room_client import room_client_from_env
+from speech_output import PRIORITY_INTERRUPT, SpeechWorker, time_up_prompt
+from speech_pipeline import SAMPLE_RATE, StreamingRecognizer, backend_from_env, source_from_env
+from timer_scheduler import TimerScheduler
+from transcript_store import TranscriptStore, meeting_id
+
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Load classifiers
-cat_vectorizer = joblib.load("category_vectorizer.joblib")
-cat_clf = joblib.load("category_classifier.joblib")
-ss_vectorizer = joblib.load("startstop_vectorizer.joblib")
-ss_clf = joblib.load("startstop_classifier.joblib")
-
-def categorize_statement(statement):
-    X = cat_vectorizer.transform([statement])
-    cat = cat_clf.predict(X)[0]
-    logging.debug(f"Categorized '{statement}' as {cat}")
-    return cat
-
-def detect_start_stop(statement):
-    X = ss_vectorizer.transform([statement])
-    val = ss_clf.predict(X)[0]
-    logging.debug(f"Start/stop classifier: '{statement}' -> {val}")
-    return val
-
-class ParticipantState(Enum):
-    WAITING = 1
-    SPEAKING = 2
-    EXCEEDED = 3
-    DONE = 4
-
 class ScrumTimekeeper:
     def __init__(self, root):
         self.root = root
         self.root.title("Scrum Timekeeper")
         self.root.geometry("800x600")
-        self.participants = {}
-        self.current_speaker = None
+        self.engine = MeetingEngine(detect_start_stop=detect_start_stop)
+        self.participants = self.engine.participants
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.meeting_active = False
+        self.microphone = sr.Microphone(sample_rate=SAMPLE_RATE)
         self.transcription_text = tk.StringVar()
-        self.command_queue = queue.Queue()
+        self.command_bus = CommandBus(self.handle_command, lambda fn: self.root.after(0, fn))
         self.listening_thread = None
         self.stop_listening_flag = threading.Event()
+        self.command_segment = None
+        self.timer = TimerScheduler()
+        self.speech = SpeechWorker()
+        # Optional meeting server that mirrors this meeting as one of its rooms
+        self.room = room_client_from_env()
+        self.transcript = TranscriptStore()
+        self.analytics = AnalyticsStore()
+        self.meeting_id = None
+        self.transcript_listener = None
+        self.classifier = ClassificationWorker(categorize_lines)
         self.setup_gui()
 
+    @property
+    def current_speaker(self):
+        return self.engine.current_speaker
+
+    @property
+    def meeting_active(self):
+        return self.engine.active
+
     def setup_gui(self):
         self.style = ttk.Style()
         self.style.theme_use("clam")
@@ -91,6 +93,7 @@ class ScrumTimekeeper:
         self.meeting_tree.heading('Used', text='Used Time')
         self.meeting_tree.heading('Allocated', text='Allocated Time')
         self.meeting_tree.grid(column=0, row=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.meeting_view = MeetingTreeView(self.meeting_tree)
         self.status_var = tk.StringVar()
         ttk.Label(frame, textvariable=self.status_var, wraplength=700).grid(column=0, row=1, columnspan=3, pady=10)
         ttk.Button(frame, text="End Meeting", command=self.end_meeting).grid(column=1, row=2, pady=5)
@@ -124,17 +127,11 @@ class ScrumTimekeeper:
             messagebox.showerror("Error", "Invalid time format")
 
     def add_participant(self, name, allocated_time_seconds):
-        name = name.lower()
-        if name in self.participants:
-            messagebox.showerror("Error", f"Participant {name} already exists")
+        try:
+            name = self.engine.add_participant(name, allocated_time_seconds)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
-        self.participants[name] = {
-            "T_alloc": allocated_time_seconds,
-            "T_used": 0,
-            "state": ParticipantState.WAITING,
-            "start_time": None,
-            "spoken_lines": [],
-        }
         self.tree.insert('', 'end', iid=name, values=(name, f"{allocated_time_seconds / 60:.2f}"))
         self.update_meeting_tree()
         logging.debug(f"Added participant {name} with {allocated_time_seconds/60:.2f} min")
@@ -142,139 +139,117 @@ class ScrumTimekeeper:
     def remove_participant(self):
         selected = self.tree.selection()
         for item in selected:
-            del self.participants[item]
+            if item == self.engine.current_speaker:
+                self.cancel_speaker_timers()
+            self.engine.remove_participant(item)
             self.tree.delete(item)
         self.update_meeting_tree()
 
     def update_meeting_tree(self):
-        for i in self.meeting_tree.get_children():
-            self.meeting_tree.delete(i)
-        for name, pdata in self.participants.items():
-            used_time_min = pdata["T_used"] / 60
-            allocated_time_min = pdata["T_alloc"] / 60
-            state_name = pdata["state"].name
-            self.meeting_tree.insert('', 'end', iid=name, values=(name, state_name, f"{used_time_min:.1f}", f"{allocated_time_min:.1f}"))
+        self.meeting_view.sync(self.participants)
 
     def start_meeting(self):
         if not self.participants:
             messagebox.showerror("Error", "No participants added")
             return
-        self.meeting_active = True
+        self.meeting_id = meeting_id(team_from_env())
+        self.unsubscribe_transcript()
+        self.transcript_listener = self.transcript.event_listener(self.meeting_id)
+        self.engine.subscribe(self.transcript_listener)
+        self.engine.start()
         self.status_var.set("Meeting started. Say a start phrase (e.g. 'Alice, you can start').")
         self.notebook.select(self.meeting_tab)
-        self.current_speaker = None
         self.update_meeting_tree()
+        self.meeting_view.start_live_refresh(self.root, lambda: self.current_speaker, self.participants)
+        self.speech.prerender([time_up_prompt(name) for name in self.participants])
+        if self.room:
+            self.room.send("create", {name: pdata.T_alloc for name, pdata in self.participants.items()})
+            self.room.send("command", "start_meeting")
         self.stop_listening_flag.clear()
+        # Segment ids restart with each recognizer, so forget the last meeting's command segment
+        self.command_segment = None
         self.listening_thread = threading.Thread(target=self.listen_loop, daemon=True)
         self.listening_thread.start()
         logging.debug("Meeting started. Awaiting start phrase.")
 
     def listen_loop(self):
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source)
-        while self.meeting_active and not self.stop_listening_flag.is_set():
-            try:
-                with self.microphone as source:
-                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                try:
-                    recognized_text = self.recognizer.recognize_google(audio).lower()
-                    logging.debug(f"Recognized: {recognized_text}")
-                    self.transcription_text.set(recognized_text)
-                    self.process_recognition(recognized_text)
-                except sr.UnknownValueError:
-                    logging.debug("Could not understand audio")
-                except sr.RequestError as e:
-                    logging.error(f"API error: {e}")
-            except sr.WaitTimeoutError:
-                logging.debug("Listening timed out, no speech detected")
-
-    def process_recognition(self, text):
-        text = text.strip().lower()
-        try:
-            action = detect_start_stop(text)
-        except Exception:
-            action = None
-
-        # Fallback keyword lists
-        start_keywords = ["start", "begin", "you can start", "your turn"]
-        stop_keywords = [
-            "i'm done", "that's it", "finished", "no more updates", "that's all", "i have nothing else",
-            "i am finished", "done for now", "that concludes", "that is all"
-        ]
-
-        # Start logic
-        is_start = (action == "start") or any(phrase in text for phrase in start_keywords)
-        is_stop = (action == "stop") or any(phrase in text for phrase in stop_keywords)
-
-        # Only treat as start if either classifier OR keyword matches AND current_speaker is None
-        if is_start and self.current_speaker is None:
-            for name in self.participants:
-                if name in text:
-                    self.command_queue.put(("start", name))
-                    logging.debug(f"Start command detected for {name}")
-                    return
-            self.command_queue.put(("start", self.get_next_waiting()))
-            logging.debug("Start command detected for next waiting participant")
+        # Capture, VAD segmentation and recognition run as a pipeline, so speech is
+        # still captured while earlier utterances are being recognized
+        pipeline = StreamingRecognizer(source_from_env(self.microphone), backend_from_env(self.recognizer),
+                                       on_final=self.on_final_transcript, on_partial=self.on_partial_transcript)
+        pipeline.start()
+        self.stop_listening_flag.wait()
+        pipeline.stop()
+
+    def on_partial_transcript(self, segment_id, text):
+        self.transcription_text.set(text)
+        if segment_id == self.command_segment:
             return
-
-        # Only treat as stop if either classifier OR keyword matches AND current_speaker is not None
-        if is_stop and self.current_speaker is not None:
-            self.command_queue.put(("stop", self.current_speaker))
-            logging.debug(f"Stop command detected for {self.current_speaker}")
+        if self.process_recognition(text, partial=True):
+            self.command_segment = segment_id
+
+    def on_final_transcript(self, segment_id, text):
+        logging.debug(f"Recognized: {text}")
+        self.transcription_text.set(text)
+        if self.room:
+            self.room.send("utterance", text)
+        if segment_id == self.command_segment:
+            logging.debug(f"Command already handled from a partial result: {text}")
             return
+        self.process_recognition(text)
 
-        # Only add as a content line if NOT classified as start/stop by either method
-        if self.current_speaker and not is_start and not is_stop:
-            pdata = self.participants[self.current_speaker]
-            if pdata["state"] == ParticipantState.SPEAKING:
-                pdata["spoken_lines"].append(text)
-                logging.debug(f"Added statement for {self.current_speaker}: {text}")
-            else:
-                logging.debug(f"Did NOT add statement: {text} (state is {pdata['state']})")
+    def process_recognition(self, text, partial=False):
+        # Returns True if a start/stop command was posted. The decision itself is
+        # made by the meeting engine; commands are applied on the Tk thread.
+        text = text.strip().lower()
+        decision = self.engine.interpret(text, partial)
+        if decision is None:
+            return False
+        command, participant = decision
+        if command == "statement":
+            self.record_statement(text)
+            return False
+        self.transcript.record(self.meeting_id, time.time(), participant, text, decision=command)
+        self.command_bus.post(command, participant)
+        return True
+
+    def monitor_speaker_time(self, participant):
+        # Replaces any timers still pending for the previous speaker
+        warn_in = self.engine.time_until_warning(participant)
+        if warn_in > 0:
+            self.timer.schedule("warning", warn_in, lambda: self.root.after(0, lambda: self.handle_time_warning(participant)))
         else:
-            logging.debug(f"No current speaker or action was start/stop. Ignored statement: {text}")
+            self.timer.cancel("warning")
+        self.timer.schedule("exceeded", self.engine.time_left(participant),
+                            lambda: self.root.after(0, lambda: self.check_time_exceeded(participant)))
 
+    def cancel_speaker_timers(self):
+        self.timer.cancel("warning")
+        self.timer.cancel("exceeded")
 
-    def get_next_waiting(self):
-        waiting = [p for p, d in self.participants.items() if d["state"] == ParticipantState.WAITING]
-        logging.debug(f"Next waiting participant: {waiting[0] if waiting else None}")
-        return waiting[0] if waiting else None
+    def handle_time_warning(self, participant):
+        if not self.engine.warn(participant):
+            return
+        remaining = self.engine.time_left(participant)
+        self.status_var.set(f"{participant.capitalize()} has {max(remaining, 0):.0f} seconds left.")
 
-    def monitor_speaker_time(self, participant):
-        def monitor():
-            while self.meeting_active:
-                if self.current_speaker != participant:
-                    break
-                pdata = self.participants.get(participant)
-                if pdata and pdata["state"] == ParticipantState.SPEAKING and pdata["start_time"]:
-                    elapsed = time.time() - pdata["start_time"]
-                    total_used = elapsed + pdata["T_used"]
-                    if total_used >= pdata["T_alloc"]:
-                        pdata["state"] = ParticipantState.EXCEEDED
-                        self.root.after(0, lambda: self.handle_time_exceeded(participant))
-                        break
-                time.sleep(1)
-        threading.Thread(target=monitor, daemon=True).start()
+    def check_time_exceeded(self, participant):
+        if self.engine.exceed(participant):
+            self.handle_time_exceeded(participant)
 
     def handle_time_exceeded(self, participant):
         self.status_var.set(f"{participant.capitalize()} exceeded allocated time.")
         self.interrupt_speaker(participant)
-        self.stop_speaker(participant)
-        self.current_speaker = None
-        logging.debug(f"{participant} exceeded time and was stopped.")
+        self.update_meeting_tree()
 
     def interrupt_speaker(self, participant):
-        try:
-            engine = pyttsx3.init()
-            engine.say(f"{participant.capitalize()}, your time is up. Please wrap it up.")
-            engine.runAndWait()
-        except Exception as e:
-            logging.error(f"TTS error: {e}")
+        # Queued on the speech worker, so the Tk loop is never blocked while speaking
+        self.speech.say(time_up_prompt(participant), PRIORITY_INTERRUPT)
 
     def start_next_speaker(self):
         if not self.meeting_active:
             return
-        next_speaker = self.get_next_waiting()
+        next_speaker = self.engine.get_next_waiting()
         if not next_speaker:
             self.status_var.set("All participants have spoken. Meeting is ending.")
             self.end_meeting()
@@ -282,60 +257,79 @@ class ScrumTimekeeper:
         self.set_speaker(next_speaker)
 
     def set_speaker(self, name):
-        logging.debug(f"set_speaker called for {name}")
-        if self.current_speaker:
-            prev = self.participants[self.current_speaker]
-            if prev["start_time"] is not None:
-                elapsed = time.time() - prev["start_time"]
-                prev["T_used"] += elapsed
-            prev["state"] = ParticipantState.WAITING
-            prev["start_time"] = None
-            logging.debug(f"Previous speaker was {self.current_speaker}, set to WAITING")
-        self.current_speaker = name
-        pdata = self.participants[name]
-        pdata["state"] = ParticipantState.SPEAKING
-        pdata["start_time"] = time.time()
+        self.engine.set_speaker(name)
         self.status_var.set(f"{name.capitalize()} is now speaking.")
         self.update_meeting_tree()
         self.monitor_speaker_time(name)
-        logging.debug(f"{name} state set to SPEAKING")
 
     def stop_speaker(self, name):
-        logging.debug(f"stop_speaker called for {name}")
-        pdata = self.participants.get(name)
-        if not pdata or pdata["state"] != ParticipantState.SPEAKING:
-            return
-        if pdata["start_time"]:
-            elapsed = time.time() - pdata["start_time"]
-            pdata["T_used"] += elapsed
-        pdata["state"] = ParticipantState.DONE  # Set to DONE!
-        pdata["start_time"] = None
-        self.update_meeting_tree()
-        if self.current_speaker == name:
-            self.current_speaker = None
-        logging.debug(f"{name} state set to DONE")
+        if self.engine.stop_speaker(name):
+            self.cancel_speaker_timers()
+            self.update_meeting_tree()
 
     def end_meeting(self):
-        self.meeting_active = False
+        self.engine.end()
+        if self.room:
+            self.room.send("command", "end_meeting")
+        self.timer.clear()
+        self.meeting_view.stop_live_refresh(self.root)
         self.stop_listening_flag.set()
         if self.listening_thread:
             self.listening_thread.join(timeout=2)
         self.status_var.set("Meeting ended.")
+        logging.debug(f"Classification worker: {self.classifier.stats()}")
         self.show_meeting_summary()
+        self.unsubscribe_transcript()
+        # Late classifications are part of the transcript, so the store is closed
+        # on the worker once it is done, without blocking the Tk thread
+        self.classifier.then(self.transcript.close)
         logging.debug("Meeting ended.")
 
+    def unsubscribe_transcript(self):
+        # end_meeting can run twice (automatic end, then the button) or before any start
+        if self.transcript_listener is not None:
+            self.engine.unsubscribe(self.transcript_listener)
+            self.transcript_listener = None
+
+    def record_statement(self, text):
+        # Classified in the background; the result lands at the same index in "classified".
+        # Runs on the recognition thread, so the speaker is taken from the engine's
+        # single read: the Tk thread may change current_speaker at any time.
+        meeting, now = self.meeting_id, time.time()
+        recorded = self.engine.record_statement(text)
+        if recorded is None:
+            return
+        speaker, pdata, index = recorded
+
+        def store(result):
+            pdata.classified[index] = result
+            self.transcript.record(meeting, now, speaker, text, category=result[0])
+        self.classifier.submit(text, store)
+
+    def categorized_statements(self):
+        # Reads the worker's precomputed results; lines it has not reached yet are
+        # classified here in one batch. Snapshot first, the worker may still be writing.
+        rows = {name: list(zip(pdata.spoken_lines, pdata.classified)) for name, pdata in self.participants.items()}
+        missing = {name: [line for line, result in pairs if result is None] for name, pairs in rows.items()}
+        late = {name: iter(results) for name, results in categorize_batch(missing).items()}
+        return {name: [(line, result[0], result[1]) if result is not None else next(late[name])
+                       for line, result in pairs]
+                for name, pairs in rows.items()}
+
     def show_meeting_summary(self):
         logging.debug("Generating meeting summary...")
         summary = "Meeting Summary:\n\n"
+        results = self.categorized_statements()
+        self.analytics.record_meeting(self.meeting_id, team_from_env(), time.strftime("%Y-%m-%d"),
+                                      meeting_summary(self.participants, results))
         for name, pdata in self.participants.items():
-            logging.debug(f"{name}: {len(pdata['spoken_lines'])} statements recorded.")
-            summary += f"{name.capitalize()} (used {pdata['T_used'] / 60:.2f} min):\n"
-            if not pdata["spoken_lines"]:
+            logging.debug(f"{name}: {len(pdata.spoken_lines)} statements recorded.")
+            summary += f"{name.capitalize()} (used {pdata.T_used / 60:.2f} min):\n"
+            if not pdata.spoken_lines:
                 summary += "  No statements recorded.\n"
                 continue
             categorized = {"yesterday": [], "today": [], "blocker": []}
-            for line in pdata["spoken_lines"]:
-                cat = categorize_statement(line)
+            for line, cat, score in results[name]:
                 categorized[cat].append(line)
             for cat in ["yesterday", "today", "blocker"]:
                 if categorized[cat]:
@@ -345,25 +339,21 @@ class ScrumTimekeeper:
             summary += "\n"
         messagebox.showinfo("Meeting Summary", summary)
 
+    def handle_command(self, command, participant):
+        # Runs on the Tk thread, delivered by the command bus
+        if command == "stop" and participant == self.current_speaker:
+            self.stop_speaker(participant)
+            # Do NOT call self.start_next_speaker() here!
+            # Wait for explicit start phrase for next participant
+        elif command == "start" and participant in self.participants:
+            self.set_speaker(participant)
+
     def main_loop(self):
-        def command_handler():
-            while True:
-                try:
-                    command, participant = self.command_queue.get(timeout=0.5)
-                    logging.debug(f"Handling command: {command} for {participant}. Current speaker: {self.current_speaker}")
-                    if command == "stop" and participant == self.current_speaker:
-                        self.stop_speaker(participant)
-                        # Do NOT call self.start_next_speaker() here!
-                        # Wait for explicit start phrase for next participant
-                    elif command == "start":
-                        self.set_speaker(participant)
-                except queue.Empty:
-                    continue
-        threading.Thread(target=command_handler, daemon=True).start()
         self.root.mainloop()
 
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = ScrumTimekeeper(root)
+    registry.warm(CLASSIFIER_MODELS)
     app.main_loop()
@@ -0,0 +1,222 @@
+import argparse
+import math
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+# CSR rows as produced by NumpyVectorizer.transform; column indices are sorted
+# within each row, the same as scikit-learn's output
+SparseRows = namedtuple("SparseRows", ["indptr", "indices", "data"])
+
+def _row_positions(indptr):
+    # (row numbers, offsets into indices/data) for the p-th entry of every row that
+    # has one, for p = 0, 1, ... Walking rows position by position keeps each row's
+    # sums in the same order as scipy's sparse kernels, so results match exactly.
+    lengths = np.diff(indptr)
+    for p in range(int(lengths.max(initial=0))):
+        rows = np.flatnonzero(lengths > p)
+        yield rows, indptr[rows] + p
+
+class NumpyVectorizer:
+    # TfidfVectorizer.transform for word analyzers, with only re and numpy
+    def __init__(self, terms, idf, lowercase=True, token_pattern=r"(?u)\b\w\w+\b", ngram_range=(1, 1),
+                 sublinear_tf=False, norm="l2"):
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.idf = idf
+        self.lowercase = lowercase
+        self.token_pattern = re.compile(token_pattern)
+        self.ngram_range = tuple(ngram_range)
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+
+    def analyze(self, doc):
+        if self.lowercase:
+            doc = doc.lower()
+        tokens = self.token_pattern.findall(doc)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def transform(self, lines):
+        vocabulary = self.vocabulary
+        indptr, indices, counts = [0], [], []
+        for line in lines:
+            columns = [vocabulary[term] for term in self.analyze(line) if term in vocabulary]
+            columns, row_counts = np.unique(np.asarray(columns, dtype=np.int64), return_counts=True)
+            indices.append(columns)
+            counts.append(row_counts)
+            indptr.append(indptr[-1] + len(columns))
+        indptr = np.asarray(indptr, dtype=np.int64)
+        indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+        data = np.concatenate(counts).astype(np.float64) if counts else np.zeros(0)
+        if self.sublinear_tf:
+            np.log(data, data)
+            data += 1.0
+        if self.idf is not None:
+            data *= self.idf[indices]
+        if self.norm == "l2":
+            squares = np.zeros(len(indptr) - 1)
+            for rows, at in _row_positions(indptr):
+                squares[rows] += data[at] * data[at]
+            norms = np.sqrt(squares)
+            norms[norms == 0] = 1.0
+            data /= np.repeat(norms, np.diff(indptr))
+        elif self.norm == "l1":
+            sums = np.zeros(len(indptr) - 1)
+            for rows, at in _row_positions(indptr):
+                sums[rows] += np.abs(data[at])
+            sums[sums == 0] = 1.0
+            data /= np.repeat(sums, np.diff(indptr))
+        return SparseRows(indptr, indices, data)
+
+class NumpyLinearClassifier:
+    # predict/predict_proba of a fitted LogisticRegression, or of a OneVsRestClassifier
+    # wrapping one (kind "ovr"); coef is n_heads x n_features
+    def __init__(self, classes, coef, intercept, kind):
+        self.classes_ = classes
+        self.coef = coef
+        self.intercept = intercept
+        self.kind = kind
+
+    def _decision(self, X):
+        # n_rows x n_heads, accumulated in the same order as scipy's csr @ dense
+        scores = np.zeros((len(X.indptr) - 1, len(self.coef)))
+        coef_T = self.coef.T
+        for rows, at in _row_positions(X.indptr):
+            scores[rows] += X.data[at, None] * coef_T[X.indices[at]]
+        return scores + self.intercept
+
+    def decision_function(self, X):
+        scores = self._decision(X)
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, X):
+        scores = self._decision(X)
+        if self.kind == "ovr":
+            # OneVsRestClassifier keeps the last head on ties
+            maxima = np.full(len(scores), -np.inf)
+            best = np.zeros(len(scores), dtype=np.int64)
+            for i in range(scores.shape[1]):
+                np.maximum(maxima, scores[:, i], out=maxima)
+                best[maxima == scores[:, i]] = i
+            return self.classes_[best]
+        if scores.shape[1] == 1:
+            return self.classes_[(scores[:, 0] > 0).astype(np.int64)]
+        return self.classes_[scores.argmax(axis=1)]
+
+    def predict_proba(self, X):
+        scores = self._decision(X)
+        if self.kind == "ovr" or scores.shape[1] == 1:
+            prob = _expit(scores)
+            if scores.shape[1] == 1:
+                return np.vstack([1 - prob[:, 0], prob[:, 0]]).T
+            sums = prob.sum(axis=1)
+            return prob / sums.reshape((-1, 1))
+        scores -= scores.max(axis=1).reshape((-1, 1))
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1).reshape((-1, 1))
+        return scores
+
+def _logistic(value):
+    try:
+        return 1.0 / (1.0 + math.exp(-value))
+    except OverflowError:
+        return 0.0
+
+def _expit(x):
+    # scipy.special.expit is 1 / (1 + exp(-x)) with the C library's exp, which is
+    # also what math.exp calls (np.exp may use its own SIMD version)
+    return np.fromiter(map(_logistic, x.ravel().tolist()), dtype=np.float64, count=x.size).reshape(x.shape)
+
+def export_model(vectorizer, clf, path):
+    # Writes a fitted TfidfVectorizer + LogisticRegression (optionally one-vs-rest)
+    # pair as plain arrays. Raises ValueError for settings the scorer cannot reproduce.
+    if vectorizer.analyzer != "word" or vectorizer.tokenizer or vectorizer.preprocessor or vectorizer.strip_accents \
+            or vectorizer.stop_words or not hasattr(vectorizer, "vocabulary_"):
+        raise ValueError("only word analyzers with the default tokenizer and no accent or stop word handling can be exported")
+    if vectorizer.norm not in ("l1", "l2", None):
+        raise ValueError(f"unsupported norm {vectorizer.norm}")
+    if hasattr(clf, "estimators_"):
+        kind = "ovr"
+        coef = np.vstack([estimator.coef_ for estimator in clf.estimators_])
+        intercept = np.concatenate([estimator.intercept_ for estimator in clf.estimators_])
+    else:
+        kind = "linear"
+        coef, intercept = clf.coef_, clf.intercept_
+    terms = [""] * len(vectorizer.vocabulary_)
+    for term, i in vectorizer.vocabulary_.items():
+        terms[i] = term
+    np.savez(path,
+             terms=np.asarray(terms, dtype=str),
+             idf=vectorizer.idf_ if vectorizer.use_idf else np.zeros(0),
+             lowercase=vectorizer.lowercase,
+             token_pattern=vectorizer.token_pattern,
+             ngram_range=np.asarray(vectorizer.ngram_range),
+             sublinear_tf=vectorizer.sublinear_tf,
+             norm=vectorizer.norm or "",
+             classes=np.asarray(clf.classes_, dtype=str),
+             coef=np.ascontiguousarray(coef, dtype=np.float64),
+             intercept=np.asarray(intercept, dtype=np.float64),
+             kind=kind)
+
+def load_vectorizer(path):
+    # Arrays in an .npz are read on first access, so this reads only the vectorizer's
+    with np.load(path, mmap_mode="r") as f:
+        idf = f["idf"]
+        return NumpyVectorizer(f["terms"].tolist(), idf if len(idf) else None, bool(f["lowercase"]),
+                               str(f["token_pattern"]), f["ngram_range"].tolist(), bool(f["sublinear_tf"]),
+                               str(f["norm"]) or None)
+
+def load_classifier(path):
+    with np.load(path, mmap_mode="r") as f:
+        return NumpyLinearClassifier(f["classes"].astype(object), f["coef"], f["intercept"], str(f["kind"]))
+
+def export_pair(prefix):
+    # Exports the published joblib pair of `prefix` ("ss" or "cat") to its .npz path.
+    # Written next to the target and renamed, like the joblib files.
+    import joblib
+
+    from model_registry import ARTIFACT_PATHS, NUMPY_PATHS
+
+    vectorizer = joblib.load(ARTIFACT_PATHS[f"{prefix}_vectorizer"])
+    clf = joblib.load(ARTIFACT_PATHS[f"{prefix}_clf"])
+    path = NUMPY_PATHS[prefix]
+    export_model(vectorizer, clf, path + ".tmp.npz")
+    os.replace(path + ".tmp.npz", path)
+    return vectorizer, clf
+
+def check(vectorizer, clf, numpy_vectorizer, numpy_clf, lines):
+    # Number of lines whose predict and predict_proba differ in any bit
+    X, Y = vectorizer.transform(lines), numpy_vectorizer.transform(lines)
+    same_label = clf.predict(X) == numpy_clf.predict(Y)
+    same_proba = (clf.predict_proba(X) == numpy_clf.predict_proba(Y)).all(axis=1)
+    return {"lines": len(lines), "predict_mismatches": int((~same_label).sum()),
+            "predict_proba_mismatches": int((~same_proba).sum())}
+
+def main(argv=None):
+    import csv
+
+    from model_registry import NUMPY_PATHS
+
+    parser = argparse.ArgumentParser(description="Export the joblib classifiers to NumPy .npz files")
+    parser.add_argument("--check", nargs="*", default=["category_labeled.csv", "start_stop_labeled.csv"],
+                        help="labeled CSVs to compare predictions on")
+    args = parser.parse_args(argv)
+    for prefix, path in NUMPY_PATHS.items():
+        vectorizer, clf = export_pair(prefix)
+        print(f"{path}: {os.path.getsize(path) / 1024:.0f} KiB")
+        for data in args.check:
+            if not os.path.exists(data):
+                continue
+            with open(data, newline="", encoding="utf-8") as f:
+                lines = [row["text"] for row in csv.DictReader(f)]
+            print(f"    {data}: {check(vectorizer, clf, load_vectorizer(path), load_classifier(path), lines)}")
+
+if __name__ == "__main__":
+    main()
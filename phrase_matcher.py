@@ -0,0 +1,41 @@
+import re
+
+START_KEYWORDS = ["start", "begin", "you can start", "your turn"]
+STOP_KEYWORDS = [
+    "i'm done", "that's it", "finished", "no more updates", "that's all", "i have nothing else",
+    "i am finished", "done for now", "that concludes", "that is all"
+]
+
+class PhraseMatcher:
+    # Compiles every phrase set into one alternation so a single regex scan finds
+    # all of them. Matches are non-overlapping and the longest phrase wins at a
+    # given position.
+    def __init__(self, phrase_sets, word_boundary=True):
+        self.word_boundary = word_boundary
+        self.phrase_kind = {}
+        for kind, phrases in phrase_sets.items():
+            for phrase in phrases:
+                self.phrase_kind.setdefault(phrase.lower(), kind)
+        phrases = sorted(self.phrase_kind, key=len, reverse=True)
+        pattern = "|".join(re.escape(p) for p in phrases)
+        if word_boundary:
+            # Lookarounds rather than \b so names ending in punctuation still match
+            pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+        self.pattern = re.compile(pattern, re.IGNORECASE) if phrases else None
+
+    def find(self, text):
+        # Returns {kind: [matched phrase, ...]} in order of appearance
+        found = {}
+        if self.pattern is None:
+            return found
+        for m in self.pattern.finditer(text):
+            phrase = m.group().lower()
+            found.setdefault(self.phrase_kind[phrase], []).append(phrase)
+        return found
+
+def command_matcher(participant_names):
+    return PhraseMatcher({
+        "start": START_KEYWORDS,
+        "stop": STOP_KEYWORDS,
+        "participant": participant_names,
+    })
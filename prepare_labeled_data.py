@@ -1,52 +1,147 @@
 import pandas as pd
+import argparse
 import ast
-from datasets import load_dataset
+import itertools
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from phrase_matcher import PhraseMatcher
+
+DATASET_NAME = "sasvata/MOM-Summary-Dataset"
+TRANSCRIPT_COLUMN = "Meeting Transcript"
+# Rows buffered before each write to the output file
+CHUNK_ROWS = 50000
+
+# Flexible phrase lists (add more as needed based on your sample)
+START_PHRASES = [
+    "let me begin", "i will start", "i am starting", "starting now", "i'll start", "my update",
+    "i'd like to start", "i'd like to begin", "let's start", "let's begin", "i'd like to start the meeting",
+    "i'd like to start our daily standup meeting", "good morning, team. i'd like to start",
+    "good morning, team. let's start", "i will start my update"
+]
+
+STOP_PHRASES = [
+    "i'm done", "that's it", "finished", "no more updates", "that's all", "i have nothing else",
+    "i am finished", "done for now", "that concludes", "that is all", "thank you",
+    "thank you for your participation", "okay, that's all", "that's it for today",
+    "that's all for today", "keep up the good work", "meeting adjourned", "we'll meet again tomorrow"
+]
+
+# Match if phrase appears anywhere (case-insensitive), same as a substring test
+LABEL_MATCHER = PhraseMatcher({"start": START_PHRASES, "stop": STOP_PHRASES}, word_boundary=False)
 
 def label_start_stop(text):
-    text_l = text.lower().strip()
-
-    # Flexible phrase lists (add more as needed based on your sample)
-    start_phrases = [
-        "let me begin", "i will start", "i am starting", "starting now", "i'll start", "my update",
-        "i'd like to start", "i'd like to begin", "let's start", "let's begin", "i'd like to start the meeting",
-        "i'd like to start our daily standup meeting", "good morning, team. i'd like to start",
-        "good morning, team. let's start", "i will start my update"
-    ]
-
-    stop_phrases = [
-        "i'm done", "that's it", "finished", "no more updates", "that's all", "i have nothing else",
-        "i am finished", "done for now", "that concludes", "that is all", "thank you",
-        "thank you for your participation", "okay, that's all", "that's it for today",
-        "that's all for today", "keep up the good work", "meeting adjourned", "we'll meet again tomorrow"
-    ]
-
-    # Match if phrase appears anywhere (case-insensitive)
-    for phrase in start_phrases:
-        if phrase in text_l:
-            return "start"
-    for phrase in stop_phrases:
-        if phrase in text_l:
-            return "stop"
+    found = LABEL_MATCHER.find(text.strip())
+    if "start" in found:
+        return "start"
+    if "stop" in found:
+        return "stop"
     return "other"
 
-# Load the MOM-Summary-Dataset
-mom_dataset = load_dataset("sasvata/MOM-Summary-Dataset")
-mom_meetings = mom_dataset['train']
-
-ss_data = []
+def parse_transcript(raw):
+    # Transcripts are Python dict literals in the hub dataset; JSON is tried first since it is much faster
+    if isinstance(raw, dict):
+        data = raw
+    else:
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = ast.literal_eval(raw)
+    return data.get('transcript', []) if isinstance(data, dict) else list(data)
 
-N = len(mom_meetings)
-for i in range(N):
-    mt_raw = mom_meetings[i]['Meeting Transcript']
+def label_meeting(raw):
+    # Runs in a worker process. Returns ([(text, label), ...], error message or None).
     try:
-        mt_dict = ast.literal_eval(mt_raw)
-        transcript = mt_dict.get('transcript', [])
-        for line in transcript:
-            label_ss = label_start_stop(line)
-            ss_data.append({"text": line, "label": label_ss})
+        return [(line, label_start_stop(line)) for line in parse_transcript(raw)], None
     except Exception as e:
-        print(f"Error parsing row {i}: {e}")
+        return [], str(e)
+
+def iter_hub_transcripts(name=DATASET_NAME):
+    # Streaming mode: rows are fetched as they are consumed, nothing is downloaded up front
+    from datasets import load_dataset
+    for row in load_dataset(name, split="train", streaming=True):
+        yield row[TRANSCRIPT_COLUMN]
+
+def iter_local_transcripts(path, chunk_rows=1000):
+    # Offline input: .jsonl (one meeting per line), .csv or .parquet with a
+    # "Meeting Transcript" column, read a chunk at a time
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row.get(TRANSCRIPT_COLUMN, row)
+    elif path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=[TRANSCRIPT_COLUMN]):
+            yield from batch.column(0).to_pylist()
+    else:
+        for chunk in pd.read_csv(path, usecols=[TRANSCRIPT_COLUMN], chunksize=chunk_rows):
+            yield from chunk[TRANSCRIPT_COLUMN]
+
+def labeled_rows(transcripts, workers=None, window=256, errors=None):
+    # Parses and labels meetings on a process pool, `window` meetings at a time so
+    # only a bounded slice of the corpus is ever in flight. Yields (text, label) in order.
+    workers = workers or os.cpu_count()
+    transcripts = iter(transcripts)
+    index = 0
+
+    def consume(results):
+        nonlocal index
+        for rows, error in results:
+            if error is not None:
+                print(f"Error parsing row {index}: {error}")
+                if errors is not None:
+                    errors.append(index)
+            index += 1
+            yield from rows
+
+    if workers == 1:
+        yield from consume(map(label_meeting, transcripts))
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        while batch := list(itertools.islice(transcripts, window)):
+            yield from consume(pool.map(label_meeting, batch, chunksize=max(1, len(batch) // (4 * workers))))
+
+def write_rows(rows, path, chunk_rows=CHUNK_ROWS):
+    # Writes (text, label) rows in chunks: CSV is appended to, Parquet (needs
+    # pyarrow) gets one row group per chunk. The output is created (header only,
+    # or an empty Parquet file) before the first row, so a run that yields no
+    # rows never leaves the previous run's file behind. Returns the label counts.
+    counts = Counter()
+    columns = ["text", "label"]
+    writer = None
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([("text", pa.string()), ("label", pa.string())])
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        pd.DataFrame(columns=columns).to_csv(path, index=False)
+    try:
+        for chunk in iter(lambda: list(itertools.islice(rows, chunk_rows)), []):
+            df = pd.DataFrame(chunk, columns=columns)
+            counts.update(df["label"])
+            if writer is not None:
+                writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            else:
+                df.to_csv(path, mode="a", header=False, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Label transcript lines as start/stop/other")
+    parser.add_argument("--input", help="local .jsonl/.csv/.parquet file instead of streaming the hub dataset")
+    parser.add_argument("--dataset", default=DATASET_NAME)
+    parser.add_argument("--output", default="start_stop_labeled.csv", help=".csv or .parquet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
 
-df_ss = pd.DataFrame(ss_data)
-df_ss.to_csv("start_stop_labeled.csv", index=False)
-print(df_ss['label'].value_counts())
+    transcripts = iter_local_transcripts(args.input) if args.input else iter_hub_transcripts(args.dataset)
+    counts = write_rows(labeled_rows(transcripts, args.workers), args.output, args.chunk_rows)
+    print(pd.Series(counts, name="count").sort_values(ascending=False))
@@ -0,0 +1,104 @@
+import argparse
+import ast
+import csv
+import json
+import logging
+import time
+from collections import Counter
+
+from meeting_engine import ManualClock, MeetingEngine
+
+WORDS_PER_SECOND = 2.5
+ALLOCATED_SECONDS = 60
+
+def split_speaker(line):
+    speaker, sep, text = line.partition(":")
+    if not sep or not speaker.strip() or len(speaker) > 40:
+        return None, line.strip()
+    return speaker.strip().lower(), text.strip()
+
+def load_mom_meetings():
+    from datasets import load_dataset
+    meetings = []
+    for row in load_dataset("sasvata/MOM-Summary-Dataset")['train']:
+        try:
+            meetings.append(ast.literal_eval(row['Meeting Transcript']).get('transcript', []))
+        except Exception:
+            continue
+    return meetings
+
+def load_csv_meetings(path="category_labeled.csv", lines_per_meeting=12):
+    # Offline fallback: consecutive labeled lines grouped into synthetic standups
+    with open(path, newline="", encoding="utf-8") as f:
+        lines = [row["text"] for row in csv.DictReader(f)]
+    return [lines[i:i + lines_per_meeting] for i in range(0, len(lines), lines_per_meeting)]
+
+def replay_meeting(lines, detect_start_stop=None, words_per_second=WORDS_PER_SECOND,
+                   allocated_seconds=ALLOCATED_SECONDS):
+    # Plays one transcript through a fresh engine faster than real time: the
+    # clock advances by each utterance's spoken duration, and speaker changes
+    # are turned into the stop/start phrases a moderator would hear
+    clock = ManualClock()
+    engine = MeetingEngine(clock=clock, detect_start_stop=detect_start_stop)
+    events = Counter()
+    engine.subscribe(lambda event: events.update((event.kind,)))
+    utterances = [split_speaker(line) for line in lines]
+    for speaker, _ in utterances:
+        if speaker and speaker not in engine.participants:
+            engine.add_participant(speaker, allocated_seconds)
+    engine.start()
+    for speaker, text in utterances:
+        if speaker and speaker != engine.current_speaker:
+            if engine.current_speaker is not None:
+                engine.feed("that's all")
+            engine.feed(f"{speaker}, your turn")
+        clock.advance(len(text.split()) / words_per_second)
+        engine.feed(text)
+    if engine.current_speaker is not None:
+        engine.feed("that's all")
+    engine.end()
+    return engine, events
+
+def run(meetings, repeat=1, detect_start_stop=None):
+    events = Counter()
+    utterances = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for lines in meetings:
+            _, counts = replay_meeting(lines, detect_start_stop)
+            events.update(counts)
+            utterances += len(lines)
+    elapsed = time.perf_counter() - start
+    standups = repeat * len(meetings)
+    return {
+        "standups": standups,
+        "utterances": utterances,
+        "seconds": elapsed,
+        "standups_per_second": standups / elapsed if elapsed else 0.0,
+        "utterances_per_second": utterances / elapsed if elapsed else 0.0,
+        "events": dict(events),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded transcripts through the headless meeting engine")
+    parser.add_argument("--source", choices=["mom", "csv"], default="mom")
+    parser.add_argument("--csv", default="category_labeled.csv")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--classifier", action="store_true",
+                        help="also run the start/stop classifier on every utterance")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+    logging.disable(logging.DEBUG)
+
+    meetings = load_mom_meetings() if args.source == "mom" else load_csv_meetings(args.csv)
+    detect = None
+    if args.classifier:
+        from classification import detect_start_stop as detect
+    results = run(meetings, args.repeat, detect)
+    print(f"{results['standups']} standups, {results['utterances']} utterances in {results['seconds']:.2f}s: "
+          f"{results['standups_per_second']:.0f} standups/s, {results['utterances_per_second']:.0f} utterances/s")
+    for kind, count in sorted(results["events"].items()):
+        print(f"  {kind}: {count}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,58 @@
+import json
+import logging
+import os
+import queue
+import threading
+import urllib.error
+import urllib.request
+
+class RoomClient:
+    # Minimal HTTP client for one room on meeting_server.py, standard library only.
+    # Requests are sent in order from a background thread so the caller never blocks.
+    def __init__(self, base_url, room_id, timeout=5):
+        self.base_url = base_url.rstrip("/")
+        self.room_id = room_id
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read() or b"null")
+
+    def create(self, participants):
+        return self.request("POST", "/rooms", {"room": self.room_id, "participants": participants})
+
+    def state(self):
+        return self.request("GET", f"/rooms/{self.room_id}")
+
+    def utterance(self, text, partial=False):
+        return self.request("POST", f"/rooms/{self.room_id}/utterances", {"text": text, "partial": partial})
+
+    def command(self, command, participant=None):
+        return self.request("POST", f"/rooms/{self.room_id}/commands", {"command": command, "participant": participant})
+
+    def send(self, method, *args):
+        # Fire and forget: queued and sent in order by the background thread
+        self._queue.put((method, args))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            method, args = self._queue.get()
+            try:
+                getattr(self, method)(*args)
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                logging.error(f"Room server request {method} failed: {e}")
+
+def room_client_from_env():
+    # SCRUM_SERVER_URL points the Tk app at a meeting server; SCRUM_ROOM names its room
+    url = os.environ.get("SCRUM_SERVER_URL")
+    if not url:
+        return None
+    return RoomClient(url, os.environ.get("SCRUM_ROOM", "default"))
@@ -0,0 +1,127 @@
+import heapq
+import itertools
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+class ParticipantState(Enum):
+    WAITING = 1
+    SPEAKING = 2
+    EXCEEDED = 3
+    DONE = 4
+
+@dataclass(slots=True)
+class Participant:
+    name: str
+    T_alloc: float
+    T_used: float = 0.0
+    state: ParticipantState = ParticipantState.WAITING
+    start_time: Optional[float] = None
+    spoken_lines: list = field(default_factory=list)
+    classified: list = field(default_factory=list)
+    # Roster position, used to keep the waiting index in join order
+    seq: int = 0
+
+    def used_time(self, now):
+        if self.start_time is None:
+            return self.T_used
+        return self.T_used + now - self.start_time
+
+class Roster(Mapping):
+    # Participants by name in join order, plus an index of the WAITING ones so
+    # next_waiting() does not scan the roster. The index is a heap on join order
+    # with lazy deletion: entries for participants that left WAITING are dropped
+    # when they reach the top. The roster reads like a dict but is read-only:
+    # participants join and leave through add()/remove() and change state through
+    # the transition methods, so the index stays in step.
+    def __init__(self):
+        self._participants = {}
+        self._waiting = []
+        self._indexed = set()
+        self._seq = itertools.count()
+
+    def __getitem__(self, name):
+        return self._participants[name]
+
+    def __iter__(self):
+        return iter(self._participants)
+
+    def __len__(self):
+        return len(self._participants)
+
+    # Delegated directly, the Mapping mixins would go through __getitem__
+    def __contains__(self, name):
+        return name in self._participants
+
+    def get(self, name, default=None):
+        return self._participants.get(name, default)
+
+    def keys(self):
+        return self._participants.keys()
+
+    def items(self):
+        return self._participants.items()
+
+    def values(self):
+        return self._participants.values()
+
+    def __repr__(self):
+        return f"Roster({self._participants!r})"
+
+    def add(self, name, allocated_time_seconds):
+        participant = Participant(name, allocated_time_seconds, seq=next(self._seq))
+        self._participants[name] = participant
+        self._index(participant)
+        return participant
+
+    def remove(self, name):
+        self._indexed.discard(name)
+        return self._participants.pop(name)
+
+    def _index(self, participant):
+        if participant.name not in self._indexed:
+            heapq.heappush(self._waiting, (participant.seq, participant.name))
+            self._indexed.add(participant.name)
+
+    def next_waiting(self):
+        # First WAITING participant in join order, or None
+        while self._waiting:
+            seq, name = self._waiting[0]
+            participant = self.get(name)
+            current = participant is not None and participant.seq == seq
+            if current and participant.state is ParticipantState.WAITING:
+                return name
+            heapq.heappop(self._waiting)
+            if current:
+                self._indexed.discard(name)
+        return None
+
+    def start(self, name, now):
+        participant = self[name]
+        participant.state = ParticipantState.SPEAKING
+        participant.start_time = now
+        return participant
+
+    def _stop(self, participant, now, state):
+        if participant.start_time is not None:
+            participant.T_used += now - participant.start_time
+        participant.start_time = None
+        participant.state = state
+
+    def pause(self, name, now):
+        # Back to WAITING with the time so far counted, e.g. when someone else takes over
+        participant = self[name]
+        self._stop(participant, now, ParticipantState.WAITING)
+        self._index(participant)
+        return participant
+
+    def finish(self, name, now):
+        participant = self[name]
+        self._stop(participant, now, ParticipantState.DONE)
+        return participant
+
+    def exceed(self, name, now):
+        participant = self[name]
+        self._stop(participant, now, ParticipantState.EXCEEDED)
+        return participant
@@ -1,16 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import time
-from enum import Enum
 import threading
 import speech_recognition as sr
 import logging
-import pyttsx3
 import random
-import queue
-from sentence_transformers import SentenceTransformer
-import numpy as np
 import os
+
+from agenda_similarity import AgendaSimilarity
+from command_bus import CommandBus
+from meeting_view import MeetingTreeView
+from model_registry import registry
+from phrase_matcher import PhraseMatcher
+from roster import ParticipantState, Roster
+from speech_output import PRIORITY_INTERRUPT, SpeechWorker, time_up_prompt
+from speech_pipeline import SAMPLE_RATE, StreamingRecognizer, backend_from_env, source_from_env
+from timer_scheduler import TimerScheduler
+
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 # Set up logging
@@ -19,6 +25,7 @@ logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %
 # Standup data placeholder
 standup_data = {}
 STOP_PHRASES = ["done", "that's it", "finished", "i'm done", "i am done", "that's all"]
+STOP_MATCHER = PhraseMatcher({"stop": STOP_PHRASES})
 
 def generate_standup_for(name):
     yesterday_tasks = [
@@ -49,29 +56,27 @@ def generate_standup_for(name):
         f"{random.choice(blockers)}."
     ]
 
-class ParticipantState(Enum):
-    WAITING = 1
-    SPEAKING = 2
-    EXCEEDED = 3
+# Fraction of the allocated time at which the speaker gets a warning
+WARNING_FRACTION = 0.8
 
 class ScrumTimekeeper:
     def __init__(self, root):
         self.root = root
         self.root.title("Scrum Timekeeper with CC")
         self.root.geometry("800x600")
-        self.participants = {}
+        # Only WAITING, SPEAKING and EXCEEDED are used here: stopping returns a speaker to WAITING
+        self.participants = Roster()
         self.current_speaker = None
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.microphone = sr.Microphone(sample_rate=SAMPLE_RATE)
         self.meeting_active = False
         self.transcription_text = tk.StringVar()
 
-        self.command_queue = queue.Queue()
+        self.command_bus = CommandBus(self.handle_command, lambda fn: self.root.after(0, fn))
         self.listening_thread = None
         self.stop_listening_flag = threading.Event()
-
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.timer = TimerScheduler()
+        self.speech = SpeechWorker()
 
         # Define agenda topics dictionary
         self.AGENDA_TOPICS = {
@@ -82,26 +87,29 @@ class ScrumTimekeeper:
             "Blockers": "Discuss any obstacles preventing progress."
         }
 
-        # Precompute agenda embeddings
+        # Agenda embeddings are computed on first use, once the embedding model is loaded
         self.agenda_texts = list(self.AGENDA_TOPICS.values())
-        self.agenda_embeddings = self.embed_text(self.agenda_texts)
+        self.agenda_similarity = AgendaSimilarity(self.embed_text, self.agenda_texts, self.AGENDA_TOPICS)
 
         self.setup_gui()
 
+    @property
+    def embedding_model(self):
+        return registry.get("sim_model")
+
     def embed_text(self, texts):
-        return self.embedding_model.encode(texts, convert_to_tensor=False)
+        return self.embedding_model.embed_text(texts)
 
-    def cosine_similarity(self, vec1, vec2):
-        return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+    def agenda_coverage(self):
+        # Participant x topic similarity matrix, with every discussion embedded in one call
+        speakers = [name for name, pdata in self.participants.items() if pdata.spoken_lines]
+        discussions = [" ".join(self.participants[name].spoken_lines) for name in speakers]
+        return dict(zip(speakers, self.agenda_similarity.score_matrix(discussions)))
 
     def check_similarity_to_agenda(self, spoken_lines):
         if not spoken_lines:
             return 0.0
-        discussion_text = " ".join(spoken_lines)
-        discussion_embedding = self.embed_text([discussion_text])[0]
-        similarities = [self.cosine_similarity(discussion_embedding, topic_emb) for topic_emb in self.agenda_embeddings]
-        max_similarity = max(similarities)
-        return max_similarity
+        return float(self.agenda_similarity.score_matrix([" ".join(spoken_lines)])[0].max())
 
     def setup_gui(self):
         self.style = ttk.Style()
@@ -112,24 +120,35 @@ class ScrumTimekeeper:
         self.setup_meeting_tab()
 
     def monitor_speaker_time(self, participant):
-        def monitor():
-            while self.meeting_active:
-                if self.current_speaker != participant:
-                    break  # Stop monitoring if it's no longer their turn
+        # Replaces any timers still pending for the previous speaker
+        pdata = self.participants[participant]
+        warn_in = WARNING_FRACTION * pdata.T_alloc - pdata.T_used
+        if warn_in > 0:
+            self.timer.schedule("warning", warn_in, lambda: self.root.after(0, lambda: self.handle_time_warning(participant)))
+        else:
+            self.timer.cancel("warning")
+        self.timer.schedule("exceeded", pdata.T_alloc - pdata.T_used,
+                            lambda: self.root.after(0, lambda: self.check_time_exceeded(participant)))
 
-                pdata = self.participants.get(participant)
-                if pdata and pdata["state"] == ParticipantState.SPEAKING and pdata["start_time"]:
-                    elapsed = time.time() - pdata["start_time"]
-                    total_used = elapsed + pdata["T_used"]
-                    if total_used >= pdata["T_alloc"]:
-                        # Only handle once
-                        pdata["state"] = ParticipantState.EXCEEDED
-                        self.root.after(0, lambda: self.handle_time_exceeded(participant))
-                        break
-                time.sleep(1)
-        threading.Thread(target=monitor, daemon=True).start()
+    def cancel_speaker_timers(self):
+        self.timer.cancel("warning")
+        self.timer.cancel("exceeded")
 
+    def handle_time_warning(self, participant):
+        pdata = self.participants.get(participant)
+        if not self.meeting_active or self.current_speaker != participant or not pdata:
+            return
+        remaining = pdata.T_alloc - pdata.used_time(time.time())
+        self.status_var.set(f"{participant.capitalize()} has {max(remaining, 0):.0f} seconds left.")
+        logging.debug(f"{participant} reached {WARNING_FRACTION:.0%} of allocated time")
 
+    def check_time_exceeded(self, participant):
+        pdata = self.participants.get(participant)
+        if not self.meeting_active or self.current_speaker != participant:
+            return
+        if pdata and pdata.state == ParticipantState.SPEAKING:
+            self.participants.exceed(participant, time.time())
+            self.handle_time_exceeded(participant)
 
     def handle_time_exceeded(self, participant):
         self.status_var.set(f"{participant.capitalize()} exceeded allocated time.")
@@ -138,12 +157,8 @@ class ScrumTimekeeper:
         self.current_speaker = None  # allow new speaker to be started via command
 
     def interrupt_speaker(self, participant):
-        try:
-            engine = pyttsx3.init()
-            engine.say(f"{participant.capitalize()}, your time is up. Please wrap it up.")
-            engine.runAndWait()
-        except Exception as e:
-            logging.error(f"TTS error: {e}")
+        # Queued on the speech worker, so the Tk loop is never blocked while speaking
+        self.speech.say(time_up_prompt(participant), PRIORITY_INTERRUPT)
 
     def setup_setup_tab(self):
         self.setup_tab = ttk.Frame(self.notebook)
@@ -183,6 +198,7 @@ class ScrumTimekeeper:
         self.meeting_tree.heading('Used', text='Used Time')
         self.meeting_tree.heading('Allocated', text='Allocated Time')
         self.meeting_tree.grid(column=0, row=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.meeting_view = MeetingTreeView(self.meeting_tree)
 
         self.status_var = tk.StringVar()
         ttk.Label(frame, textvariable=self.status_var, wraplength=700).grid(column=0, row=1, columnspan=3, pady=10)
@@ -199,23 +215,21 @@ class ScrumTimekeeper:
         if not participant:
             return
         participant = participant.lower()
-        engine = pyttsx3.init()
 
+        # Each sentence is its own request, so a time-up interrupt can cut in between them
         participant_data = self.participants.get(participant)
-        if participant_data and participant_data["spoken_lines"]:
-            engine.say(f"{participant.capitalize()}'s standup update based on their spoken words.")
-            for sentence in participant_data["spoken_lines"]:
-                engine.say(sentence)
+        if participant_data and participant_data.spoken_lines:
+            self.speech.say(f"{participant.capitalize()}'s standup update based on their spoken words.")
+            for sentence in participant_data.spoken_lines:
+                self.speech.say(sentence)
         elif participant in standup_data:
-            engine.say(f"{participant.capitalize()}'s standup update based on dummy data.")
+            self.speech.say(f"{participant.capitalize()}'s standup update based on dummy data.")
             for sentence in standup_data[participant]:
-                engine.say(sentence)
+                self.speech.say(sentence)
         else:
-            engine.say(f"Sorry, I don't have any standup data for {participant}.")
+            self.speech.say(f"Sorry, I don't have any standup data for {participant}.")
             messagebox.showinfo("Not Found", f"No standup data for {participant}.")
 
-        engine.runAndWait()
-
     def add_participant_gui(self):
         name = self.name_entry.get()
         time_value = self.time_entry.get()
@@ -235,31 +249,19 @@ class ScrumTimekeeper:
         if name in self.participants:
             messagebox.showerror("Error", f"Participant {name} already exists")
             return
-        self.participants[name] = {
-            "T_alloc": allocated_time_seconds,
-            "T_used": 0,
-            "state": ParticipantState.WAITING,
-            "start_time": None,
-            "spoken_lines": [],
-        }
+        self.participants.add(name, allocated_time_seconds)
         self.tree.insert('', 'end', iid=name, values=(name, f"{allocated_time_seconds / 60:.2f}"))
         self.update_meeting_tree()
 
     def remove_participant(self):
         selected = self.tree.selection()
         for item in selected:
-            del self.participants[item]
+            self.participants.remove(item)
             self.tree.delete(item)
         self.update_meeting_tree()
 
     def update_meeting_tree(self):
-        for i in self.meeting_tree.get_children():
-            self.meeting_tree.delete(i)
-        for name, pdata in self.participants.items():
-            used_time_min = pdata["T_used"] / 60
-            allocated_time_min = pdata["T_alloc"] / 60
-            state_name = pdata["state"].name
-            self.meeting_tree.insert('', 'end', iid=name, values=(name, state_name, f"{used_time_min:.1f}", f"{allocated_time_min:.1f}"))
+        self.meeting_view.sync(self.participants)
 
     def start_meeting(self):
         if not self.participants:
@@ -270,6 +272,8 @@ class ScrumTimekeeper:
         self.notebook.select(self.meeting_tab)
         self.current_speaker = None
         self.update_meeting_tree()
+        self.meeting_view.start_live_refresh(self.root, lambda: self.current_speaker, self.participants)
+        self.speech.prerender([time_up_prompt(name) for name in self.participants])
 
         self.stop_listening_flag.clear()
         self.listening_thread = threading.Thread(target=self.listen_loop, daemon=True)
@@ -278,23 +282,19 @@ class ScrumTimekeeper:
         self.start_next_speaker()
 
     def listen_loop(self):
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source)
-        while self.meeting_active and not self.stop_listening_flag.is_set():
-            try:
-                with self.microphone as source:
-                    audio = self.recognizer.listen(source, timeout=3, phrase_time_limit=10)
-                try:
-                    recognized_text = self.recognizer.recognize_google(audio).lower()
-                    logging.debug(f"Recognized: {recognized_text}")
-                    self.transcription_text.set(recognized_text)
-                    self.process_recognition(recognized_text)
-                except sr.UnknownValueError:
-                    logging.debug("Could not understand audio")
-                except sr.RequestError as e:
-                    logging.error(f"API error: {e}")
-            except sr.WaitTimeoutError:
-                logging.debug("Listening timed out, no speech detected")
+        # Capture, VAD segmentation and recognition run as a pipeline, so speech is
+        # still captured while earlier utterances are being recognized
+        pipeline = StreamingRecognizer(source_from_env(self.microphone), backend_from_env(self.recognizer),
+                                       on_final=self.on_final_transcript,
+                                       on_partial=lambda segment_id, text: self.transcription_text.set(text))
+        pipeline.start()
+        self.stop_listening_flag.wait()
+        pipeline.stop()
+
+    def on_final_transcript(self, segment_id, text):
+        logging.debug(f"Recognized: {text}")
+        self.transcription_text.set(text)
+        self.process_recognition(text)
 
     def process_recognition(self, text):
         text = text.strip().lower()
@@ -303,54 +303,45 @@ class ScrumTimekeeper:
         # Check for voice commands even if no one is speaking
         if len(words) >= 2:
             if words[0] == "start" and words[1] in self.participants:
-                self.command_queue.put(("start", words[1]))
+                self.command_bus.post("start", words[1])
                 return
             if words[-1] == "start" and words[0] in self.participants:
-                self.command_queue.put(("start", words[0]))
+                self.command_bus.post("start", words[0])
                 return
             if words[0] == "stop" and words[1] in self.participants:
-                self.command_queue.put(("stop", words[1]))
+                self.command_bus.post("stop", words[1])
                 return
             if words[-1] == "stop" and words[0] in self.participants:
-                self.command_queue.put(("stop", words[0]))
+                self.command_bus.post("stop", words[0])
                 return
 
         # Only collect spoken lines if someone is speaking
         if not self.current_speaker:
             return
 
-        pdata = self.participants[self.current_speaker]
-        pdata["spoken_lines"].append(text)
+        self.participants[self.current_speaker].spoken_lines.append(text)
 
-        if any(phrase in text for phrase in STOP_PHRASES):
-            self.command_queue.put(("stop", self.current_speaker))
+        if STOP_MATCHER.find(text):
+            self.command_bus.post("stop", self.current_speaker)
 
 
     def start_next_speaker(self):
         if not self.meeting_active:
             return
-        waiting = [p for p, d in self.participants.items() if d["state"] == ParticipantState.WAITING]
-        if not waiting:
+        next_speaker = self.participants.next_waiting()
+        if not next_speaker:
             self.status_var.set("All participants have spoken. Meeting is ending.")
             self.end_meeting()
             return
-        next_speaker = waiting[0]
         self.set_speaker(next_speaker)
 
     def set_speaker(self, name):
         if self.current_speaker:
             # Stop previous speaker timer and update used time
-            prev = self.participants[self.current_speaker]
-            if prev["start_time"] is not None:
-                elapsed = time.time() - prev["start_time"]
-                prev["T_used"] += elapsed
-            prev["state"] = ParticipantState.WAITING
-            prev["start_time"] = None
+            self.participants.pause(self.current_speaker, time.time())
 
         self.current_speaker = name
-        pdata = self.participants[name]
-        pdata["state"] = ParticipantState.SPEAKING
-        pdata["start_time"] = time.time()
+        self.participants.start(name, time.time())
 
         self.status_var.set(f"{name.capitalize()} is now speaking.")
         self.update_meeting_tree()
@@ -359,18 +350,14 @@ class ScrumTimekeeper:
 
     def stop_speaker(self, name):
         pdata = self.participants.get(name)
-        if not pdata or pdata["state"] != ParticipantState.SPEAKING:
+        if not pdata or pdata.state != ParticipantState.SPEAKING:
             return
 
-        if pdata["start_time"]:
-            elapsed = time.time() - pdata["start_time"]
-            pdata["T_used"] += elapsed
-
-        pdata["state"] = ParticipantState.WAITING
-        pdata["start_time"] = None
+        self.participants.pause(name, time.time())
         self.update_meeting_tree()
 
         if self.current_speaker == name:
+            self.cancel_speaker_timers()
             self.current_speaker = None
 
 
@@ -379,6 +366,8 @@ class ScrumTimekeeper:
 
     def end_meeting(self):
         self.meeting_active = False
+        self.timer.clear()
+        self.meeting_view.stop_live_refresh(self.root)
         self.stop_listening_flag.set()
         if self.listening_thread:
             self.listening_thread.join(timeout=2)
@@ -387,36 +376,34 @@ class ScrumTimekeeper:
 
     def show_meeting_summary(self):
         summary = "Meeting Summary:\n\n"
+        coverage = self.agenda_coverage()
         for name, pdata in self.participants.items():
-            summary += f"{name.capitalize()} (used {pdata['T_used'] / 60:.2f} min):\n"
-            similarity = self.check_similarity_to_agenda(pdata["spoken_lines"])
+            summary += f"{name.capitalize()} (used {pdata.T_used / 60:.2f} min):\n"
+            scores = coverage.get(name)
+            similarity = float(scores.max()) if scores is not None else 0.0
             summary += f"Similarity to agenda: {similarity:.2f}\n"
+            if scores is not None:
+                topics = ", ".join(f"{topic} {score:.2f}" for topic, score in zip(self.agenda_similarity.topic_names, scores))
+                summary += f"Topic coverage: {topics}\n"
             summary += "Spoken lines:\n"
-            for line in pdata["spoken_lines"]:
+            for line in pdata.spoken_lines:
                 summary += f"  - {line}\n"
             summary += "\n"
         messagebox.showinfo("Meeting Summary", summary)
 
+    def handle_command(self, command, participant):
+        # Runs on the Tk thread, delivered by the command bus
+        if command == "stop" and participant == self.current_speaker:
+            self.stop_speaker(participant)
+        elif command == "start" and participant:
+            self.set_speaker(participant)
+
     def main_loop(self):
-        def command_handler():
-            while True:  # <--- allow handling even outside meeting time
-                try:
-                    command, participant = self.command_queue.get(timeout=0.5)
-                    logging.debug(f"Handling command: {command} for {participant}")
-
-                    if command == "stop" and participant == self.current_speaker:
-                        self.stop_speaker(participant)
-                    elif command == "start":
-                        self.set_speaker(participant)
-                except queue.Empty:
-                    continue
-
-        threading.Thread(target=command_handler, daemon=True).start()
         self.root.mainloop()
 
 
-
 if __name__ == "__main__":
     root = tk.Tk()
     app = ScrumTimekeeper(root)
+    registry.warm(["sim_model"])
     app.main_loop()
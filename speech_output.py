@@ -0,0 +1,208 @@
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import tempfile
+import threading
+
+PRIORITY_INTERRUPT = 0
+PRIORITY_NORMAL = 10
+PRIORITY_BACKGROUND = 20
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "scrum_tts_cache")
+
+def time_up_prompt(participant):
+    return f"{participant.capitalize()}, your time is up. Please wrap it up."
+
+class SpeechRequest:
+    def __init__(self, text, priority, seq, render_only=False):
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.render_only = render_only
+        self.cancelled = False
+        self.interrupted = False
+        self.done = threading.Event()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def cancel(self):
+        self.cancelled = True
+
+class NullBackend:
+    # Headless backend: records what would have been said
+    def __init__(self):
+        self.spoken = []
+
+    def speak(self, text):
+        self.spoken.append(text)
+
+    def render(self, text, path):
+        return False
+
+    def play(self, path):
+        return False
+
+    def stop(self):
+        # Returns True only if something was actually cut off
+        return False
+
+class FileBackend(NullBackend):
+    # Headless backend that appends every utterance to a text file
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def speak(self, text):
+        super().speak(text)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+class Pyttsx3Backend:
+    # pyttsx3 engines belong to the thread that created them, so the engine is
+    # created lazily on the worker thread and reused for every request
+    def __init__(self):
+        self._engine = None
+        self._playback = None
+        self._speaking = False
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+        return self._engine
+
+    def speak(self, text):
+        self.engine.say(text)
+        self._speaking = True
+        try:
+            self.engine.runAndWait()
+        finally:
+            self._speaking = False
+
+    def render(self, text, path):
+        # Rendered next to the target and renamed, so an interrupted render is never cached
+        partial = path + ".part.wav"
+        self.engine.save_to_file(text, partial)
+        self.engine.runAndWait()
+        if not os.path.exists(partial):
+            return False
+        os.replace(partial, path)
+        return True
+
+    def play(self, path):
+        # Cached audio needs simpleaudio; without it the caller speaks the text instead
+        try:
+            import simpleaudio
+        except ImportError:
+            return False
+        self._playback = simpleaudio.WaveObject.from_wave_file(path).play()
+        self._playback.wait_done()
+        self._playback = None
+        return True
+
+    def stop(self):
+        playback = self._playback
+        if playback is not None and playback.is_playing():
+            playback.stop()
+            return True
+        if self._speaking:
+            self._engine.stop()
+            return True
+        return False
+
+def speech_backend_from_env():
+    # SCRUM_TTS_BACKEND selects pyttsx3 (default), null, or file (with SCRUM_TTS_FILE)
+    name = os.environ.get("SCRUM_TTS_BACKEND", "pyttsx3")
+    if name == "null":
+        return NullBackend()
+    if name == "file":
+        return FileBackend(os.environ.get("SCRUM_TTS_FILE", "tts_output.txt"))
+    return Pyttsx3Backend()
+
+class SpeechWorker:
+    # Single long-lived speech thread fed by a priority queue. A request with a
+    # higher priority (lower number) stops the one playing, which is requeued
+    # and replayed afterwards unless it was cancelled.
+    def __init__(self, backend=None, cache_dir=DEFAULT_CACHE_DIR):
+        self.backend = backend or speech_backend_from_env()
+        self.cache_dir = cache_dir
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._thread = None
+
+    def say(self, text, priority=PRIORITY_NORMAL):
+        return self._put(SpeechRequest(text, priority, next(self._seq)))
+
+    def prerender(self, texts):
+        # Renders prompts to cached audio in the background so they play instantly later
+        return [self._put(SpeechRequest(text, PRIORITY_BACKGROUND, next(self._seq), render_only=True))
+                for text in texts if not os.path.exists(self.cache_path(text))]
+
+    def cancel_all(self):
+        with self._cond:
+            for request in self._heap:
+                request.cancel()
+            if self._current is not None:
+                self._current.cancel()
+                self.backend.stop()
+
+    def cache_path(self, text):
+        return os.path.join(self.cache_dir, hashlib.sha1(text.encode("utf-8")).hexdigest() + ".wav")
+
+    def _put(self, request):
+        with self._cond:
+            heapq.heappush(self._heap, request)
+            current = self._current
+            # Only requeued if playback was really cut off: a backend that cannot stop,
+            # or a request that just finished, would otherwise be spoken twice
+            if current is not None and request.priority < current.priority and not current.render_only:
+                if self.backend.stop():
+                    current.interrupted = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return request
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                request = heapq.heappop(self._heap)
+                if request.cancelled:
+                    request.done.set()
+                    continue
+                self._current = request
+            try:
+                self._perform(request)
+            except Exception as e:
+                logging.error(f"TTS error: {e}")
+            with self._cond:
+                self._current = None
+                if request.interrupted and not request.cancelled:
+                    request.interrupted = False
+                    heapq.heappush(self._heap, request)
+                else:
+                    request.done.set()
+
+    def _perform(self, request):
+        path = self.cache_path(request.text)
+        if request.render_only:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.backend.render(request.text, path)
+            return
+        if os.path.exists(path):
+            try:
+                if self.backend.play(path):
+                    return
+            except Exception as e:
+                # e.g. pyttsx3 saved a non-WAV file; the prompt must still be heard
+                logging.error(f"Cached TTS playback failed, speaking instead: {e}")
+        self.backend.speak(request.text)
@@ -0,0 +1,313 @@
+import json
+import logging
+import os
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHUNK_MS = 30
+
+class RingBuffer:
+    # Bounded chunk buffer between capture and segmentation. Capture never
+    # blocks: when the consumer falls behind the oldest chunk is dropped.
+    def __init__(self, max_chunks):
+        self._chunks = deque(maxlen=max_chunks)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, chunk):
+        with self._cond:
+            if len(self._chunks) == self._chunks.maxlen:
+                self.dropped += 1
+            self._chunks.append(chunk)
+            self._cond.notify()
+
+    def get(self):
+        # Returns None once the buffer is closed and drained
+        with self._cond:
+            while not self._chunks and not self._closed:
+                self._cond.wait()
+            return self._chunks.popleft() if self._chunks else None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._chunks)
+
+class MicrophoneSource:
+    def __init__(self, microphone=None, chunk_ms=CHUNK_MS):
+        import speech_recognition as sr
+        self.microphone = microphone or sr.Microphone(sample_rate=SAMPLE_RATE)
+        self.chunk_ms = chunk_ms
+        self.sample_rate = self.microphone.SAMPLE_RATE
+        self.sample_width = self.microphone.SAMPLE_WIDTH
+
+    def chunks(self, stop_event):
+        with self.microphone as source:
+            frames = int(self.sample_rate * self.chunk_ms / 1000)
+            while not stop_event.is_set():
+                yield source.stream.read(frames)
+
+class WaveFileSource:
+    # Plays a 16-bit PCM wav file through the pipeline, for testing without a
+    # microphone. realtime=True paces chunks like a live capture would.
+    def __init__(self, path, chunk_ms=CHUNK_MS, realtime=False):
+        self.path = path
+        self.chunk_ms = chunk_ms
+        self.realtime = realtime
+        with wave.open(path, "rb") as wav:
+            self.sample_rate = wav.getframerate()
+            self.sample_width = wav.getsampwidth()
+            if wav.getnchannels() != 1 or self.sample_width != SAMPLE_WIDTH:
+                raise ValueError(f"{path} must be mono 16-bit PCM")
+
+    def chunks(self, stop_event):
+        frames = int(self.sample_rate * self.chunk_ms / 1000)
+        with wave.open(self.path, "rb") as wav:
+            while not stop_event.is_set():
+                chunk = wav.readframes(frames)
+                if not chunk:
+                    return
+                yield chunk
+                if self.realtime:
+                    time.sleep(self.chunk_ms / 1000)
+
+class EnergyVAD:
+    # Splits a chunk stream into utterances by RMS energy. Without a fixed
+    # threshold, the first calibration_chunks set the ambient noise floor.
+    def __init__(self, chunk_ms=CHUNK_MS, threshold=None, calibration_chunks=15, threshold_ratio=3.0,
+                 min_threshold=200.0, silence_ms=600, max_segment_ms=10000, pre_roll_ms=150):
+        self.threshold = threshold
+        self.calibration_chunks = calibration_chunks
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+        self.silence_chunks = max(1, silence_ms // chunk_ms)
+        self.max_segment_chunks = max(1, max_segment_ms // chunk_ms)
+        self._calibration = []
+        self._pre_roll = deque(maxlen=max(1, pre_roll_ms // chunk_ms))
+        self._segment = None
+        self._silent = 0
+
+    @staticmethod
+    def energy(chunk):
+        samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+    def process(self, chunk):
+        # Returns a list of ("begin", chunks), ("audio", chunk) and ("end", audio) events
+        energy = self.energy(chunk)
+        if self.threshold is None:
+            self._calibration.append(energy)
+            if len(self._calibration) >= self.calibration_chunks:
+                noise = sum(self._calibration) / len(self._calibration)
+                self.threshold = max(self.min_threshold, noise * self.threshold_ratio)
+                logging.debug(f"VAD threshold calibrated to {self.threshold:.0f}")
+            return []
+        if self._segment is None:
+            self._pre_roll.append(chunk)
+            if energy < self.threshold:
+                return []
+            self._segment = list(self._pre_roll)
+            self._pre_roll.clear()
+            self._silent = 0
+            return [("begin", list(self._segment))]
+        self._segment.append(chunk)
+        self._silent = self._silent + 1 if energy < self.threshold else 0
+        if self._silent >= self.silence_chunks or len(self._segment) >= self.max_segment_chunks:
+            return [("audio", chunk), self.flush()]
+        return [("audio", chunk)]
+
+    def flush(self):
+        segment, self._segment = self._segment, None
+        return ("end", b"".join(segment)) if segment else None
+
+class GoogleBackend:
+    supports_partial = False
+
+    def __init__(self, recognizer=None, language="en-US"):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = recognizer or sr.Recognizer()
+        self.language = language
+
+    def transcribe(self, audio, sample_rate, sample_width):
+        try:
+            return self.recognizer.recognize_google(self.sr.AudioData(audio, sample_rate, sample_width),
+                                                    language=self.language).lower()
+        except self.sr.UnknownValueError:
+            return ""
+
+class VoskStream:
+    # Vosk finalizes text at its own endpoints inside a long utterance; those
+    # chunks are kept so partials and the final result cover the whole segment
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.finals = []
+
+    def feed(self, chunk):
+        if self.recognizer.AcceptWaveform(chunk):
+            self._keep(json.loads(self.recognizer.Result()).get("text", ""))
+            return self._join()
+        return self._join(json.loads(self.recognizer.PartialResult()).get("partial", ""))
+
+    def finish(self):
+        self._keep(json.loads(self.recognizer.FinalResult()).get("text", ""))
+        return self._join()
+
+    def _keep(self, text):
+        if text:
+            self.finals.append(text)
+
+    def _join(self, tail=""):
+        return " ".join(self.finals + [tail] if tail else self.finals)
+
+class VoskBackend:
+    # Offline recognition; streams partial hypotheses while the utterance is open
+    supports_partial = True
+
+    def __init__(self, model_path):
+        import vosk
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def stream(self, sample_rate):
+        return VoskStream(self.vosk.KaldiRecognizer(self.model, sample_rate))
+
+    def transcribe(self, audio, sample_rate, sample_width):
+        stream = self.stream(sample_rate)
+        stream.feed(audio)
+        return stream.finish()
+
+class WhisperBackend:
+    # Offline recognition of whole utterances with faster-whisper (expects 16 kHz audio)
+    supports_partial = False
+
+    def __init__(self, model_size="base.en", threads=2):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=threads)
+
+    def transcribe(self, audio, sample_rate, sample_width):
+        samples = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _ = self.model.transcribe(samples, language="en")
+        return " ".join(segment.text.strip() for segment in segments).lower()
+
+def backend_from_env(recognizer=None):
+    # SCRUM_SPEECH_BACKEND selects google (default), vosk or whisper
+    name = os.environ.get("SCRUM_SPEECH_BACKEND", "google")
+    if name == "vosk":
+        return VoskBackend(os.environ.get("SCRUM_VOSK_MODEL", "vosk-model-small-en-us"))
+    if name == "whisper":
+        return WhisperBackend(os.environ.get("SCRUM_WHISPER_MODEL", "base.en"))
+    return GoogleBackend(recognizer)
+
+def source_from_env(microphone=None):
+    # SCRUM_AUDIO_FILE replays a wav file instead of listening to the microphone
+    path = os.environ.get("SCRUM_AUDIO_FILE")
+    return WaveFileSource(path, realtime=True) if path else MicrophoneSource(microphone)
+
+class StreamingRecognizer:
+    # capture thread -> ring buffer -> VAD segmenter thread -> recognizer pool.
+    # Final transcripts are delivered in utterance order even though the pool
+    # may finish them out of order.
+    def __init__(self, source, backend, on_final, on_partial=None, workers=2, vad=None, buffer_ms=5000):
+        self.source = source
+        self.backend = backend
+        self.on_final = on_final
+        self.on_partial = on_partial
+        self.vad = vad or EnergyVAD(chunk_ms=source.chunk_ms)
+        self.buffer = RingBuffer(max(1, buffer_ms // source.chunk_ms))
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recognizer")
+        self.stop_event = threading.Event()
+        self._threads = []
+        self._results = {}
+        self._next_delivery = 1
+        self._delivery_lock = threading.Lock()
+        self.segments = 0
+        self.latencies = deque(maxlen=1000)
+
+    def start(self):
+        self._threads = [threading.Thread(target=self._capture, daemon=True),
+                         threading.Thread(target=self._segment, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=2):
+        self.stop_event.set()
+        self.join(timeout)
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+        self.pool.shutdown(wait=True)
+
+    def _capture(self):
+        try:
+            for chunk in self.source.chunks(self.stop_event):
+                self.buffer.put(chunk)
+        except Exception as e:
+            logging.error(f"Audio capture failed: {e}")
+        finally:
+            self.buffer.close()
+
+    def _segment(self):
+        stream = None
+        while True:
+            chunk = self.buffer.get()
+            events = self.vad.process(chunk) if chunk is not None else [self.vad.flush()]
+            for event in events:
+                if event is None:
+                    continue
+                kind, payload = event
+                if kind == "begin":
+                    self.segments += 1
+                    stream = self.backend.stream(self.source.sample_rate) if self.backend.supports_partial else None
+                    for pre in payload:
+                        self._feed(stream, pre)
+                elif kind == "audio":
+                    self._feed(stream, payload)
+                elif kind == "end":
+                    self._submit(self.segments, stream, payload)
+                    stream = None
+            if chunk is None:
+                return
+
+    def _feed(self, stream, chunk):
+        if stream is None:
+            return
+        partial = stream.feed(chunk)
+        if partial and self.on_partial:
+            self.on_partial(self.segments, partial)
+
+    def _submit(self, segment_id, stream, audio):
+        ended_at = time.perf_counter()
+        if stream is not None:
+            job = stream.finish
+        else:
+            job = lambda: self.backend.transcribe(audio, self.source.sample_rate, self.source.sample_width)
+        future = self.pool.submit(job)
+        future.add_done_callback(lambda f: self._deliver(segment_id, f, ended_at))
+
+    def _deliver(self, segment_id, future, ended_at):
+        try:
+            text = future.result()
+        except Exception as e:
+            logging.error(f"Recognition failed for segment {segment_id}: {e}")
+            text = ""
+        self.latencies.append(time.perf_counter() - ended_at)
+        with self._delivery_lock:
+            self._results[segment_id] = text
+            while self._next_delivery in self._results:
+                ready = self._results.pop(self._next_delivery)
+                if ready:
+                    self.on_final(self._next_delivery, ready)
+                self._next_delivery += 1
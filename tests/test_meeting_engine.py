@@ -0,0 +1,85 @@
+from meeting_engine import ManualClock, MeetingEngine
+from roster import ParticipantState
+
+def engine_with(*names, seconds=60):
+    clock = ManualClock()
+    engine = MeetingEngine(clock=clock)
+    for name in names:
+        engine.add_participant(name, seconds)
+    engine.start()
+    return engine, clock
+
+def test_end_counts_the_running_turn():
+    engine, clock = engine_with("alice")
+    engine.set_speaker("alice")
+    clock.advance(30)
+    engine.end()
+    alice = engine.participants["alice"]
+    assert (alice.state, alice.T_used, engine.current_speaker) == (ParticipantState.DONE, 30.0, None)
+
+def test_end_marks_an_overrunning_speaker_exceeded():
+    engine, clock = engine_with("alice")
+    events = []
+    engine.subscribe(lambda event: events.append(event.kind))
+    engine.set_speaker("alice")
+    clock.advance(75)
+    engine.end()
+    alice = engine.participants["alice"]
+    assert (alice.state, alice.T_used) == (ParticipantState.EXCEEDED, 75.0)
+    assert events[-2:] == ["time_exceeded", "meeting_ended"]
+
+def test_interpret_start_stop_and_statements():
+    engine, _ = engine_with("alice", "bob")
+    assert engine.interpret("bob, your turn") == ("start", "bob")
+    assert engine.interpret("let's start") == ("start", "alice")
+    assert engine.interpret("hello everyone") is None
+    engine.set_speaker("alice")
+    assert engine.interpret("i fixed the login bug") == ("statement", "alice")
+    assert engine.interpret("that's all") == ("stop", "alice")
+    assert engine.interpret("bob, your turn", partial=True) is None
+
+def test_feed_runs_a_turn():
+    engine, clock = engine_with("alice", "bob")
+    events = []
+    engine.subscribe(lambda event: events.append((event.kind, event.participant)))
+    engine.feed("Bob, your turn")
+    clock.advance(20)
+    engine.feed("I reviewed the API changes")
+    engine.feed("That's all")
+    bob = engine.participants["bob"]
+    assert (bob.state, bob.T_used, bob.spoken_lines) == (ParticipantState.DONE, 20.0, ["i reviewed the api changes"])
+    assert events == [("speaker_started", "bob"), ("statement", "bob"), ("speaker_stopped", "bob")]
+    assert engine.current_speaker is None
+
+def test_feed_fires_warning_and_exceeded_when_due():
+    engine, clock = engine_with("alice")
+    events = []
+    engine.subscribe(lambda event: events.append(event.kind))
+    engine.feed("alice, your turn")
+    clock.advance(50)
+    engine.feed("still going")
+    clock.advance(15)
+    assert engine.feed("and one more thing") is None
+    alice = engine.participants["alice"]
+    assert (alice.state, alice.T_used, engine.current_speaker) == (ParticipantState.EXCEEDED, 65.0, None)
+    assert events == ["speaker_started", "time_warning", "statement", "time_exceeded"]
+
+def test_exceed_only_applies_to_the_current_speaker():
+    engine, clock = engine_with("alice", "bob")
+    engine.set_speaker("alice")
+    clock.advance(61)
+    assert not engine.exceed("bob")
+    assert not engine.exceed("carol")
+    assert engine.exceed("alice")
+    assert not engine.exceed("alice")
+
+def test_removing_the_current_speaker_clears_them():
+    engine, clock = engine_with("alice", "bob")
+    engine.set_speaker("alice")
+    engine.remove_participant("alice")
+    assert engine.current_speaker is None
+    clock.advance(120)
+    engine.check_time()
+    assert not engine.exceed("alice")
+    assert not engine.warn("alice")
+    assert engine.feed("bob, your turn") == ("start", "bob")
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from meeting_server import RoomManager, make_app
+
+def manager():
+    # No models: commands are applied exactly as posted
+    return RoomManager(dispatcher=None, classify_batch=None)
+
+def test_room_commands_start_and_stop_a_speaker():
+    async def run():
+        room = manager().create_room("team", {"alice": 60, "bob": 60})
+        assert room.command("start_meeting")
+        assert room.command("start", "alice")
+        assert room.engine.current_speaker == "alice"
+        assert room.command("stop", "alice")
+        assert room.engine.current_speaker is None
+        assert room.engine.active
+        assert room.command("end_meeting")
+        assert not room.engine.active
+        room.close()
+    asyncio.run(run())
+
+def test_http_commands_drive_a_room():
+    pytest.importorskip("aiohttp")
+    from aiohttp.test_utils import TestClient, TestServer
+
+    async def run():
+        async with TestClient(TestServer(make_app(manager()))) as client:
+            resp = await client.post("/rooms", json={"room": "team", "participants": {"alice": 60, "bob": 60}})
+            assert resp.status == 201
+
+            async def command(command, participant=None):
+                resp = await client.post("/rooms/team/commands", json={"command": command, "participant": participant})
+                return await resp.json()
+
+            state = await command("start_meeting")
+            assert state["applied"] and state["active"]
+            state = await command("start", "alice")
+            assert state["applied"] and state["current_speaker"] == "alice"
+            state = await command("start", "bob")
+            assert state["current_speaker"] == "bob"
+            states = {row["name"]: row["state"] for row in state["participants"]}
+            assert states["bob"] == "SPEAKING" and states["alice"] != "SPEAKING"
+            state = await command("stop", "bob")
+            assert state["applied"] and state["current_speaker"] is None and state["active"]
+            state = await command("end_meeting")
+            assert not state["active"]
+    asyncio.run(run())
@@ -0,0 +1,18 @@
+import os
+
+from replay import load_csv_meetings, run
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "category_labeled.csv")
+
+def test_csv_replay_event_counts():
+    results = run(load_csv_meetings(SAMPLE))
+    assert (results["standups"], results["utterances"]) == (99, 1177)
+    assert results["events"] == {
+        "participant_added": 608,
+        "meeting_started": 99,
+        "speaker_started": 1061,
+        "statement": 886,
+        "speaker_stopped": 1061,
+        "time_warning": 3,
+        "meeting_ended": 99,
+    }
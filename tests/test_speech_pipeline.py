@@ -0,0 +1,84 @@
+import threading
+import time
+import wave
+
+import numpy as np
+
+from speech_pipeline import SAMPLE_RATE, EnergyVAD, StreamingRecognizer, WaveFileSource
+
+CHUNK = SAMPLE_RATE * 30 // 1000
+
+def write_wav(path, *parts):
+    # parts: (chunks, tone) pairs of 30 ms chunks, either silent or a 440 Hz tone
+    samples = []
+    for chunks, tone in parts:
+        t = np.arange(chunks * CHUNK) / SAMPLE_RATE
+        samples.append((8000 * np.sin(2 * np.pi * 440 * t) if tone else np.zeros_like(t)).astype(np.int16))
+    audio = np.concatenate(samples).tobytes()
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(audio)
+    return audio
+
+class StubStream:
+    def __init__(self, number):
+        self.number = number
+        self.audio = []
+
+    def feed(self, chunk):
+        self.audio.append(chunk)
+        loud = sum(EnergyVAD.energy(c) > 1000 for c in self.audio)
+        return " ".join(["tone"] * loud)
+
+    def finish(self):
+        if self.number == 1:
+            # The first segment finishes last, so delivery has to reorder it
+            time.sleep(0.2)
+        return f"utterance {self.number}"
+
+class StubBackend:
+    supports_partial = True
+
+    def __init__(self):
+        self.streams = []
+
+    def stream(self, sample_rate):
+        self.streams.append(StubStream(len(self.streams) + 1))
+        return self.streams[-1]
+
+def test_wav_segments_reach_the_backend_in_order(tmp_path):
+    path = tmp_path / "standup.wav"
+    audio = write_wav(path, (20, False), (20, True), (30, False), (10, True), (40, False))
+    backend = StubBackend()
+    calls = []
+    lock = threading.Lock()
+
+    def record(kind):
+        def callback(segment, text):
+            with lock:
+                calls.append((kind, segment, text))
+        return callback
+
+    recognizer = StreamingRecognizer(WaveFileSource(str(path)), backend, record("final"),
+                                     on_partial=record("partial"), workers=2)
+    recognizer.start()
+    recognizer.join(timeout=5)
+
+    # 15 chunks calibrate the VAD, each segment opens with 5 chunks of pre-roll
+    # and closes after 20 silent chunks
+    assert recognizer.segments == 2
+    first, second = backend.streams
+    assert b"".join(first.audio) == audio[16 * CHUNK * 2:60 * CHUNK * 2]
+    assert b"".join(second.audio) == audio[66 * CHUNK * 2:100 * CHUNK * 2]
+
+    finals = [call for call in calls if call[0] == "final"]
+    assert finals == [("final", 1, "utterance 1"), ("final", 2, "utterance 2")]
+    for segment, tones in [(1, 20), (2, 10)]:
+        partials = [text for kind, number, text in calls if kind == "partial" and number == segment]
+        assert partials[0] == "tone"
+        assert partials[-1] == " ".join(["tone"] * tones)
+        assert calls.index(("final", segment, f"utterance {segment}")) > calls.index(("partial", segment, partials[-1]))
+    partial_segments = [number for kind, number, _ in calls if kind == "partial"]
+    assert partial_segments == sorted(partial_segments)
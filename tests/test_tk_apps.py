@@ -0,0 +1,72 @@
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("tkinter")
+pytest.importorskip("speech_recognition")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FakeRoot:
+    def title(self, text):
+        pass
+
+    def geometry(self, size):
+        pass
+
+    def after(self, delay, fn):
+        fn()
+
+class FakeVar:
+    def __init__(self, value=""):
+        self.value = value
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+def load_app(filename):
+    spec = importlib.util.spec_from_file_location(filename.replace(" ", "_")[:-3], os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def headless(tmp_path, monkeypatch):
+    # Everything the apps persist goes to tmp_path; no audio, display or server
+    monkeypatch.setenv("SCRUM_TRANSCRIPT_DIR", str(tmp_path / "transcripts"))
+    monkeypatch.setenv("SCRUM_ANALYTICS_DB", str(tmp_path / "analytics.db"))
+    monkeypatch.setenv("SCRUM_BLOCKER_INDEX", str(tmp_path / "blocker_index"))
+    monkeypatch.setenv("SCRUM_TTS_BACKEND", "null")
+    monkeypatch.delenv("SCRUM_SERVER_URL", raising=False)
+    monkeypatch.delenv("SCRUM_EMBEDDING_CACHE", raising=False)
+
+    def build(filename):
+        module = load_app(filename)
+        monkeypatch.setattr(module.sr, "Microphone", lambda **kwargs: None)
+        monkeypatch.setattr(module.tk, "StringVar", FakeVar)
+        monkeypatch.setattr(module.ScrumTimekeeper, "setup_gui", lambda self: None)
+        return module.ScrumTimekeeper(FakeRoot())
+    return build
+
+@pytest.mark.parametrize("filename", ["new.py", "scrum time moderator.py"])
+def test_app_builds_and_records_statements(headless, filename):
+    app = headless(filename)
+    # Stand-in for the models: every line is a "today" statement
+    app.classifier.classify_batch = lambda lines: [("today", 1.0, 0, 1.0) for _ in lines]
+    app.engine.add_participant("alice", 60)
+    app.engine.start()
+    app.engine.set_speaker("alice")
+    app.record_statement("i finished the login page")
+    app.classifier.wait()
+    assert app.participants["alice"].classified == [("today", 1.0, 0, 1.0)]
+    assert app.meeting_active and app.current_speaker == "alice"
+
+def test_moderator_sets_up_similarity(headless):
+    app = headless("scrum time moderator.py")
+    assert len(app.agenda) == 3
+    assert app.agenda_similarity is not None and app.blocker_index is not None
+    assert app.embedding_cache.model_id
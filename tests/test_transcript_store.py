@@ -0,0 +1,31 @@
+import threading
+
+import pytest
+
+from transcript_store import TranscriptStore
+
+def test_scan_filters_and_reads_the_buffer(tmp_path):
+    store = TranscriptStore(str(tmp_path), flush_every=10)
+    for i in range(25):
+        store.record(f"m{i % 2}", float(i), "alice" if i < 20 else "bob", f"line {i}")
+    assert [row["time"] for row in store.scan(meeting="m0", since=4, until=12)] == [4.0, 6.0, 8.0, 10.0]
+    assert [row["text"] for row in store.scan(speaker="bob")] == [f"line {i}" for i in range(20, 25)]
+
+def test_scan_during_compaction_sees_every_row_once(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = TranscriptStore(str(tmp_path), flush_every=20, segment_records=100, compact_segments=2)
+    count = 10000
+
+    def write():
+        for i in range(count):
+            store.record("m", float(i), "alice", f"line {i}")
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive():
+        times = [int(row["time"]) for row in store.scan(meeting="m")]
+        # Everything recorded up to the snapshot, nothing missing or repeated
+        assert sorted(times) == list(range(len(times)))
+    writer.join()
+    store.close()
+    assert store.stats()["segments"] == 0 and store.stats()["parquet_parts"] > 1
+    assert [int(row["time"]) for row in store.scan(meeting="m")] == list(range(count))
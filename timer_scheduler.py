@@ -0,0 +1,84 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+class TimerScheduler:
+    # One thread and a heap of deadlines for all timers of a meeting. Scheduling
+    # a key that is already pending replaces it; cancelled entries are dropped
+    # lazily when they reach the top of the heap.
+    def __init__(self, clock=time.monotonic, jitter_samples=1000):
+        self.clock = clock
+        self._heap = []
+        self._pending = {}
+        self._ids = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.fired = 0
+        self.jitter = deque(maxlen=jitter_samples)
+
+    def schedule(self, key, delay, callback):
+        with self._cond:
+            deadline = self.clock() + max(delay, 0)
+            entry_id = next(self._ids)
+            self._pending[key] = entry_id
+            heapq.heappush(self._heap, (deadline, entry_id, key, callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return deadline
+
+    def cancel(self, key):
+        with self._cond:
+            self._pending.pop(key, None)
+
+    def clear(self):
+        with self._cond:
+            self._pending.clear()
+            self._heap.clear()
+
+    def _next_due(self):
+        # Called with the lock held. Returns a due entry, or waits for one.
+        while self._heap and self._pending.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self._cond.wait()
+            return None
+        delay = self._heap[0][0] - self.clock()
+        if delay > 0:
+            self._cond.wait(delay)
+            return None
+        deadline, _, key, callback = heapq.heappop(self._heap)
+        del self._pending[key]
+        return deadline, key, callback
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due = self._next_due()
+            if due is None:
+                continue
+            deadline, key, callback = due
+            self.jitter.append(self.clock() - deadline)
+            self.fired += 1
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"Timer {key} callback failed: {e}")
+
+    @property
+    def thread_count(self):
+        return 1 if self._thread is not None and self._thread.is_alive() else 0
+
+    def stats(self):
+        jitter = list(self.jitter)
+        return {
+            "threads": self.thread_count,
+            "pending": len(self._pending),
+            "fired": self.fired,
+            "mean_jitter_ms": 1000 * sum(jitter) / len(jitter) if jitter else 0.0,
+            "max_jitter_ms": 1000 * max(jitter) if jitter else 0.0,
+        }
@@ -0,0 +1,345 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import time
+import zlib
+
+import joblib
+import pandas as pd
+import sklearn
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.pipeline import Pipeline
+
+from fused_model import FusedClassifier, agreement, make_shared_vectorizer
+from model_registry import ARTIFACT_PATHS
+from numpy_scorer import export_pair
+
+# Labeled data and the registry names of the artifacts each task publishes
+TASKS = {
+    "category": {"data": "category_labeled.csv", "vectorizer": "cat_vectorizer", "classifier": "cat_clf",
+                 "defaults": {"max_features": 5000}},
+    "start_stop": {"data": "start_stop_labeled.csv", "vectorizer": "ss_vectorizer", "classifier": "ss_clf",
+                   "defaults": {}},
+}
+FUSED = "fused"
+ARTIFACT_DIR = "artifacts"
+CACHE_DIR = os.path.join(ARTIFACT_DIR, "cache")
+TEST_FRACTION = 0.2
+MAX_ITER = 1000
+# The fused model is only published if both heads agree with the current pair this often
+MIN_AGREEMENT = 0.95
+
+# Both solvers are searched; liblinear has no multinomial mode, so it runs one-vs-rest
+SEARCH_GRID = {
+    "ngram_range": [(1, 1), (1, 2)],
+    "max_features": [5000, 20000, None],
+    "C": [0.3, 1.0, 3.0, 10.0],
+    "solver": ["saga", "liblinear"],
+}
+
+def make_classifier(solver="lbfgs", C=1.0):
+    clf = LogisticRegression(solver=solver, C=C, max_iter=MAX_ITER)
+    if solver == "liblinear":
+        return OneVsRestClassifier(clf)
+    return clf
+
+def fit_tfidf(texts, ngram_range, max_features):
+    vectorizer = TfidfVectorizer(ngram_range=tuple(ngram_range), max_features=max_features)
+    return vectorizer, vectorizer.fit_transform(texts)
+
+class CachedTfidf(BaseEstimator, TransformerMixin):
+    # TfidfVectorizer step whose fit is cached in `memory` by the texts and the
+    # vectorizer settings only. Pipeline(memory=...) would also key on the labels,
+    # so any label edit re-tokenized everything.
+    def __init__(self, ngram_range=(1, 1), max_features=None, memory=None):
+        self.ngram_range = ngram_range
+        self.max_features = max_features
+        self.memory = memory
+
+    def fit_transform(self, X, y=None):
+        fit = self.memory.cache(fit_tfidf) if self.memory is not None else fit_tfidf
+        self.vectorizer_, features = fit(list(X), tuple(self.ngram_range), self.max_features)
+        return features
+
+    def fit(self, X, y=None):
+        self.fit_transform(X)
+        return self
+
+    def transform(self, X):
+        return self.vectorizer_.transform(X)
+
+def make_pipeline(params, memory=None):
+    # `memory` caches the fitted vectorizer and its output; the classifier is
+    # always fitted on the (possibly cached) matrix
+    return Pipeline([
+        ("vectorizer", CachedTfidf(ngram_range=tuple(params.get("ngram_range", (1, 1))),
+                                   max_features=params.get("max_features"), memory=memory)),
+        ("clf", make_classifier(params.get("solver", "lbfgs"), params.get("C", 1.0))),
+    ])
+
+def search_grid(grid):
+    # GridSearchCV parameter grids, one per solver since liblinear's C sits one level deeper
+    vectorizer = {"vectorizer__ngram_range": grid["ngram_range"], "vectorizer__max_features": grid["max_features"]}
+    return [{**vectorizer, "clf": [make_classifier(solver)],
+             ("clf__estimator__C" if solver == "liblinear" else "clf__C"): grid["C"]}
+            for solver in grid["solver"]]
+
+def flat_params(best):
+    # GridSearchCV.best_params_ -> the plain dict make_pipeline takes
+    clf = best["clf"]
+    solver = clf.estimator.solver if isinstance(clf, OneVsRestClassifier) else clf.solver
+    return {
+        "ngram_range": list(best["vectorizer__ngram_range"]),
+        "max_features": best["vectorizer__max_features"],
+        "solver": solver,
+        "C": best.get("clf__estimator__C", best.get("clf__C")),
+    }
+
+def is_test_row(text):
+    # Held-out rows are chosen by a hash of the text, not at random, so the split
+    # (and with it the cached vectorizer) stays the same when labels are edited
+    return zlib.crc32(text.encode("utf-8")) % 1000 < TEST_FRACTION * 1000
+
+def data_digest(df):
+    digest = hashlib.sha256()
+    for text, label in zip(df["text"], df["label"]):
+        digest.update(f"{text}\t{label}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def read_labeled(path):
+    # -> (all rows, training rows, held-out rows)
+    df = pd.read_csv(path).dropna(subset=["text", "label"])
+    df["text"] = df["text"].astype(str)
+    test_mask = df["text"].map(is_test_row)
+    return df, df[~test_mask], df[test_mask]
+
+def test_metrics(train_df, test_df, predicted):
+    metrics = {"train_rows": len(train_df), "test_rows": len(test_df)}
+    if len(test_df):
+        metrics["test_accuracy"] = float(accuracy_score(test_df["label"], predicted))
+        metrics["report"] = classification_report(test_df["label"], predicted, output_dict=True, zero_division=0)
+    return metrics
+
+def task_directory(task):
+    return os.path.join(ARTIFACT_DIR, task)
+
+def versions(task):
+    directory = task_directory(task)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name[1:]) for name in os.listdir(directory) if name[:1] == "v" and name[1:].isdigit())
+
+def load_manifest(task, version=None):
+    # The manifest of `version`, or of the newest one; None if nothing was trained yet
+    if version is None:
+        known = versions(task)
+        if not known:
+            return None
+        version = known[-1]
+    with open(os.path.join(task_directory(task), f"v{version:04d}", "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def dump_atomic(obj, path):
+    # Written next to the target and renamed, so the model registry's file watch
+    # never sees half a file
+    joblib.dump(obj, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+def new_version_directory(task):
+    version = (versions(task) or [0])[-1] + 1
+    version_dir = os.path.join(task_directory(task), f"v{version:04d}")
+    os.makedirs(version_dir)
+    return version, version_dir
+
+def write_manifest(version_dir, manifest):
+    manifest["versions"] = {"python": platform.python_version(), "sklearn": sklearn.__version__}
+    with open(os.path.join(version_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+def publish(task, version_dir):
+    # Copies a version's artifacts to the paths the moderator loads from
+    if task == FUSED:
+        dump_atomic(joblib.load(os.path.join(version_dir, "model.joblib")), ARTIFACT_PATHS[FUSED])
+    else:
+        spec = TASKS[task]
+        for kind in ("vectorizer", "classifier"):
+            dump_atomic(joblib.load(os.path.join(version_dir, f"{kind}.joblib")), ARTIFACT_PATHS[spec[kind]])
+        # Keep the scikit-learn-free copy in step with the joblib files
+        export_pair(spec["vectorizer"].split("_")[0])
+    logging.info(f"Published {version_dir}")
+
+def train(task, data=None, search=False, jobs=-1, folds=5, fast=False, cache=True, grid=None, publish_artifacts=True):
+    # Fits one task and writes artifacts/<task>/vNNNN/{vectorizer,classifier}.joblib
+    # plus manifest.json with parameters, metrics and timings. Returns the manifest.
+    #   search: cross-validated grid search over SEARCH_GRID on all `jobs` cores
+    #   fast:   reuse the parameters of the newest manifest instead of searching
+    spec = TASKS[task]
+    data = data or spec["data"]
+    timings = {}
+    start = time.perf_counter()
+    df, train_df, test_df = read_labeled(data)
+    timings["load"] = time.perf_counter() - start
+
+    memory = joblib.Memory(CACHE_DIR, verbose=0) if cache else None
+    previous = load_manifest(task)
+    params = {**spec["defaults"]}
+    search_results = None
+    if search:
+        start = time.perf_counter()
+        cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+        searcher = GridSearchCV(make_pipeline({}, memory), search_grid(grid or SEARCH_GRID), cv=cv,
+                                scoring="accuracy", n_jobs=jobs, refit=False)
+        searcher.fit(train_df["text"].tolist(), train_df["label"])
+        params = flat_params(searcher.best_params_)
+        search_results = {"candidates": len(searcher.cv_results_["params"]), "folds": folds,
+                          "best_cv_accuracy": float(searcher.best_score_)}
+        timings["search"] = time.perf_counter() - start
+    elif fast and previous is not None:
+        params = previous["params"]
+
+    start = time.perf_counter()
+    pipeline = make_pipeline(params, memory)
+    pipeline.fit(train_df["text"].tolist(), train_df["label"])
+    timings["fit"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predicted = pipeline.predict(test_df["text"].tolist()) if len(test_df) else []
+    metrics = test_metrics(train_df, test_df, predicted)
+    timings["evaluate"] = time.perf_counter() - start
+
+    version, version_dir = new_version_directory(task)
+    vectorizer, clf = pipeline.named_steps["vectorizer"].vectorizer_, pipeline.named_steps["clf"]
+    joblib.dump(vectorizer, os.path.join(version_dir, "vectorizer.joblib"))
+    joblib.dump(clf, os.path.join(version_dir, "classifier.joblib"))
+    manifest = {
+        "task": task,
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "data": {"path": data, "rows": len(df), "sha256": data_digest(df)},
+        "params": {**{"ngram_range": [1, 1], "max_features": None, "solver": "lbfgs", "C": 1.0}, **params},
+        "classes": [str(c) for c in clf.classes_],
+        "vocabulary_size": len(vectorizer.vocabulary_),
+        "search": search_results,
+        "metrics": metrics,
+        "timings": timings,
+    }
+    manifest["params"]["ngram_range"] = list(manifest["params"]["ngram_range"])
+    write_manifest(version_dir, manifest)
+    if publish_artifacts:
+        publish(task, version_dir)
+    return manifest
+
+def head_params(task):
+    # Classifier settings for a fused head: the newest manifest's, else the defaults
+    manifest = load_manifest(task)
+    return manifest["params"] if manifest else {**TASKS[task]["defaults"]}
+
+def train_fused(ss_data=None, cat_data=None, hashing=True, ngram_range=(1, 1), min_agreement=MIN_AGREEMENT,
+                publish_artifacts=True):
+    # Fits one shared vectorizer on the texts of both tasks and a head per task on
+    # top of it. Writes artifacts/fused/vNNNN/model.joblib and a manifest with the
+    # test accuracy of each head and its agreement with the published pair, and
+    # publishes only if both heads agree at least `min_agreement` of the time.
+    timings = {}
+    start = time.perf_counter()
+    data = {"start_stop": ss_data or TASKS["start_stop"]["data"], "category": cat_data or TASKS["category"]["data"]}
+    frames = {task: read_labeled(path) for task, path in data.items()}
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorizer = make_shared_vectorizer(hashing, ngram_range)
+    vectorizer.fit(pd.concat([train_df["text"] for _, train_df, _ in frames.values()]).tolist())
+    heads, metrics = {}, {}
+    for task, (_, train_df, test_df) in frames.items():
+        params = head_params(task)
+        heads[task] = make_classifier(params.get("solver", "lbfgs"), params.get("C", 1.0))
+        heads[task].fit(vectorizer.transform(train_df["text"].tolist()), train_df["label"])
+        predicted = heads[task].predict(vectorizer.transform(test_df["text"].tolist())) if len(test_df) else []
+        metrics[task] = test_metrics(train_df, test_df, predicted)
+    model = FusedClassifier(vectorizer, heads["start_stop"], heads["category"])
+    timings["fit"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lines = pd.concat([df["text"] for df, _, _ in frames.values()]).tolist()
+    pair = {task: (joblib.load(ARTIFACT_PATHS[TASKS[task]["vectorizer"]]), joblib.load(ARTIFACT_PATHS[TASKS[task]["classifier"]]))
+            for task in TASKS}
+    agreed = agreement(model, lines, pair["start_stop"], pair["category"])
+    timings["agreement"] = time.perf_counter() - start
+
+    version, version_dir = new_version_directory(FUSED)
+    joblib.dump(model, os.path.join(version_dir, "model.joblib"))
+    accepted = min(agreed["start_stop"], agreed["category"]) >= min_agreement
+    manifest = {
+        "task": FUSED,
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "data": {task: {"path": path, "rows": len(frames[task][0]), "sha256": data_digest(frames[task][0])}
+                 for task, path in data.items()},
+        "params": {"hashing": hashing, "ngram_range": list(ngram_range),
+                   "heads": {task: head_params(task) for task in data}},
+        "classes": {"start_stop": [str(c) for c in model.start_stop.classes_],
+                    "category": [str(c) for c in model.category.classes_]},
+        "metrics": {**metrics, "agreement": agreed, "min_agreement": min_agreement},
+        "published": bool(publish_artifacts and accepted),
+        "timings": timings,
+    }
+    write_manifest(version_dir, manifest)
+    if not accepted:
+        logging.warning(f"Not publishing {version_dir}: agreement with the current models "
+                        f"{agreed['start_stop']:.3f}/{agreed['category']:.3f} is below {min_agreement}")
+    elif publish_artifacts:
+        publish(FUSED, version_dir)
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the start/stop and category classifiers")
+    parser.add_argument("tasks", nargs="*", help=f"tasks to train: {', '.join(TASKS)}, {FUSED} (default: all but {FUSED})")
+    parser.add_argument("--data", help="labeled CSV to use instead of the task default (single task only)")
+    parser.add_argument("--search", action="store_true", help="cross-validated hyperparameter search")
+    parser.add_argument("--fast", action="store_true", help="reuse the newest version's parameters, no search")
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel search jobs (default: all cores)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--no-cache", action="store_true", help="do not reuse cached vectorizer output")
+    parser.add_argument("--no-publish", action="store_true", help="only write the versioned artifacts")
+    parser.add_argument("--vocabulary", action="store_true",
+                        help=f"{FUSED}: share a fitted vocabulary instead of a hashing vectorizer")
+    parser.add_argument("--min-agreement", type=float, default=MIN_AGREEMENT,
+                        help=f"{FUSED}: publish only above this agreement with the current models")
+    parser.add_argument("--rollback", type=int, metavar="VERSION", help="publish an earlier version and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    tasks = args.tasks or list(TASKS)
+    unknown = [task for task in tasks if task not in TASKS and task != FUSED]
+    if unknown:
+        parser.error(f"unknown task: {', '.join(unknown)}")
+    if args.data and len(tasks) != 1:
+        parser.error("--data needs exactly one task")
+
+    for task in tasks:
+        if args.rollback is not None:
+            publish(task, os.path.join(task_directory(task), f"v{args.rollback:04d}"))
+            continue
+        if task == FUSED:
+            manifest = train_fused(hashing=not args.vocabulary, min_agreement=args.min_agreement,
+                                   publish_artifacts=not args.no_publish)
+            agreed = manifest["metrics"]["agreement"]
+            print(f"{task} v{manifest['version']:04d}: agreement with current models start/stop "
+                  f"{agreed['start_stop']:.3f}, category {agreed['category']:.3f} over {agreed['lines']} lines"
+                  f"{'' if manifest['published'] else ' (not published)'}")
+            continue
+        manifest = train(task, data=args.data, search=args.search, jobs=args.jobs, folds=args.folds,
+                         fast=args.fast, cache=not args.no_cache, publish_artifacts=not args.no_publish)
+        timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in manifest["timings"].items())
+        print(f"{task} v{manifest['version']:04d}: test accuracy {manifest['metrics'].get('test_accuracy', float('nan')):.3f}, "
+              f"params {manifest['params']} ({timings})")
+
+if __name__ == "__main__":
+    main()
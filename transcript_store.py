@@ -0,0 +1,271 @@
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+TranscriptRecord = namedtuple("TranscriptRecord", ["time", "meeting", "speaker", "text", "decision", "category"])
+
+DEFAULT_DIRECTORY = "transcripts"
+# Engine events written to the log alongside the utterances
+SWITCH_EVENTS = {"meeting_started", "speaker_started", "speaker_stopped", "time_warning", "time_exceeded", "meeting_ended"}
+
+_SEGMENT = re.compile(r"segment-(\d+)\.jsonl$")
+
+def transcript_directory_from_env():
+    return os.environ.get("SCRUM_TRANSCRIPT_DIR", DEFAULT_DIRECTORY)
+
+def meeting_id(prefix=None):
+    # Sortable by start time; the random suffix keeps meetings started in the
+    # same second apart, even across processes sharing a store
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:12]}"
+    return f"{prefix}-{stamp}" if prefix else stamp
+
+def arrow_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("time", pa.float64()),
+        ("meeting", pa.string()),
+        ("speaker", pa.string()),
+        ("text", pa.string()),
+        ("decision", pa.string()),
+        ("category", pa.string()),
+    ])
+
+class TranscriptStore:
+    # Append-only utterance log. Records are buffered and written in batches of
+    # flush_every to numbered JSONL segments; once a segment holds
+    # segment_records it is closed, and every compact_segments closed segments
+    # are merged into one Parquet file in the background (only when the optional
+    # pyarrow is installed). Memory stays bounded by the buffer, and scan()
+    # streams from disk.
+    def __init__(self, directory=None, flush_every=256, flush_interval=5.0,
+                 segment_records=10000, compact_segments=4, clock=time.monotonic):
+        self.directory = directory or transcript_directory_from_env()
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.segment_records = segment_records
+        self.compact_segments = compact_segments
+        self.clock = clock
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._compacting = threading.Lock()
+        # Held while compaction swaps a new part in for its segments and while a
+        # scan opens its files, so a scan sees the store before or after a swap
+        self._files = threading.Lock()
+        self._last_flush = clock()
+        self._segment = None
+        self._segment_count = 0
+        self.written = 0
+        self.flushes = 0
+        self.compactions = 0
+
+    def record(self, meeting, timestamp, speaker, text, decision=None, category=None):
+        with self._lock:
+            self._buffer.append(TranscriptRecord(timestamp, meeting, speaker, text, decision, category))
+            due = len(self._buffer) >= self.flush_every or self.clock() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def event_listener(self, meeting):
+        # For MeetingEngine.subscribe: logs speaker switches and timing events
+        def on_event(event):
+            if event.kind in SWITCH_EVENTS:
+                self.record(meeting, event.time, event.participant, event.text, decision=event.kind)
+        return on_event
+
+    def _segment_paths(self):
+        paths = glob.glob(os.path.join(self.directory, "segment-*.jsonl"))
+        return sorted(paths, key=lambda path: int(_SEGMENT.search(path).group(1)))
+
+    def _open_segment(self):
+        # A new process always starts a new segment, so a torn last line from a
+        # crash never sits in the middle of a file
+        os.makedirs(self.directory, exist_ok=True)
+        numbers = [int(_SEGMENT.search(path).group(1)) for path in self._segment_paths()]
+        numbers += [int(n) for path in glob.glob(os.path.join(self.directory, "part-*.parquet"))
+                    for n in re.findall(r"\d+", os.path.basename(path))]
+        self._segment = os.path.join(self.directory, f"segment-{max(numbers, default=0) + 1:06d}.jsonl")
+        self._segment_count = 0
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            self._last_flush = self.clock()
+            if not batch:
+                return
+            if self._segment is None or self._segment_count >= self.segment_records:
+                self._open_segment()
+            with open(self._segment, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record._asdict()) + "\n" for record in batch))
+            self._segment_count += len(batch)
+            self.written += len(batch)
+            self.flushes += 1
+            rolled = self._segment_count >= self.segment_records
+        if rolled and len(self.closed_segments()) >= self.compact_segments:
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def closed_segments(self):
+        return [path for path in self._segment_paths() if path != self._segment or self._segment_count >= self.segment_records]
+
+    def compact(self, force=False, wait=False):
+        # Merges closed JSONL segments into one Parquet file. Returns its path, or
+        # None if there was nothing to do or pyarrow is not installed. With `wait`
+        # a compaction already running is waited for instead of skipped.
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+        if not self._compacting.acquire(blocking=wait):
+            return None
+        try:
+            segments = self.closed_segments()
+            if not segments or (len(segments) < self.compact_segments and not force):
+                return None
+            numbers = [_SEGMENT.search(path).group(1) for path in segments]
+            path = os.path.join(self.directory, f"part-{numbers[0]}-{numbers[-1]}.parquet")
+            with pq.ParquetWriter(path + ".tmp", arrow_schema()) as writer:
+                for segment in segments:
+                    rows = list(read_segment(segment))
+                    if rows:
+                        writer.write_table(pa.Table.from_pylist(rows, schema=arrow_schema()))
+            with self._files:
+                os.replace(path + ".tmp", path)
+                for segment in segments:
+                    os.remove(segment)
+            with self._lock:
+                if self._segment in segments:
+                    self._segment = None
+            self.compactions += 1
+            logging.debug(f"Compacted {len(segments)} transcript segments into {path}")
+            return path
+        finally:
+            self._compacting.release()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._segment is not None:
+                self._segment_count = self.segment_records
+        # Waits for a background compaction, so no thread is still reading
+        # segments when close() returns and everything left is compacted
+        self.compact(force=True, wait=True)
+
+    def scan(self, meeting=None, speaker=None, since=None, until=None):
+        # Streams matching records as dicts: Parquet parts, then JSONL segments,
+        # then whatever was buffered. Nothing is loaded all at once. Files are
+        # opened up front in one snapshot with the buffer, and segments are read
+        # only up to their size at that moment; a compaction or flush during the
+        # scan then neither hides rows nor repeats them.
+        def wanted(row):
+            return ((meeting is None or row["meeting"] == meeting)
+                    and (speaker is None or row["speaker"] == speaker)
+                    and (since is None or row["time"] >= since)
+                    and (until is None or row["time"] < until))
+        filters = [(column, op, value) for column, op, value in
+                   [("meeting", "==", meeting), ("speaker", "==", speaker), ("time", ">=", since), ("time", "<", until)]
+                   if value is not None]
+        parts, segments, buffered = self._snapshot()
+        try:
+            for part in parts:
+                yield from read_parquet(part, filters)
+            # Lines that cannot contain the meeting id are skipped without parsing them
+            needle = json.dumps(meeting)[1:-1] if meeting is not None else None
+            for segment, size in segments:
+                for row in read_segment(segment, needle, size):
+                    if wanted(row):
+                        yield row
+        finally:
+            for segment, _ in segments:
+                segment.close()
+        yield from filter(wanted, buffered)
+
+    def _snapshot(self):
+        # -> (Parquet files, [(open segment file, size)], buffered records) as of
+        # one point in time: no compaction swap or flush can run in between
+        parts, segments = [], []
+        with self._files, self._lock:
+            try:
+                part_paths = sorted(glob.glob(os.path.join(self.directory, "part-*.parquet")))
+                if part_paths:
+                    import pyarrow.parquet as pq
+                    parts = [pq.ParquetFile(path) for path in part_paths]
+                for path in self._segment_paths():
+                    f = open(path, "rb")
+                    segments.append((f, os.fstat(f.fileno()).st_size))
+            except BaseException:
+                for f, _ in segments:
+                    f.close()
+                raise
+            buffered = [record._asdict() for record in self._buffer]
+        return parts, segments, buffered
+
+    def stats(self):
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "flushes": self.flushes,
+            "segments": len(self._segment_paths()),
+            "parquet_parts": len(glob.glob(os.path.join(self.directory, "part-*.parquet"))),
+            "compactions": self.compactions,
+        }
+
+def read_segment(f, contains=None, limit=None):
+    # `f` is a path or a segment file opened in binary mode; `limit` stops the
+    # read at that many bytes
+    if isinstance(f, str):
+        with open(f, "rb") as opened:
+            yield from read_segment(opened, contains, limit)
+        return
+    needle = contains.encode("utf-8") if contains is not None else None
+    consumed = 0
+    for line in f:
+        consumed += len(line)
+        if limit is not None and consumed > limit:
+            return
+        if needle is not None and needle not in line:
+            continue
+        try:
+            yield json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # A torn final line from an interrupted write
+            logging.debug(f"Skipping unreadable line in {f.name}")
+
+def row_group_may_match(metadata, filters):
+    # False only if the row group's min/max statistics rule out every row
+    columns = {metadata.column(i).path_in_schema: metadata.column(i).statistics for i in range(metadata.num_columns)}
+    for column, op, value in filters:
+        stats = columns.get(column)
+        if stats is None or not stats.has_min_max:
+            continue
+        if op == "==" and not stats.min <= value <= stats.max:
+            return False
+        if op == ">=" and stats.max < value:
+            return False
+        if op == "<" and stats.min >= value:
+            return False
+    return True
+
+def read_parquet(part, filters=None, batch_size=10000):
+    # `part` is a path or a pyarrow ParquetFile. Row groups whose statistics
+    # cannot match are skipped; the rest is read a batch at a time and each
+    # batch is filtered as it arrives.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if isinstance(part, str):
+        part = pq.ParquetFile(part)
+    filters = filters or []
+    row_groups = [i for i in range(part.num_row_groups) if row_group_may_match(part.metadata.row_group(i), filters)]
+    if not row_groups:
+        return
+    expression = pq.filters_to_expression(filters) if filters else None
+    for batch in part.iter_batches(batch_size=batch_size, row_groups=row_groups):
+        table = pa.Table.from_batches([batch])
+        if expression is not None:
+            table = table.filter(expression)
+        yield from table.to_pylist()
@@ -0,0 +1,141 @@
+import glob
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+from embedding_cache import normalize_rows
+
+DEFAULT_DIRECTORY = "blocker_index"
+_CHUNK = re.compile(r"chunk-(\d+)\.npy$")
+
+def vector_backend_from_env():
+    # SCRUM_VECTOR_BACKEND selects flat (default, exact) or hnsw (needs hnswlib)
+    return os.environ.get("SCRUM_VECTOR_BACKEND", "flat")
+
+class FlatIndex:
+    # Exact cosine search over normalized rows kept in one growing matrix.
+    # Capacity doubles as rows are added, so inserts are amortized O(1).
+    def __init__(self, dim):
+        self.dim = dim
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._count = 0
+
+    def add(self, vectors):
+        vectors = normalize_rows(vectors)
+        needed = self._count + len(vectors)
+        if needed > len(self._vectors):
+            grown = np.zeros((max(needed, 2 * len(self._vectors), 1024), self.dim), dtype=np.float32)
+            grown[:self._count] = self._vectors[:self._count]
+            self._vectors = grown
+        self._vectors[self._count:needed] = vectors
+        self._count = needed
+
+    def search(self, queries, k=5):
+        # Returns (ids, scores), each len(queries) x min(k, len(self)), best first
+        k = min(k, self._count)
+        if k == 0:
+            return np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0), dtype=np.float32)
+        scores = normalize_rows(queries) @ self._vectors[:self._count].T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def __len__(self):
+        return self._count
+
+class HNSWIndex:
+    # Approximate search with hnswlib, imported only when this backend is used
+    def __init__(self, dim, ef_construction=200, M=16, ef=64):
+        import hnswlib
+        self.dim = dim
+        self.ef = ef
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(max_elements=1024, ef_construction=ef_construction, M=M)
+        self._index.set_ef(ef)
+
+    def add(self, vectors):
+        vectors = normalize_rows(vectors)
+        start = self._index.get_current_count()
+        needed = start + len(vectors)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+        self._index.add_items(vectors, np.arange(start, needed))
+
+    def search(self, queries, k=5):
+        k = min(k, len(self))
+        if k == 0:
+            return np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0), dtype=np.float32)
+        self._index.set_ef(max(self.ef, k))
+        ids, distances = self._index.knn_query(normalize_rows(queries), k=k)
+        return ids.astype(np.int64), 1.0 - distances
+
+    def __len__(self):
+        return self._index.get_current_count()
+
+def make_index(backend, dim):
+    if backend == "hnsw":
+        return HNSWIndex(dim)
+    return FlatIndex(dim)
+
+class BlockerIndex:
+    # Persisted embeddings of past statements with a search index in front.
+    # Each add() writes one chunk (vectors .npy + metadata .jsonl) to `directory`,
+    # so inserting a meeting never rewrites what is already stored; on start all
+    # chunks are loaded into the index. `meetings` holds the meeting ids indexed.
+    def __init__(self, directory=DEFAULT_DIRECTORY, backend=None, dim=384):
+        self.directory = directory
+        self.backend = backend or vector_backend_from_env()
+        self.dim = dim
+        self.index = make_index(self.backend, dim)
+        self.records = []
+        self.meetings = set()
+        self._next_chunk = 1
+        self.load()
+
+    def _chunk_paths(self):
+        paths = [path for path in glob.glob(os.path.join(self.directory, "chunk-*.npy")) if _CHUNK.search(path)]
+        return sorted(paths, key=lambda path: int(_CHUNK.search(path).group(1)))
+
+    def load(self):
+        for path in self._chunk_paths():
+            self._next_chunk = int(_CHUNK.search(path).group(1)) + 1
+            vectors = np.load(path)
+            with open(path[:-len(".npy")] + ".jsonl", encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+            if len(records) != len(vectors):
+                logging.error(f"Skipping {path}: {len(vectors)} vectors but {len(records)} records")
+                continue
+            self.index.add(vectors)
+            self.records.extend(records)
+            self.meetings.update(record.get("meeting") for record in records)
+
+    def add(self, vectors, records):
+        # `records` are JSON-serializable dicts, one per row of `vectors`
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(records):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"chunk-{self._next_chunk:06d}")
+        with open(base + ".jsonl", "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+        # The .npy is written last and atomically, so a chunk only counts once complete
+        np.save(base + ".tmp.npy", vectors)
+        os.replace(base + ".tmp.npy", base + ".npy")
+        self._next_chunk += 1
+        self.index.add(vectors)
+        self.records.extend(records)
+        self.meetings.update(record.get("meeting") for record in records)
+
+    def search(self, vectors, k=5, min_score=None):
+        # Per query row: [(score, record), ...] best first
+        ids, scores = self.index.search(np.atleast_2d(np.asarray(vectors, dtype=np.float32)), k)
+        return [[(float(score), self.records[i]) for i, score in zip(row_ids, row_scores)
+                 if min_score is None or score >= min_score]
+                for row_ids, row_scores in zip(ids.tolist(), scores.tolist())]
+
+    def __len__(self):
+        return len(self.records)